@@ -0,0 +1,274 @@
+"""
+Cold storage for old habit logs: month-partitioned Parquet under ARCHIVE_DIR.
+
+The archival job moves logs dated before the horizon out of SQLite into
+
+    ARCHIVE_DIR/habit_logs/month=YYYY-MM/part-<first id>-<last id>.parquet
+
+together with their habit_features values, and deletes both from the
+database. Each student's latest KEEP_LOGS logs always stay hot (whole dates
+move together), so student_stats windows, the newest feature rows and the
+SQL cohort window can still be rebuilt from SQLite alone; only full-history
+scans (training) need the archive. Files are sorted by student_id, so besides
+skipping month directories outside a date range, Parquet row-group statistics
+let student filters skip most of each file.
+
+The files are written before the rows are deleted; a run interrupted in
+between leaves rows in both tiers, and read_logs callers keep the hot copy
+(see combine).
+
+    python -m backend.app.archive run [--horizon-days 180] [--dry-run] [--vacuum]
+    python -m backend.app.archive stats
+
+Needs pyarrow (optional: without an archive on disk nothing imports it).
+"""
+import argparse
+import glob
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import bindparam, func, select
+
+from .db import IS_SQLITE, Base, SessionLocal, engine
+from .stats import WINDOW
+from ..ml.features import RAW_FEATURES, ROLLING_FEATURES
+from ..models.features import HabitFeatures
+from ..models.habit import HabitLog, HabitLogUpdate
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "180"))
+LOGS_DIR = os.path.join(ARCHIVE_DIR, "habit_logs")
+KEEP_LOGS = WINDOW  # newest logs per student that never leave SQLite
+ROW_GROUP_SIZE = 64_000
+IN_CHUNK = 1000
+
+LOG_COLUMNS = ["id", "student_id", "date", *RAW_FEATURES, "mood"]
+COLUMNS = [*LOG_COLUMNS, *ROLLING_FEATURES]
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema(
+        [("id", pa.int64()), ("student_id", pa.int32()), ("date", pa.date32())]
+        + [(c, pa.float64()) for c in RAW_FEATURES]
+        + [("mood", pa.string())]
+        + [(c, pa.float64()) for c in ROLLING_FEATURES]
+    )
+
+
+def _month(d):
+    return date(d.year, d.month, 1)
+
+
+def _next_month(d):
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+# ---------------- Read layer ----------------
+def files():
+    return sorted(glob.glob(os.path.join(LOGS_DIR, "month=*", "*.parquet")))
+
+
+def has_archive():
+    return bool(files())
+
+
+def _dataset():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+    # listed explicitly so a half-written .tmp from an interrupted run is never read
+    return ds.dataset(
+        files(),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+        partition_base_dir=LOGS_DIR,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def _filter(student_ids=None, date_from=None, date_to=None, min_log_id=None):
+    import pyarrow.dataset as ds
+    conds = []
+    if date_from is not None:
+        conds += [ds.field("month") >= f"{date_from:%Y-%m}", ds.field("date") >= date_from]
+    if date_to is not None:
+        conds += [ds.field("month") <= f"{date_to:%Y-%m}", ds.field("date") <= date_to]
+    if student_ids is not None:
+        conds.append(ds.field("student_id").isin([int(s) for s in student_ids]))
+    if min_log_id is not None:
+        conds.append(ds.field("id") > int(min_log_id))
+    expr = None
+    for c in conds:
+        expr = c if expr is None else expr & c
+    return expr
+
+
+def read_logs(columns=None, student_ids=None, date_from=None, date_to=None, min_log_id=None):
+    """
+    Archived logs (with their rolling features) as a DataFrame; empty without an
+    archive. Month directories outside [date_from, date_to] are never opened and
+    student_ids / min_log_id are pushed down to Parquet row-group statistics.
+    """
+    import pandas as pd
+    columns = list(columns or COLUMNS)
+    if not has_archive():
+        return pd.DataFrame(columns=columns)
+    table = _dataset().to_table(columns=columns, filter=_filter(student_ids, date_from, date_to, min_log_id))
+    return table.to_pandas()
+
+
+def iter_batches(columns=None, student_ids=None, date_from=None, date_to=None, batch_size=10_000):
+    """Like read_logs, as a stream of pyarrow RecordBatches (constant memory), file by file in month order."""
+    if not has_archive():
+        return
+    yield from _dataset().to_batches(
+        columns=list(columns or COLUMNS), filter=_filter(student_ids, date_from, date_to),
+        batch_size=batch_size, use_threads=False,
+    )
+
+
+def combine(hot, cold):
+    """
+    Cold + hot frames with the same columns, one row per (student_id, date): a
+    day present in both keeps its hot row (a log re-written after archiving, or
+    an interrupted run), and same-day duplicates archived before logs were
+    unique keep the highest id.
+    """
+    import pandas as pd
+    if cold is None or cold.empty:
+        return hot
+    if hot is None or hot.empty:
+        return cold
+    return pd.concat([cold, hot], ignore_index=True).drop_duplicates(["student_id", "date"], keep="last", ignore_index=True)
+
+
+def stats():
+    import pyarrow.parquet as pq
+    paths = files()
+    months = sorted({os.path.basename(os.path.dirname(p)).split("=", 1)[1] for p in paths})
+    return {
+        "files": len(paths),
+        "months": len(months),
+        "first_month": months[0] if months else None,
+        "last_month": months[-1] if months else None,
+        "rows": sum(pq.ParquetFile(p).metadata.num_rows for p in paths),
+        "bytes": sum(os.path.getsize(p) for p in paths),
+    }
+
+
+# ---------------- Archival job ----------------
+def _bounds(db, cutoff):
+    """student_id -> first date that stays hot: the cutoff, or the KEEP_LOGS-th newest log's date if older."""
+    rn = func.row_number().over(
+        partition_by=HabitLog.student_id,
+        order_by=(HabitLog.date.desc(), HabitLog.id.desc()),
+    ).label("rn")
+    sub = select(HabitLog.student_id, HabitLog.date, rn).subquery()
+    return {sid: min(d, cutoff) for sid, d in db.execute(select(sub.c.student_id, sub.c.date).where(sub.c.rn == KEEP_LOGS))}
+
+
+def _month_frame(db, bounds, lo, hi):
+    """Archivable logs dated [lo, hi) joined with their feature rows."""
+    import pandas as pd
+    rows = [
+        r for r in db.execute(
+            select(*[getattr(HabitLog, c) for c in LOG_COLUMNS]).where(HabitLog.date >= lo, HabitLog.date < hi)
+        )
+        if r.student_id in bounds and r.date < bounds[r.student_id]
+    ]
+    logs = pd.DataFrame.from_records(rows, columns=LOG_COLUMNS)
+    if logs.empty:
+        return logs
+    feats = pd.DataFrame.from_records(
+        db.execute(
+            select(HabitFeatures.student_id, HabitFeatures.date, *[getattr(HabitFeatures, c) for c in ROLLING_FEATURES])
+            .where(HabitFeatures.date >= lo, HabitFeatures.date < hi)
+        ).all(),
+        columns=["student_id", "date", *ROLLING_FEATURES],
+    )
+    df = logs.merge(feats, on=["student_id", "date"], how="left")
+    return df.sort_values(["student_id", "date", "id"], ignore_index=True)
+
+
+def _write(df, month):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    part_dir = os.path.join(LOGS_DIR, f"month={month:%Y-%m}")
+    os.makedirs(part_dir, exist_ok=True)
+    path = os.path.join(part_dir, f"part-{df['id'].min()}-{df['id'].max()}.parquet")
+    tmp = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(df[COLUMNS], schema=_schema(), preserve_index=False), tmp,
+                   row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+    return path
+
+
+def _delete(db, df):
+    ids = df["id"].tolist()
+    for i in range(0, len(ids), IN_CHUNK):
+        db.execute(HabitLog.__table__.delete().where(HabitLog.id.in_(ids[i:i + IN_CHUNK])))
+        db.execute(HabitLogUpdate.__table__.delete().where(HabitLogUpdate.log_id.in_(ids[i:i + IN_CHUNK])))
+    t = HabitFeatures.__table__
+    pairs = df[["student_id", "date"]].drop_duplicates()
+    db.execute(
+        t.delete().where(t.c.student_id == bindparam("sid"), t.c.date == bindparam("d")),
+        [{"sid": int(s), "d": d} for s, d in zip(pairs["student_id"], pairs["date"])],
+    )
+
+
+def archive_logs(db, horizon_days=ARCHIVE_HORIZON_DAYS, today=None, dry_run=False):
+    """Move logs older than horizon_days (keeping each student's newest KEEP_LOGS) to Parquet. Commits per month."""
+    cutoff = (today or date.today()) - timedelta(days=horizon_days)
+    oldest = db.execute(select(func.min(HabitLog.date)).where(HabitLog.date < cutoff)).scalar()
+    summary = {"cutoff": cutoff.isoformat(), "logs": 0, "months": 0, "files": []}
+    if oldest is None:
+        return summary
+    bounds = _bounds(db, cutoff)
+    month = _month(oldest)
+    while month < cutoff:
+        nxt = _next_month(month)
+        df = _month_frame(db, bounds, month, min(nxt, cutoff))
+        if not df.empty:
+            summary["logs"] += len(df)
+            summary["months"] += 1
+            if not dry_run:
+                summary["files"].append(_write(df, month))
+                _delete(db, df)
+                db.commit()
+        month = nxt
+    return summary
+
+
+def vacuum():
+    """Give the freed pages back to the filesystem (SQLite keeps them otherwise)."""
+    if not IS_SQLITE:
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.app.archive")
+    ap.add_argument("command", choices=["run", "stats"])
+    ap.add_argument("--horizon-days", type=int, default=ARCHIVE_HORIZON_DAYS)
+    ap.add_argument("--dry-run", action="store_true", help="count what would move without writing or deleting")
+    ap.add_argument("--vacuum", action="store_true", help="VACUUM the SQLite file afterwards")
+    args = ap.parse_args(argv)
+    if args.command == "stats":
+        print(stats())
+        return
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        res = archive_logs(db, args.horizon_days, dry_run=args.dry_run)
+    finally:
+        db.close()
+    verb = "would archive" if args.dry_run else "archived"
+    print(f"{verb} {res['logs']} logs from {res['months']} months before {res['cutoff']}")
+    if args.vacuum and not args.dry_run:
+        vacuum()
+
+
+if __name__ == "__main__":
+    main()
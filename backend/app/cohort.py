@@ -0,0 +1,155 @@
+"""
+School-wide analytics: the per-student /habits/analytics numbers (last-30-log
+averages, last-7 vs previous-7 trends, mood counts, study streak) for every
+student at once, plus percentile ranks across the cohort.
+
+Students are read in keyset chunks from the materialized student_stats rows,
+so cost scales with the number of students rather than logs. Students with
+logs but no stats row yet (or everyone, with source="logs") are aggregated in
+SQL: a row_number() window picks each student's latest WINDOW logs and
+conditional sums/min() produce the same figures without fetching the logs.
+"""
+import pandas as pd
+from sqlalchemy import and_, case, exists, func, select
+
+from .stats import METRICS, WINDOW
+from ..models.habit import HabitLog
+from ..models.stats import StudentStats
+from ..models.student import Student
+
+CHUNK_SIZE = 5000
+AVERAGES = {
+    "avg_sleep": "sleep_hours",
+    "avg_study": "study_hours",
+    "avg_activity": "activity_minutes",
+    "avg_productivity": "productivity",
+}
+TRENDS = {"study_trend": "study_hours", "sleep_trend": "sleep_hours"}
+RANKED = [*AVERAGES, "study_streak"]
+
+
+def _frame(records, mood_counts):
+    df = pd.DataFrame.from_records(records)
+    df["mood_counts"] = mood_counts
+    return df
+
+
+def _sum_columns():
+    # the sums are extracted by the database's JSON functions; only mood_counts is decoded in Python
+    return [
+        getattr(StudentStats, col)[m].as_float().label(f"{prefix}_{m}")
+        for prefix, col in (("s30", "last30"), ("s7", "last7"), ("p7", "prev7"))
+        for m in METRICS
+    ]
+
+
+def _stats_chunks(db, chunk):
+    """Per-student sums from student_stats, CHUNK rows at a time (keyset on student_id)."""
+    last = 0
+    while True:
+        result = db.execute(
+            select(
+                StudentStats.student_id,
+                case((StudentStats.log_count < WINDOW, StudentStats.log_count), else_=WINDOW).label("n"),
+                StudentStats.study_streak,
+                *_sum_columns(),
+                StudentStats.mood_counts,
+            )
+            .where(StudentStats.student_id > last, StudentStats.log_count > 0)
+            .order_by(StudentStats.student_id)
+            .limit(chunk)
+        )
+        columns = list(result.keys())
+        rows = result.all()
+        if not rows:
+            return
+        last = rows[-1][0]
+        df = pd.DataFrame.from_records([r[:-1] for r in rows], columns=columns[:-1])
+        df["mood_counts"] = [r[-1] for r in rows]
+        yield df
+
+
+def _log_chunks(db, student_ids, chunk):
+    """The same per-student sums computed in SQL from each student's latest WINDOW logs."""
+    for i in range(0, len(student_ids), chunk):
+        ids = student_ids[i:i + chunk]
+        rn = func.row_number().over(
+            partition_by=HabitLog.student_id,
+            order_by=(HabitLog.date.desc(), HabitLog.id.desc()),
+        ).label("rn")
+        ranked = select(HabitLog.student_id, HabitLog.mood, *[getattr(HabitLog, m) for m in METRICS], rn) \
+            .where(HabitLog.student_id.in_(ids)).subquery()
+        w = select(ranked).where(ranked.c.rn <= WINDOW).subquery()
+        sums = lambda prefix, cond: [
+            func.coalesce(func.sum(w.c[m] if cond is None else case((cond, w.c[m]))), 0).label(f"{prefix}_{m}")
+            for m in METRICS
+        ]
+        # study streak: rows before the first (newest-first) log with < 1 study hour
+        streak = func.coalesce(
+            func.min(case((func.coalesce(w.c.study_hours, 0) < 1, w.c.rn))) - 1, func.count()
+        ).label("study_streak")
+        stmt = select(
+            w.c.student_id, func.count().label("n"), streak,
+            *sums("s30", None), *sums("s7", w.c.rn <= 7), *sums("p7", w.c.rn.between(8, 14)),
+        ).group_by(w.c.student_id).order_by(w.c.student_id)
+        records = [dict(r) for r in db.execute(stmt).mappings()]
+        if not records:
+            continue
+        moods = {}
+        for sid, mood, n in db.execute(
+            select(w.c.student_id, w.c.mood, func.count().label("n"))
+            .where(w.c.mood.is_not(None))
+            .group_by(w.c.student_id, w.c.mood)
+            .order_by(w.c.student_id, func.count().desc(), w.c.mood)
+        ):
+            moods.setdefault(sid, {})[mood] = n
+        yield _frame(records, [moods.get(r["student_id"], {}) for r in records])
+
+
+def _students_without_stats(db):
+    # students with logs whose stats row hasn't been built yet (pre-existing data)
+    has_logs = exists().where(HabitLog.student_id == Student.id)
+    has_stats = exists().where(StudentStats.student_id == Student.id)
+    return [r[0] for r in db.execute(select(Student.id).where(and_(has_logs, ~has_stats)).order_by(Student.id))]
+
+
+def cohort_frame(db, source="stats", chunk=CHUNK_SIZE):
+    """One row per student with the analytics columns and percentile ranks."""
+    if source == "logs":
+        ids = [r[0] for r in db.execute(select(HabitLog.student_id).distinct().order_by(HabitLog.student_id))]
+        parts = list(_log_chunks(db, ids, chunk))
+    else:
+        parts = list(_stats_chunks(db, chunk))
+        parts += list(_log_chunks(db, _students_without_stats(db), chunk))
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True).sort_values("student_id", ignore_index=True)
+
+    out = pd.DataFrame({"student_id": df["student_id"].astype(int)})
+    for name, m in AVERAGES.items():
+        out[name] = (df[f"s30_{m}"] / df["n"]).round(2)
+    out["mood_counts"] = df["mood_counts"]
+    has_trend = df["n"] >= 14
+    for name, m in TRENDS.items():
+        out[name] = ((df[f"s7_{m}"] - df[f"p7_{m}"]) / 7).round(3).where(has_trend)
+    out["study_streak"] = df["study_streak"].astype(int)
+    for col in RANKED:
+        out[f"pct_{col}"] = out[col].rank(pct=True).round(3)
+    return out
+
+
+def records(df):
+    """Frame rows -> dicts shaped like /habits/analytics/{id}, plus student_id and percentiles."""
+    cols = {c: df[c].tolist() for c in df.columns}
+    for i in range(len(df)):
+        row = {
+            "student_id": cols["student_id"][i],
+            **{name: cols[name][i] for name in AVERAGES},
+            "mood_counts": cols["mood_counts"][i],
+        }
+        if cols["study_trend"][i] == cols["study_trend"][i]:  # not NaN
+            for name in TRENDS:
+                row[name] = cols[name][i]
+        row["streaks"] = {"study_streak": cols["study_streak"][i]}
+        row["percentiles"] = {col: cols[f"pct_{col}"][i] for col in RANKED}
+        yield row
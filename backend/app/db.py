@@ -1,16 +1,54 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from . import metrics
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./habit.db")
+# async engine URL; defaults to the aiosqlite flavour of DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+# "async" serves the hot routes from routers/async_*.py (needs aiosqlite)
+DB_MODE = os.getenv("DB_MODE", "sync")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_WAL = os.getenv("SQLITE_WAL", "1") == "1"
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _pool_kwargs(url):
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}  # in-memory SQLite uses a single shared connection
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    """
+    WAL lets readers run alongside the single writer; synchronous=NORMAL is
+    durable across app crashes in WAL mode and skips an fsync per commit.
+    """
+    cur = dbapi_conn.cursor()
+    if SQLITE_WAL:
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cur.close()
+
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **_pool_kwargs(DATABASE_URL),
 )
+if IS_SQLITE:
+    event.listen(engine, "connect", _sqlite_pragmas)
+metrics.instrument_engine(engine)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
@@ -23,3 +61,25 @@ def get_db():
     finally:
         db.close()
 
+
+# ---------------- Async engine (optional) ----------------
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_sessionmaker():
+    """Create the async engine on first use so sync deployments don't need aiosqlite."""
+    global _async_engine, _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_kwargs(ASYNC_DATABASE_URL))
+        if ASYNC_DATABASE_URL.startswith("sqlite"):
+            event.listen(_async_engine.sync_engine, "connect", _sqlite_pragmas)
+        metrics.instrument_engine(_async_engine.sync_engine)
+        _AsyncSessionLocal = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,204 @@
+"""
+Bulk export of habit logs (GET /habits/export) as CSV, NDJSON or Parquet.
+
+Hot rows are read with a server-side cursor EXPORT_CHUNK rows at a time
+(yield_per) and archived rows as Parquet record batches, so memory stays flat
+however many rows match; each chunk is encoded and sent before the next is
+read. Parquet output is one row group per chunk, written to the response as
+the writer produces it. With predictions, each chunk's new students get their
+current break probability and predicted mood from one batched model call on
+their latest feature rows.
+
+Row order: archived logs first (file by file), then hot logs by
+(student_id, date, id). A day present in both tiers (re-logged after it was
+archived, or an interrupted archive run) is exported once, from the hot tier,
+as in archive.combine.
+"""
+import csv
+import io
+import json
+import os
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from . import archive, feature_store
+from .db import SessionLocal
+from ..ml.features import MODEL_FEATURES
+from ..models.habit import HabitLog
+from ..schemas.habit import HabitOut
+
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "5000"))
+IN_CHUNK = 1000
+
+COLUMNS = list(HabitOut.model_fields)
+PREDICTION_COLUMNS = ["break_probability", "predicted_mood"]
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def _hot_chunks(db, student_ids, date_from, date_to, chunk):
+    stmt = select(*[getattr(HabitLog, c) for c in COLUMNS])
+    if date_from:
+        stmt = stmt.where(HabitLog.date >= date_from)
+    if date_to:
+        stmt = stmt.where(HabitLog.date <= date_to)
+    stmt = stmt.order_by(HabitLog.student_id, HabitLog.date, HabitLog.id).execution_options(yield_per=chunk)
+    if student_ids is None:
+        parts = [stmt]
+    else:
+        ids = sorted(set(student_ids))
+        parts = [stmt.where(HabitLog.student_id.in_(ids[i:i + IN_CHUNK])) for i in range(0, len(ids), IN_CHUNK)]
+    for part in parts:
+        for rows in db.execute(part).partitions():
+            yield [tuple(r) for r in rows]
+
+
+def _cold_chunks(student_ids, date_from, date_to, chunk):
+    if not archive.has_archive():
+        return
+    import pyarrow as pa
+    for batch in archive.iter_batches(COLUMNS, student_ids, date_from, date_to, batch_size=chunk):
+        if batch.num_rows:
+            # the archive stores activity_minutes as float64; export it as the database does
+            cols = [batch.column(c).cast(pa.int64()) if c == "activity_minutes" else batch.column(c) for c in COLUMNS]
+            yield list(zip(*[c.to_pylist() for c in cols]))
+
+
+def _drop_hot_days(db, rows):
+    """Cold rows whose (student_id, date) has no hot log; the hot tier wins."""
+    sid, day = COLUMNS.index("student_id"), COLUMNS.index("date")
+    ids = sorted({r[sid] for r in rows})
+    lo, hi = min(r[day] for r in rows), max(r[day] for r in rows)
+    hot = set()
+    for i in range(0, len(ids), IN_CHUNK):
+        hot.update(db.execute(
+            select(HabitLog.student_id, HabitLog.date)
+            .where(HabitLog.student_id.in_(ids[i:i + IN_CHUNK]), HabitLog.date.between(lo, hi))
+        ).all())
+    return [r for r in rows if (r[sid], r[day]) not in hot] if hot else rows
+
+
+class _Predictions:
+    """student_id -> (break probability, predicted mood), filled in per-chunk batches."""
+
+    def __init__(self):
+        self.db = SessionLocal()  # own session: latest_many may commit rebuilt feature rows
+        self.known = {}
+
+    def __call__(self, rows):
+        from ..ml.habit_model import habit_model
+        sid = COLUMNS.index("student_id")
+        todo = list(dict.fromkeys(r[sid] for r in rows if r[sid] not in self.known))
+        if todo:
+            latest = feature_store.latest_many(self.db, todo)
+            if latest:
+                X = [r[1:] for r in latest]
+                probs = habit_model.predict_break_batch(X, MODEL_FEATURES)
+                moods = habit_model.predict_mood_batch(X, MODEL_FEATURES)
+                for r, p, m in zip(latest, probs, moods):
+                    self.known[r[0]] = (round(float(p), 3), str(m))
+            for s in todo:
+                self.known.setdefault(s, (None, None))
+        return [(*r, *self.known[r[sid]]) for r in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def _encode_csv(chunks, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue()
+    for rows in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(rows)
+        yield buf.getvalue()
+
+
+def _encode_ndjson(chunks, columns):
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(columns, r)), default=str) + "\n" for r in rows)
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands the Parquet writer's output back in pieces."""
+
+    def __init__(self):
+        self.parts, self.pos = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.parts.append(bytes(b))
+        self.pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.pos
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _parquet_schema(columns):
+    import pyarrow as pa
+    types = {"id": pa.int64(), "student_id": pa.int64(), "date": pa.date32(), "activity_minutes": pa.int64(),
+             "mood": pa.string(), "predicted_mood": pa.string()}
+    return pa.schema([(c, types.get(c, pa.float64())) for c in columns])
+
+
+def _encode_parquet(chunks, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _parquet_schema(columns)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pydict(dict(zip(columns, map(list, zip(*rows)))), schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson, "parquet": _encode_parquet}
+
+
+def stream_export(fmt="csv", student_ids=None, date_from=None, date_to=None, predictions=False,
+                  archived=True, chunk=EXPORT_CHUNK):
+    """StreamingResponse over the matching logs. The generator runs in the threadpool with its own sessions."""
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="parquet export needs pyarrow installed on the server")
+    columns = COLUMNS + PREDICTION_COLUMNS if predictions else COLUMNS
+
+    def chunks():
+        db = SessionLocal()
+        predict = _Predictions() if predictions else None
+        try:
+            sources = [_hot_chunks(db, student_ids, date_from, date_to, chunk)]
+            if archived:
+                cold = (_drop_hot_days(db, rows) for rows in _cold_chunks(student_ids, date_from, date_to, chunk))
+                sources.insert(0, cold)
+            for source in sources:
+                for rows in source:
+                    if rows:
+                        yield predict(rows) if predict else rows
+        finally:
+            if predict:
+                predict.close()
+            db.close()
+
+    return StreamingResponse(
+        ENCODERS[fmt](chunks(), columns),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="habit_logs.{fmt}"'},
+    )
@@ -0,0 +1,186 @@
+"""
+Feature store (habit_features): MODEL_FEATURES per (student, date).
+
+A new log can change its own day and the WINDOW_DAYS - 1 days after it, so
+every write recomputes just those rows from the logs around them (at most
+~2 windows per student) inside the writer's transaction. predict reads one
+row; training reads the table in bulk. Both use the definitions in
+ml/features.py.
+
+Backfill / repair (e.g. after changing the feature definitions):
+
+    python -m backend.app.feature_store rebuild [--students 1,2,3]
+"""
+import argparse
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, select
+
+from .db import Base, SessionLocal, engine
+from ..ml.features import MODEL_FEATURES, RAW_FEATURES, WINDOW_DAYS, rolling_features
+from ..models.features import HabitFeatures
+from ..models.habit import HabitLog
+
+IN_CHUNK = 1000
+LOG_COLUMNS = ["id", "student_id", "date", *RAW_FEATURES]
+_SPAN = timedelta(days=WINDOW_DAYS - 1)
+
+
+def _load_logs(db, student_ids, lo=None, hi=None):
+    import pandas as pd
+    stmt = select(*[getattr(HabitLog, c) for c in LOG_COLUMNS]).where(HabitLog.student_id.in_(student_ids))
+    if lo is not None:
+        stmt = stmt.where(HabitLog.date >= lo)
+    if hi is not None:
+        stmt = stmt.where(HabitLog.date <= hi)
+    return pd.DataFrame.from_records(db.execute(stmt).all(), columns=LOG_COLUMNS)
+
+
+def _replace(db, student_ids, logs, lo=None, hi=None):
+    """Recompute features from logs and replace the stored rows dated [lo, hi]."""
+    stmt = delete(HabitFeatures).where(HabitFeatures.student_id.in_(student_ids))
+    if lo is not None:
+        stmt = stmt.where(HabitFeatures.date >= lo)
+    if hi is not None:
+        stmt = stmt.where(HabitFeatures.date <= hi)
+    db.execute(stmt)
+    if logs.empty:
+        return 0
+    feats = rolling_features(logs)
+    if lo is not None:
+        feats = feats[feats["date"] >= lo]
+    if feats.empty:
+        return 0
+    db.execute(HabitFeatures.__table__.insert(), feats.to_dict("records"))
+    return len(feats)
+
+
+def apply_logs(db, rows):
+    """
+    Refresh the feature rows affected by freshly written logs (dicts with
+    student_id and date). Students without any stored rows get their whole
+    history built, so a student's rows are always all there or absent.
+    Runs in the caller's transaction; the caller commits.
+    """
+    if not rows:
+        return
+    student_ids = sorted({r["student_id"] for r in rows})
+    lo = min(r["date"] for r in rows)
+    hi = max(r["date"] for r in rows) + _SPAN
+    for i in range(0, len(student_ids), IN_CHUNK):
+        chunk = student_ids[i:i + IN_CHUNK]
+        known = {r[0] for r in db.execute(
+            select(HabitFeatures.student_id).where(HabitFeatures.student_id.in_(chunk)).distinct()
+        )}
+        new = [s for s in chunk if s not in known]
+        if new:
+            _replace(db, new, _load_logs(db, new))
+        if known:
+            known = sorted(known)
+            _replace(db, known, _load_logs(db, known, lo - _SPAN, hi), lo, hi)
+
+
+def rebuild(db, student_ids=None):
+    """Recompute every feature row for the given students (default: all). Commits per chunk."""
+    if student_ids is None:
+        student_ids = [r[0] for r in db.execute(select(HabitLog.student_id).distinct())]
+    student_ids = list(student_ids)
+    for i in range(0, len(student_ids), IN_CHUNK):
+        chunk = student_ids[i:i + IN_CHUNK]
+        _replace(db, chunk, _load_logs(db, chunk))
+        db.commit()
+    return len(student_ids)
+
+
+def latest(db, student_id):
+    """The student's most recent feature row as a dict, building the student's rows on a miss."""
+    stmt = (
+        select(*[getattr(HabitFeatures, c) for c in MODEL_FEATURES])
+        .where(HabitFeatures.student_id == student_id)
+        .order_by(HabitFeatures.date.desc())
+        .limit(1)
+    )
+    row = db.execute(stmt).mappings().first()
+    # only students with logs get built: a miss for anyone else must not write
+    if row is None and rebuild(db, unbuilt_students(db, [student_id])):
+        row = db.execute(stmt).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def unbuilt_students(db, student_ids=None):
+    """Students (default: all, else among student_ids) with habit logs but no feature rows."""
+    def run(ids):
+        logs, feats = select(HabitLog.student_id).distinct(), select(HabitFeatures.student_id)
+        if ids is not None:
+            logs, feats = logs.where(HabitLog.student_id.in_(ids)), feats.where(HabitFeatures.student_id.in_(ids))
+        return [r[0] for r in db.execute(logs.except_(feats))]
+
+    if student_ids is None:
+        return run(None)
+    ids = list(student_ids)
+    return [sid for i in range(0, len(ids), IN_CHUNK) for sid in run(ids[i:i + IN_CHUNK])]
+
+
+def latest_many(db, student_ids=None):
+    """
+    Latest feature row per student -> list of (student_id, *MODEL_FEATURES).
+    Students with logs but no stored rows get them built first (as in latest),
+    including every such student when no ids are given; ids without logs are
+    left out without writing anything.
+    """
+    def run(ids):
+        latest = select(HabitFeatures.student_id, func.max(HabitFeatures.date).label("date")).group_by(HabitFeatures.student_id)
+        if ids is not None:
+            latest = latest.where(HabitFeatures.student_id.in_(ids))
+        latest = latest.subquery()
+        return db.execute(
+            select(HabitFeatures.student_id, *[getattr(HabitFeatures, c) for c in MODEL_FEATURES])
+            .join(latest, and_(HabitFeatures.student_id == latest.c.student_id, HabitFeatures.date == latest.c.date))
+        ).all()
+
+    if student_ids is None:
+        rebuild(db, unbuilt_students(db))
+        return run(None)
+    ids = list(dict.fromkeys(student_ids))
+    rows = [r for i in range(0, len(ids), IN_CHUNK) for r in run(ids[i:i + IN_CHUNK])]
+    found = {r[0] for r in rows}
+    missing = unbuilt_students(db, [sid for sid in ids if sid not in found])
+    if rebuild(db, missing):
+        rows += [r for i in range(0, len(missing), IN_CHUNK) for r in run(missing[i:i + IN_CHUNK])]
+    return rows
+
+
+def read_frame(db, student_ids=None):
+    """Bulk read for training -> DataFrame with student_id, date and MODEL_FEATURES."""
+    import pandas as pd
+    cols = ["student_id", "date", *MODEL_FEATURES]
+    stmt = select(*[getattr(HabitFeatures, c) for c in cols])
+    frames = []
+    if student_ids is None:
+        frames.append(pd.DataFrame.from_records(db.execute(stmt).all(), columns=cols))
+    else:
+        ids = list(student_ids)
+        for i in range(0, len(ids), IN_CHUNK):
+            part = db.execute(stmt.where(HabitFeatures.student_id.in_(ids[i:i + IN_CHUNK]))).all()
+            frames.append(pd.DataFrame.from_records(part, columns=cols))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=cols)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.app.feature_store")
+    ap.add_argument("command", choices=["rebuild"])
+    ap.add_argument("--students", help="comma-separated student ids (default: all)")
+    args = ap.parse_args(argv)
+    ids = [int(s) for s in args.students.split(",")] if args.students else None
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print(f"rebuilt features for {rebuild(db, ids)} students")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
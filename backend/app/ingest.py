@@ -0,0 +1,149 @@
+import csv
+import json
+from collections import Counter
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..models.habit import HabitLog, HabitLogUpdate
+from ..schemas.habit import HabitCreate
+from . import feature_store, stats
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+LOG_KEY = ["student_id", "date"]  # unique: one log per student and day
+# dialects whose INSERT has ON CONFLICT ... RETURNING (what upsert_logs needs)
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+async def iter_lines(stream):
+    """Split an async byte stream into lines without buffering the whole body."""
+    buf = b""
+    async for chunk in stream:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line
+    if buf:
+        yield buf
+
+
+async def iter_records(stream, fmt):
+    """
+    Yield (row_number, record) pairs from an NDJSON or CSV body.
+    record is a dict, or an error string when the line can't be parsed.
+    """
+    header = None
+    row = 0
+    async for raw in iter_lines(stream):
+        line = raw.decode("utf-8-sig").strip()
+        if not line:
+            continue
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            row += 1
+            if len(values) != len(header):
+                yield row, f"expected {len(header)} columns, got {len(values)}"
+            else:
+                yield row, dict(zip(header, values))
+        else:
+            row += 1
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield row, f"invalid JSON: {e}"
+                continue
+            yield row, rec if isinstance(rec, dict) else "expected a JSON object"
+
+
+def validate_chunk(records):
+    """Validate (row, record) pairs against HabitCreate -> (rows, row_numbers, errors)."""
+    rows, numbers, errors = [], [], []
+    for n, rec in records:
+        if isinstance(rec, str):
+            errors.append({"row": n, "error": rec})
+            continue
+        try:
+            rows.append(HabitCreate(**rec).dict())
+            numbers.append(n)
+        except ValidationError as e:
+            msg = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            errors.append({"row": n, "error": msg})
+    return rows, numbers, errors
+
+
+def upsert_insert(dialect):
+    """The dialect's INSERT construct with ON CONFLICT support."""
+    try:
+        return UPSERT_INSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"log upserts need SQLite or PostgreSQL, not {dialect}") from None
+
+
+def upsert_logs(db, rows):
+    """
+    Write validated rows, one log per (student_id, date): a new day is inserted
+    and an already logged day is overwritten in place, keeping its id (the last
+    of several rows for the same day wins; habit_log_updates records the
+    rewrite). Sets each row's "id" and folds the rows into student_stats and
+    the feature store. Runs in the caller's transaction; the caller commits.
+    Returns student_id -> number of newly inserted days.
+    """
+    days = {(r["student_id"], r["date"]): r for r in rows}
+    t = HabitLog.__table__
+    ins = upsert_insert(db.get_bind().dialect.name)(t)
+    returning = (t.c.student_id, t.c.date, t.c.id)
+    # the first statement takes the write lock and returns only the new days;
+    # whatever it skipped already exists and is updated by the second
+    ids, new_count = {}, Counter()
+    for sid, d, log_id in db.execute(ins.on_conflict_do_nothing(index_elements=LOG_KEY).returning(*returning), list(days.values())):
+        ids[sid, d] = log_id
+        new_count[sid] += 1
+    rest = [r for k, r in days.items() if k not in ids]
+    if rest:
+        update = {c.name: ins.excluded[c.name] for c in t.c if c.name not in ("id", *LOG_KEY)}
+        stmt = ins.on_conflict_do_update(index_elements=LOG_KEY, set_=update).returning(*returning)
+        updated = {(sid, d): log_id for sid, d, log_id in db.execute(stmt, rest)}
+        ids.update(updated)
+        # same id, new content: give each rewritten log a fresh seq for incremental training
+        u = HabitLogUpdate.__table__
+        db.execute(u.delete().where(u.c.log_id.in_(list(updated.values()))))
+        db.execute(u.insert(), [{"log_id": i} for i in updated.values()])
+    for r in rows:
+        r["id"] = ids[r["student_id"], r["date"]]
+    stats.apply_logs(db, list(days.values()), new_count)
+    feature_store.apply_logs(db, list(days.values()))
+    return new_count
+
+
+def insert_chunk(db, rows):
+    """
+    Upsert validated rows (batched INSERT ... ON CONFLICT ... RETURNING id) and
+    fold them into student_stats and the feature store, all inside one transaction.
+    -> (inserted, updated): new days, and already logged days that were
+    overwritten; a day repeated within rows counts once.
+    """
+    if not rows:
+        return 0, 0
+    try:
+        inserted = sum(upsert_logs(db, rows).values())
+        db.commit()
+        stats.forget({r["student_id"] for r in rows})
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    return inserted, len({(r["student_id"], r["date"]) for r in rows}) - inserted
+
+
+def ingest_chunk(db, records):
+    """Validate and insert one chunk -> (inserted, updated, errors)."""
+    rows, numbers, errors = validate_chunk(records)
+    try:
+        inserted, updated = insert_chunk(db, rows)
+    except SQLAlchemyError as e:
+        inserted = updated = 0
+        errors += [{"row": n, "error": f"insert failed: {e.__class__.__name__}"} for n in numbers]
+    return inserted, updated, errors
@@ -0,0 +1,207 @@
+"""
+Precomputed coach messages, routines and recommendations (student_insights).
+
+These outputs depend only on a student's recent logs (student_stats) and
+profile, so a batch job derives them ahead of time and stores them with the
+stats version they came from. The endpoints serve the stored row when its
+version still matches and only compute on demand after a newer log; profile
+edits drop the row. latest() keeps what a student's reads need in
+stats.latest_cache, so repeat reads until the next write skip the database.
+
+    python -m backend.app.insights run [--students 1,2] [--workers 4] [--chunk 500]
+    python -m backend.app.insights run --every 86400      # simple built-in scheduler
+    # or from cron: 0 2 * * * cd /srv/app && python -m backend.app.insights run
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, select
+
+from .db import Base, SessionLocal, engine
+from . import feature_store, stats as student_stats
+from ..models.habit import HabitLog
+from ..models.insights import StudentInsights
+from ..models.stats import StudentStats
+from ..models.student import Student
+from ..ml.coach_llm import coach_key, get_coach
+from ..ml.recommender import generate_recommendations, generate_routine
+
+CHUNK_SIZE = 500
+WORKERS = 4
+
+
+def build_routine(stats):
+    # 7-log averages come from the materialized student_stats row
+    n = min(7, len(stats.window))
+    return generate_routine({k: v / n for k, v in stats.last7.items()})
+
+
+def log_coach_key(log, student):
+    return coach_key(
+        mood=log["mood"],
+        productivity=log["productivity"],
+        study_hours=log["study_hours"],
+        personality=(student.personality if student else None),
+        goals=(student.goals if student else None),
+    )
+
+
+def latest_coach_key(stats, student):
+    return log_coach_key(student_stats.entry_dict(stats.window[0]), student)
+
+
+def compute(stats, student):
+    return {
+        "student_id": stats.student_id,
+        "stats_version": stats.version,
+        "coach_message": get_coach().message(latest_coach_key(stats, student)),
+        "routine": build_routine(stats),
+        "recommendations": generate_recommendations(student_stats.entry_dict(stats.window[0])),
+        "computed_at": time.time(),
+    }
+
+
+def lookup(db, student_id):
+    """
+    (stats, insights) with one indexed read; insights is None when missing or
+    derived from an older stats version. stats is None for a student without logs.
+    """
+    row = db.execute(
+        select(StudentStats, StudentInsights)
+        .outerjoin(StudentInsights, StudentInsights.student_id == StudentStats.student_id)
+        .where(StudentStats.student_id == student_id)
+    ).first()
+    if row is None:
+        return student_stats.get_stats(db, student_id), None
+    stats, ins = row
+    student_stats.known_versions.set(student_id, stats.version)
+    return stats, (ins if ins is not None and ins.stats_version == stats.version else None)
+
+
+# ---------------- Latest-log cache ----------------
+def _cached(student_id):
+    # created empty and filled in place: a write that drops the entry while a
+    # reader is still filling it leaves that reader's values unpublished
+    entry = student_stats.latest_cache.get(student_id)
+    if entry is None:
+        entry = {}
+        student_stats.latest_cache.set(student_id, entry)
+    return entry
+
+
+def latest(db, student_id):
+    """
+    {"version", "log", "routine", "recommendations", "coach"} for the student's
+    newest log, taken from the stored insights when current (coach is None
+    until coach_message fills it); None without logs.
+    """
+    entry = _cached(student_id)
+    if "log" not in entry:
+        stats, ins = lookup(db, student_id)
+        if stats is None:
+            return None
+        log = student_stats.entry_dict(stats.window[0])
+        entry.update(
+            version=stats.version,
+            log=log,
+            routine=ins.routine if ins else build_routine(stats),
+            recommendations=ins.recommendations if ins else generate_recommendations(log),
+            coach=ins.coach_message if ins else None,
+        )
+    return entry
+
+
+def latest_features(db, student_id):
+    """feature_store.latest through the cache."""
+    entry = _cached(student_id)
+    if "features" not in entry:
+        entry["features"] = feature_store.latest(db, student_id)
+    return entry["features"]
+
+
+def latest_coach_key_for(db, student_id):
+    """Coach key of the newest log and the profile; None without logs."""
+    entry = latest(db, student_id)
+    if entry is None:
+        return None
+    if "coach_key" not in entry:
+        entry["coach_key"] = log_coach_key(entry["log"], db.get(Student, student_id))
+    return entry["coach_key"]
+
+
+def coach_message(db, student_id):
+    """The stored coach message when current, else the coach backend's (memoized until the next write)."""
+    entry = latest(db, student_id)
+    if entry is None:
+        return None
+    if entry["coach"] is None:
+        entry["coach"] = get_coach().message(latest_coach_key_for(db, student_id))
+    return entry["coach"]
+
+
+def invalidate(db, student_ids):
+    """Drop precomputed rows (e.g. after a profile edit). Runs in the caller's transaction."""
+    db.execute(delete(StudentInsights).where(StudentInsights.student_id.in_(list(student_ids))))
+
+
+def refresh_chunk(student_ids):
+    """Recompute and store insights for one chunk of students in its own session."""
+    db = SessionLocal()
+    try:
+        stats = {s.student_id: s for s in db.execute(
+            select(StudentStats).where(StudentStats.student_id.in_(student_ids))
+        ).scalars()}
+        missing = [sid for sid in student_ids if sid not in stats]
+        if missing:
+            student_stats.rebuild(db, missing)
+            stats.update((s.student_id, s) for s in db.execute(
+                select(StudentStats).where(StudentStats.student_id.in_(missing))
+            ).scalars())
+        students = {s.id: s for s in db.execute(select(Student).where(Student.id.in_(list(stats)))).scalars()}
+        rows = [compute(s, students.get(sid)) for sid, s in stats.items() if s.window]
+        if rows:
+            invalidate(db, [r["student_id"] for r in rows])
+            db.execute(StudentInsights.__table__.insert(), rows)
+        db.commit()
+        return len(rows)
+    finally:
+        db.close()
+
+
+def run(student_ids=None, workers=WORKERS, chunk=CHUNK_SIZE):
+    """Walk students (default: everyone with logs) in chunks over a worker pool -> rows written."""
+    if student_ids is None:
+        db = SessionLocal()
+        try:
+            student_ids = [r[0] for r in db.execute(select(HabitLog.student_id).distinct().order_by(HabitLog.student_id))]
+        finally:
+            db.close()
+    student_ids = list(student_ids)
+    chunks = [student_ids[i:i + chunk] for i in range(0, len(student_ids), chunk)]
+    # threads: the slow part is the coach backend (HTTP), not Python
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(refresh_chunk, chunks))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.app.insights")
+    ap.add_argument("command", choices=["run"])
+    ap.add_argument("--students", help="comma-separated student ids (default: all)")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--every", type=float, help="repeat every N seconds instead of running once")
+    args = ap.parse_args(argv)
+    ids = [int(s) for s in args.students.split(",")] if args.students else None
+    Base.metadata.create_all(bind=engine)
+    while True:
+        t = time.perf_counter()
+        n = run(ids, args.workers, args.chunk)
+        print(f"precomputed insights for {n} students in {time.perf_counter() - t:.1f}s")
+        if not args.every:
+            break
+        time.sleep(max(0.0, args.every - (time.perf_counter() - t)))
+
+
+if __name__ == "__main__":
+    main()
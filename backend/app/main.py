@@ -1,19 +1,79 @@
+import os
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .db import Base, engine
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from . import ingest, metrics, migrations, stats as student_stats
+from .db import Base, SessionLocal, engine, DB_MODE
+from .write_batcher import write_batcher
 
 # Import models so SQLAlchemy creates tables
-from ..models import student, habit
+from ..models import student, habit, stats, insights, features
 
 # Import routers (IMPORTANT: router object, not module)
 from ..routers.students import router as students_router
 from ..routers.habits import router as habits_router
+from ..ml.coach_llm import get_coach
+from ..ml.habit_model import habit_model
+from ..ml.predict_batcher import predict_batcher
+
+# When the model is loaded: "startup" before the first request is served,
+# "background" in a thread while requests already flow (predictions wait for it
+# on first use), "lazy" on the first prediction.
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "startup")
+
+
+def warm_up():
+    """Load the model and take first-call costs (imports, page faults) off the first requests."""
+    habit_model.load()
+    habit_model.predict_break({})
+    import pandas  # noqa: F401 -- first log write (feature store)
+
 
-# Create DB tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app):
+    ingest.upsert_insert(engine.dialect.name)  # fail now, not on the first log write
+    # Create DB tables
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        migrations.run(db)  # e.g. the unique (student_id, date) index on an older habit.db
+    if MODEL_PRELOAD == "startup":
+        await run_in_threadpool(warm_up)
+    elif MODEL_PRELOAD == "background":
+        threading.Thread(target=warm_up, name="model-warm-up", daemon=True).start()
+    yield
+    # commit whatever is still queued before the process exits
+    write_batcher.stop()
+    predict_batcher.stop()
 
-app = FastAPI(title="AI Habit Tracker & Coach")
+
+app = FastAPI(title="AI Habit Tracker & Coach", lifespan=lifespan)
+
+# ---------------- Metrics ----------------
+if metrics.METRICS:
+    app.add_middleware(metrics.MetricsMiddleware)
+metrics.register_cache("student_versions", student_stats.known_versions)
+metrics.register_cache("latest_log", student_stats.latest_cache)
+metrics.register_cache("coach", lambda: get_coach().cache)
+metrics.register_stats("write_batcher", write_batcher.stats)
+metrics.register_stats("predict_batcher", predict_batcher.stats)
+metrics.register_stats("coach", lambda: {k: v for k, v in get_coach().stats().items() if not k.startswith("cache_")})
+metrics.register_stats("model_reloads", lambda: habit_model.reloads)
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus text exposition."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # REGISTER ROUTERS
+if DB_MODE == "async":
+    # registered first so their routes win; the sync routers cover the rest
+    from ..routers.async_students import router as async_students_router
+    from ..routers.async_habits import router as async_habits_router
+    app.include_router(async_students_router)
+    app.include_router(async_habits_router)
 app.include_router(students_router)
 app.include_router(habits_router)
-
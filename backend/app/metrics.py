@@ -0,0 +1,238 @@
+"""
+Prometheus text-format metrics (GET /metrics) without a client dependency.
+
+- MetricsMiddleware times every request per route template and opens a
+  request-scoped breakdown; timed() sections and SQLAlchemy query events
+  (instrument_engine) add to it. With SERVER_TIMING=1 the breakdown is also
+  returned as a Server-Timing header.
+- Histograms/counters are fixed-bucket, lock-protected lists: an observation
+  is a bisect and a few additions, cheap enough to leave on (METRICS=0 skips
+  the middleware and query hooks entirely).
+- Caches and component stats (write batcher, coach, model reloads) are read
+  when /metrics is scraped, so they cost nothing per request.
+"""
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS = os.getenv("METRICS", "1") == "1"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TRAINING_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+_registry = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, tuple(labels), tuple(buckets)
+        self._series = {}  # label values -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(k, list(v)) for k, v in self._series.items()]
+        for labels, s in sorted(series):
+            cumulative = 0
+            for le, n in zip((*self.buckets, "+Inf"), s[:-1]):
+                cumulative += n
+                yield f"{self.name}_bucket{_labels((*self.labelnames, 'le'), (*labels, le))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {s[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, v in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {v}"
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route template.", ("method", "route"))
+REQUESTS = Counter("http_requests_total", "Requests by route template and status.", ("method", "route", "status"))
+REQUEST_DB_QUERIES = Histogram("http_request_db_queries", "DB queries per request.", ("route",), COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "DB time per request.", ("route",))
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement execution time.", ("statement",))
+SECTION_SECONDS = Histogram("app_section_duration_seconds", "Time in instrumented code sections.", ("section",))
+INFERENCE_SECONDS = Histogram("model_inference_duration_seconds", "Model predict calls.", ("kind", "engine"))
+INFERENCE_ROWS = Counter("model_inference_rows_total", "Rows scored by the model.", ("kind",))
+TRAINING_SECONDS = Histogram("model_training_duration_seconds", "Training jobs.", ("mode", "status"), TRAINING_BUCKETS)
+
+
+# ---------------- Request-scoped breakdown ----------------
+_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+def _add(timings, name, seconds):
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(section, histogram=SECTION_SECONDS, *labels):
+    """Time a block into histogram (labelled section by default) and the current request's breakdown."""
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t
+        histogram.observe(dt, *(labels or (section,)))
+        timings = _request.get()
+        if timings is not None:
+            _add(timings, section, dt)
+
+
+def _statement(sql):
+    verb = sql.lstrip()[:6].upper()
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine):
+    """Count and time every statement on a (sync) SQLAlchemy engine."""
+    if not METRICS:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["metrics_t0"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        dt = time.perf_counter() - conn.info.pop("metrics_t0", time.perf_counter())
+        DB_QUERY_SECONDS.observe(dt, _statement(statement))
+        timings = _request.get()
+        if timings is not None:
+            _add(timings, "db", dt)
+            timings["db_queries"] = timings.get("db_queries", 0) + 1
+
+
+def server_timing(timings, total):
+    parts = []
+    for name, v in timings.items():
+        if name == "db_queries":
+            continue
+        desc = f';desc="{timings.get("db_queries", 0)} queries"' if name == "db" else ""
+        parts.append(f"{name};dur={v * 1000:.2f}{desc}")
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead; streaming passes straight through)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = {}
+        token = _request.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    header = server_timing(timings, time.perf_counter() - start).encode()
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request.reset(token)
+            # the router stores the matched route in the scope; templates keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route)
+            REQUESTS.inc(scope["method"], route, status)
+            REQUEST_DB_QUERIES.observe(timings.get("db_queries", 0), route)
+            REQUEST_DB_SECONDS.observe(timings.get("db", 0.0), route)
+
+
+# ---------------- Scrape-time collectors ----------------
+def register_cache(name, cache):
+    """cache: a TTLCache (hits/misses/len) or a callable returning one (None while it doesn't exist)."""
+    _collectors.append(("cache", name, cache))
+
+
+def register_stats(name, fn):
+    """fn() -> dict; numeric (and bool) values are exported as gauges named <name>_<key>."""
+    _collectors.append(("stats", name, fn))
+
+
+def _collect():
+    caches, gauges = [], []
+    for kind, name, source in _collectors:
+        try:
+            if kind == "cache":
+                cache = source() if callable(source) else source
+                if cache is not None:
+                    caches.append((name, cache.hits, cache.misses, len(cache)))
+            else:
+                for key, v in source().items():
+                    if isinstance(v, (bool, int, float)):
+                        gauges.append((f"{name}_{key}", float(v)))
+        except Exception:  # a broken collector must not take /metrics down
+            continue
+    return caches, gauges
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    caches, gauges = _collect()
+    for metric, kind, idx in (("cache_hits_total", "counter", 1), ("cache_misses_total", "counter", 2),
+                              ("cache_entries", "gauge", 3)):
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{cache="{c[0]}"}} {c[idx]}' for c in caches)
+    lines.append("# TYPE cache_hit_ratio gauge")
+    lines.extend(f'cache_hit_ratio{{cache="{c[0]}"}} {c[1] / (c[1] + c[2]) if c[1] + c[2] else 0:.4f}' for c in caches)
+    for name, v in gauges:
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {v:g}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,61 @@
+"""
+Background micro-batching shared by the write and predict batchers.
+
+Callers put items on a queue; one daemon thread takes the first waiting item,
+keeps collecting for up to max_wait_ms (or max_rows items) and hands the lot
+to the subclass's _flush(batch). stop() flushes whatever was queued before it.
+"""
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class MicroBatcher:
+    thread_name = "micro-batcher"
+
+    def __init__(self, max_rows, max_wait_ms, queue_max=0):
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue(maxsize=queue_max)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=10):
+        """Flush everything queued so far and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _flush(self, batch):
+        raise NotImplementedError
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_rows:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
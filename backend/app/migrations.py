@@ -0,0 +1,111 @@
+"""
+Schema changes that create_all can't make on an existing database.
+
+unique_log_dates: one habit log per (student, date), enforced by the unique
+index ux_habit_logs_student_date that POST /habits/log upserts on. Same-day
+duplicates are collapsed to their highest id (the row the feature store and
+the cohort queries already treated as the day's log), the index is created
+and the affected students' stats rows are rebuilt, all in one transaction.
+The API runs it at startup. It is idempotent, so workers that start together
+(uvicorn --workers N) are safe: the first one holds the write lock while it
+migrates, and the others then find no duplicates and the index already there.
+
+    python -m backend.app.migrations run [--dry-run]
+"""
+import argparse
+import os
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.schema import CreateIndex
+
+from . import stats as student_stats
+from .db import SQLITE_BUSY_TIMEOUT_MS, Base, SessionLocal, engine
+from ..models.habit import HabitLog
+
+UNIQUE_LOG_INDEX = "ux_habit_logs_student_date"
+# how long a worker waits for another one's migration (SQLite busy timeout)
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "600000"))
+
+
+def has_unique_log_index(bind=engine):
+    return UNIQUE_LOG_INDEX in {ix["name"] for ix in inspect(bind).get_indexes(HabitLog.__tablename__)}
+
+
+def _duplicates():
+    """(id, student_id) of every log that isn't its day's highest id, as a subquery."""
+    rn = func.row_number().over(
+        partition_by=(HabitLog.student_id, HabitLog.date),
+        order_by=HabitLog.id.desc(),
+    ).label("rn")
+    sub = select(HabitLog.id, HabitLog.student_id, rn).subquery()
+    return select(sub.c.id, sub.c.student_id).where(sub.c.rn > 1).subquery()
+
+
+def duplicate_logs(db):
+    """(id, student_id) of every log that isn't its day's highest id."""
+    return db.execute(select(_duplicates())).all()
+
+
+def _lock_logs(db, dialect):
+    """Serialize concurrent migrations: wait for the table rather than fail or interleave."""
+    if dialect == "sqlite":
+        # the DELETE below is the transaction's first statement, so it waits for the write lock
+        db.execute(text(f"PRAGMA busy_timeout={MIGRATION_LOCK_TIMEOUT_MS}"))
+    elif dialect == "postgresql":
+        db.execute(text(f"LOCK TABLE {HabitLog.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def unique_log_dates(db, dry_run=False):
+    """Drop same-day duplicate logs and create the unique index -> summary. Commits."""
+    bind = db.get_bind()
+    if has_unique_log_index(bind):
+        return {"applied": False, "duplicates": 0, "students": 0}
+    if dry_run:
+        dups = duplicate_logs(db)
+        return {"applied": False, "duplicates": len(dups), "students": len({sid for _, sid in dups})}
+    t = HabitLog.__table__
+    index = next(ix for ix in t.indexes if ix.name == UNIQUE_LOG_INDEX)
+    try:
+        _lock_logs(db, bind.dialect.name)
+        deleted = db.execute(t.delete().where(t.c.id.in_(select(_duplicates().c.id))).returning(t.c.student_id)).all()
+        db.execute(CreateIndex(index, if_not_exists=True))
+        students = sorted({sid for (sid,) in deleted})
+        # feature rows already came from each day's highest id; windows and counts didn't
+        student_stats.rebuild(db, students, commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if bind.dialect.name == "sqlite":
+            db.execute(text(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}"))
+            db.commit()
+    student_stats.forget(students)
+    return {"applied": True, "duplicates": len(deleted), "students": len(students)}
+
+
+def run(db):
+    """Every pending migration (startup)."""
+    return {"unique_log_dates": unique_log_dates(db)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.app.migrations")
+    ap.add_argument("command", choices=["run"])
+    ap.add_argument("--dry-run", action="store_true", help="count duplicate logs without changing anything")
+    args = ap.parse_args(argv)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        res = unique_log_dates(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+    if not res["applied"] and not args.dry_run:
+        print(f"{UNIQUE_LOG_INDEX} already exists")
+    else:
+        verb = "would remove" if args.dry_run else "removed"
+        print(f"{verb} {res['duplicates']} same-day duplicate logs of {res['students']} students")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import json
+from datetime import date
+from itertools import islice
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .db import SessionLocal
+
+MAX_PAGE = 1000
+STREAM_CHUNK = 1000
+
+
+def encode_cursor(*parts):
+    return ",".join(p.isoformat() if isinstance(p, date) else str(p) for p in parts)
+
+
+def decode_log_cursor(cursor):
+    """'YYYY-MM-DD,id' -> (date, id)."""
+    try:
+        d, i = cursor.split(",")
+        return date.fromisoformat(d), int(i)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def decode_id_cursor(cursor):
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def page_headers(response, request, next_cursor):
+    """Expose the next page as X-Next-Cursor and an RFC 8288 Link header."""
+    if next_cursor is None:
+        return
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+
+
+def _default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
+
+
+def _encode(records, fmt, chunk):
+    sep = "[" if fmt == "json" else ""
+    it = iter(records)
+    while part := list(islice(it, chunk)):
+        if fmt == "json":
+            yield sep + ",".join(json.dumps(dict(r), default=_default) for r in part)
+            sep = ","
+        else:
+            yield "".join(json.dumps(dict(r), default=_default) + "\n" for r in part)
+    if fmt == "json":
+        yield "]" if sep == "," else "[]"
+
+
+def stream_records(records, fmt="ndjson", chunk=STREAM_CHUNK):
+    """Stream an iterable of dicts as NDJSON lines or one JSON array, chunk records per write."""
+    media_type = "application/json" if fmt == "json" else "application/x-ndjson"
+    return StreamingResponse(_encode(records, fmt, chunk), media_type=media_type)
+
+
+def stream_rows(stmt, fmt="ndjson", chunk=STREAM_CHUNK):
+    """
+    Stream a Core select as NDJSON lines or one JSON array, reading it with a
+    server-side cursor in chunks so memory stays flat for any result size.
+    Uses its own session: the request-scoped one may be closed before the body is sent.
+    """
+    def rows():
+        db = SessionLocal()
+        try:
+            for part in db.execute(stmt.execution_options(yield_per=chunk)).mappings().partitions():
+                yield from part
+        finally:
+            db.close()
+
+    return stream_records(rows(), fmt, chunk)
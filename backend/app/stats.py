@@ -0,0 +1,204 @@
+"""
+Materialized per-student aggregates (student_stats).
+
+Every habit-log write folds the new rows into the student's stats row inside
+the same transaction. The row keeps the most recent WINDOW logs plus sums,
+mood counts and the current study streak derived from them, so the read
+endpoints never scan habit_logs. Work per write is bounded by WINDOW
+regardless of how long the history is.
+
+Backfill / repair:
+
+    python -m backend.app.stats rebuild [--students 1,2,3]
+"""
+import argparse
+import os
+from collections import Counter, defaultdict
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from .cache import TTLCache
+from .db import Base, SessionLocal, engine
+from ..models.habit import HabitLog
+from ..models.stats import StudentStats
+
+WINDOW = 30
+METRICS = ["sleep_hours", "study_hours", "activity_minutes", "screen_time_hours", "productivity"]
+FIELDS = ["id", "date", *METRICS, "mood"]
+_STUDY = FIELDS.index("study_hours")
+IN_CHUNK = 1000
+
+# student_id -> stats version last seen by this process. Writers drop their
+# students' entries after commit; the TTL bounds staleness from writes made by
+# other worker processes.
+known_versions = TTLCache(maxsize=100_000, ttl=5)
+
+# student_id -> what the per-student reads derive from the newest log (see
+# insights.latest), dropped together with known_versions. LATEST_CACHE_SIZE=0
+# turns it off.
+LATEST_CACHE_SIZE = int(os.getenv("LATEST_CACHE_SIZE", "50000"))
+LATEST_CACHE_TTL = float(os.getenv("LATEST_CACHE_TTL", "30"))
+latest_cache = TTLCache(maxsize=LATEST_CACHE_SIZE, ttl=LATEST_CACHE_TTL)
+
+
+def forget(student_ids):
+    for sid in student_ids:
+        known_versions.pop(sid)
+        latest_cache.pop(sid)
+
+
+def _entry(row):
+    d = row["date"]
+    return [row["id"], d.isoformat() if isinstance(d, date) else str(d), *[row.get(m) for m in METRICS], row.get("mood")]
+
+
+def entry_dict(entry):
+    """Window entry -> {"id", "date", metrics..., "mood"}."""
+    return dict(zip(FIELDS, entry))
+
+
+def _sums(entries):
+    return {m: sum((e[i] or 0) for e in entries) for i, m in enumerate(METRICS, start=2)}
+
+
+def summarize(window):
+    """Derived columns for a newest-first window."""
+    streak = 0
+    for e in window:
+        if (e[_STUDY] or 0) < 1:
+            break
+        streak += 1
+    return {
+        "window": window,
+        "last7": _sums(window[:7]),
+        "prev7": _sums(window[7:14]),
+        "last30": _sums(window),
+        "mood_counts": dict(Counter(e[-1] for e in window if e[-1] is not None).most_common()),
+        "study_streak": streak,
+    }
+
+
+def _merge(stats, entries, new_count):
+    # newest first by (date, id); a rewritten id replaces its old entry
+    merged = {e[0]: e for e in (stats.window or [])}
+    merged.update((e[0], e) for e in entries)
+    window = sorted(merged.values(), key=lambda e: (e[1], e[0]), reverse=True)[:WINDOW]
+    for k, v in summarize(window).items():
+        setattr(stats, k, v)
+    stats.version = (stats.version or 0) + 1
+    stats.log_count = (stats.log_count or 0) + new_count
+    stats.last_log_id = window[0][0]
+    stats.last_date = date.fromisoformat(window[0][1])
+
+
+def _load(db, student_ids):
+    found = {}
+    for i in range(0, len(student_ids), IN_CHUNK):
+        chunk = student_ids[i:i + IN_CHUNK]
+        for s in db.execute(select(StudentStats).where(StudentStats.student_id.in_(chunk))).scalars():
+            found[s.student_id] = s
+    return found
+
+
+def apply_logs(db, rows, new_count=None):
+    """
+    Fold freshly written logs (dicts including "id") into student_stats.
+    Runs in the caller's transaction; the caller commits. new_count maps
+    student_id -> number of rows that were inserted rather than updated
+    (defaults to all of them). Students without a stats row yet (logs that
+    predate the table) get theirs built from their full history, which
+    already includes rows written in this transaction.
+    """
+    by_student = defaultdict(list)
+    for r in rows:
+        by_student[r["student_id"]].append(_entry(r))
+    existing = _load(db, list(by_student))
+    missing = [sid for sid in by_student if sid not in existing]
+    for i in range(0, len(missing), IN_CHUNK):
+        _rebuild_chunk(db, missing[i:i + IN_CHUNK], existing={})
+    for sid, stats in existing.items():
+        entries = by_student[sid]
+        _merge(stats, entries, len(entries) if new_count is None else new_count.get(sid, 0))
+
+
+def _rebuild_chunk(db, chunk, existing=None):
+    """Recompute the stats rows of up to IN_CHUNK students from habit_logs, in the caller's transaction."""
+    rn = func.row_number().over(
+        partition_by=HabitLog.student_id,
+        order_by=(HabitLog.date.desc(), HabitLog.id.desc()),
+    ).label("rn")
+    sub = (
+        select(HabitLog.student_id, *[getattr(HabitLog, f) for f in FIELDS], rn)
+        .where(HabitLog.student_id.in_(chunk))
+        .subquery()
+    )
+    windows = defaultdict(list)
+    for r in db.execute(select(sub).where(sub.c.rn <= WINDOW).order_by(sub.c.student_id, sub.c.rn)).mappings():
+        windows[r["student_id"]].append(_entry(r))
+    counts = dict(db.execute(
+        select(HabitLog.student_id, func.count()).where(HabitLog.student_id.in_(chunk)).group_by(HabitLog.student_id)
+    ).all())
+    if existing is None:
+        existing = _load(db, chunk)
+    for sid in chunk:
+        stats = existing.get(sid)
+        if not windows.get(sid):
+            if stats is not None:
+                db.delete(stats)
+            continue
+        if stats is None:
+            stats = StudentStats(student_id=sid)
+            db.add(stats)
+        stats.window, stats.log_count = [], 0
+        _merge(stats, windows[sid], counts[sid])
+
+
+def rebuild(db, student_ids=None, commit=True):
+    """
+    Recompute stats rows from habit_logs (backfills, repairs). Commits per
+    chunk; commit=False leaves committing (and forget) to the caller.
+    """
+    if student_ids is None:
+        student_ids = [r[0] for r in db.execute(select(HabitLog.student_id).distinct())]
+    student_ids = list(student_ids)
+    for i in range(0, len(student_ids), IN_CHUNK):
+        chunk = student_ids[i:i + IN_CHUNK]
+        _rebuild_chunk(db, chunk)
+        if commit:
+            db.commit()
+            forget(chunk)
+    return len(student_ids)
+
+
+def get_stats(db, student_id):
+    """Stats row for a student, building it from habit_logs the first time (pre-existing data)."""
+    stats = db.get(StudentStats, student_id)
+    if stats is None:
+        try:
+            rebuild(db, [student_id])
+        except IntegrityError:
+            db.rollback()  # a concurrent request built it first
+        stats = db.get(StudentStats, student_id)
+    if stats is not None:
+        known_versions.set(student_id, stats.version)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.app.stats")
+    ap.add_argument("command", choices=["rebuild"])
+    ap.add_argument("--students", help="comma-separated student ids (default: all)")
+    args = ap.parse_args(argv)
+    ids = [int(s) for s in args.students.split(",")] if args.students else None
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print(f"rebuilt stats for {rebuild(db, ids)} students")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
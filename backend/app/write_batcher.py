@@ -0,0 +1,109 @@
+"""
+Group-commit writer for POST /habits/log (enable with WRITE_BATCHER=1).
+
+Requests put their validated row on a bounded queue and wait on a future. One
+background thread drains the queue and writes whatever has accumulated (up to
+WRITE_BATCH_MAX_ROWS, or after WRITE_BATCH_MAX_WAIT_MS) with one batched
+upsert + student_stats update + commit, then resolves each future with the
+row's id. A peak of N concurrent submits costs a handful of
+fsyncs instead of N. When the queue is full, submit raises QueueFull and the
+route answers 503 with Retry-After.
+"""
+import os
+import queue
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from .db import SessionLocal
+from .ingest import insert_chunk
+from .micro_batch import MicroBatcher
+
+WRITE_BATCHER = os.getenv("WRITE_BATCHER", "0") == "1"
+WRITE_BATCH_MAX_ROWS = int(os.getenv("WRITE_BATCH_MAX_ROWS", "500"))
+WRITE_BATCH_MAX_WAIT_MS = float(os.getenv("WRITE_BATCH_MAX_WAIT_MS", "5"))
+WRITE_QUEUE_MAX = int(os.getenv("WRITE_QUEUE_MAX", "10000"))
+# how long a submit may block on a full queue before it is rejected
+WRITE_QUEUE_WAIT_MS = float(os.getenv("WRITE_QUEUE_WAIT_MS", "0"))
+RETRY_AFTER_S = 1
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WriteBatcher(MicroBatcher):
+    thread_name = "write-batcher"
+
+    def __init__(self, max_rows=WRITE_BATCH_MAX_ROWS, max_wait_ms=WRITE_BATCH_MAX_WAIT_MS,
+                 queue_max=WRITE_QUEUE_MAX, queue_wait_ms=WRITE_QUEUE_WAIT_MS, session_factory=SessionLocal):
+        super().__init__(max_rows, max_wait_ms, queue_max)
+        self.queue_wait = queue_wait_ms / 1000
+        self.session_factory = session_factory
+        self.flushes = 0
+        self.rows = 0
+        self.failed = 0
+        self.rejected = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def submit(self, row):
+        """Queue a validated HabitCreate dict -> Future resolving to its log id."""
+        self.start()
+        fut = Future()
+        try:
+            if self.queue_wait:
+                self._queue.put((dict(row), fut), timeout=self.queue_wait)
+            else:
+                self._queue.put_nowait((dict(row), fut))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFull(f"write queue full ({self._queue.maxsize} pending)")
+        return fut
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            try:
+                insert_chunk(db, [row for row, _ in batch])
+                for row, fut in batch:
+                    fut.set_result(row["id"])
+            except SQLAlchemyError:
+                # isolate the offending row(s) so one bad log doesn't fail the group
+                for row, fut in batch:
+                    try:
+                        insert_chunk(db, [row])
+                        fut.set_result(row["id"])
+                    except SQLAlchemyError as e:
+                        self.failed += 1
+                        fut.set_exception(e)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.rows += len(batch)
+        self.flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+
+    def stats(self):
+        return {
+            "enabled": WRITE_BATCHER,
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_batch_rows": round(self.rows / self.flushes, 2) if self.flushes else 0,
+            "avg_flush_ms": round(self.flush_seconds / self.flushes * 1000, 3) if self.flushes else 0,
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 3),
+        }
+
+
+write_batcher = WriteBatcher()
@@ -1,4 +1,24 @@
-import random
+import json
+import logging
+import math
+import os
+import threading
+from concurrent.futures import Future
+
+from ..app import metrics
+from ..app.cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+# "rules" (built-in, instant) or "ollama" (HTTP /api/generate, e.g. `ollama serve`
+# or the stub in backend/ml/coach_stub.py)
+COACH_BACKEND = os.getenv("COACH_BACKEND", "rules")
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+COACH_MODEL = os.getenv("COACH_MODEL", "llama3.2")
+COACH_TIMEOUT = float(os.getenv("COACH_TIMEOUT", "60"))
+COACH_MAX_CONNECTIONS = int(os.getenv("COACH_MAX_CONNECTIONS", "8"))
+COACH_CACHE_SIZE = int(os.getenv("COACH_CACHE_SIZE", "4096"))
+COACH_CACHE_TTL = float(os.getenv("COACH_CACHE_TTL", "3600"))
 
 def generate_ai_coach_message(mood: str, productivity: float, study_hours: float, personality: str=None, goals: str=None) -> str:
     mood = (mood or "").lower()
@@ -46,3 +66,188 @@ def generate_ai_coach_message(mood: str, productivity: float, study_hours: float
     # pick 2-3 messages to return as a single coherent msg
     sel = base_msgs[:3] if len(base_msgs)>=3 else base_msgs
     return " ".join(sel)
+
+
+# ---------------- Backends ----------------
+def coach_key(mood, productivity, study_hours, personality=None, goals=None):
+    """
+    Bucketed inputs: nearby numbers get the same advice, so they share a cache
+    entry. Productivity floors to the integer and study hours to the half hour,
+    which keeps every threshold the rules coach uses intact.
+    """
+    return (
+        (mood or "").lower(),
+        math.floor(productivity or 0),
+        math.floor((study_hours or 0) * 2) / 2,
+        (personality or "").lower(),
+        (goals or "").strip(),
+    )
+
+
+def build_prompt(mood, productivity, study_hours, personality, goals):
+    return (
+        "You are a supportive study and wellness coach for a student. "
+        "Reply with 2-3 short, concrete sentences.\n"
+        f"Personality: {personality or 'unknown'}\n"
+        f"Goals: {goals or 'not set'}\n"
+        f"Today: mood {mood or 'unknown'}, productivity {productivity}/10, {study_hours} study hours."
+    )
+
+
+class RulesCoach:
+    name = "rules"
+
+    def generate(self, key):
+        mood, productivity, study_hours, personality, goals = key
+        return generate_ai_coach_message(mood, productivity, study_hours, personality or None, goals or None)
+
+    def stream(self, key):
+        words = self.generate(key).split(" ")
+        for i, w in enumerate(words):
+            yield w if i == 0 else " " + w
+
+
+class OllamaCoach:
+    """Client for an Ollama-compatible /api/generate; one pooled httpx.Client per process."""
+    name = "ollama"
+
+    def __init__(self, url=OLLAMA_URL, model=COACH_MODEL, timeout=COACH_TIMEOUT):
+        import httpx  # only needed when this backend is selected
+        self.model = model
+        self.client = httpx.Client(
+            base_url=url,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=COACH_MAX_CONNECTIONS, max_keepalive_connections=COACH_MAX_CONNECTIONS),
+        )
+
+    def _payload(self, key, stream):
+        return {"model": self.model, "prompt": build_prompt(*key), "stream": stream}
+
+    def generate(self, key):
+        r = self.client.post("/api/generate", json=self._payload(key, False))
+        r.raise_for_status()
+        return r.json()["response"].strip()
+
+    def stream(self, key):
+        with self.client.stream("POST", "/api/generate", json=self._payload(key, True)) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                part = json.loads(line)
+                if part.get("response"):
+                    yield part["response"]
+                if part.get("done"):
+                    break
+
+
+# ---------------- Cached, coalesced entry points ----------------
+class Coach:
+    def __init__(self, backend):
+        self.backend = backend
+        self.fallback = RulesCoach()
+        self.cache = TTLCache(maxsize=COACH_CACHE_SIZE, ttl=COACH_CACHE_TTL)
+        self.coalesced = 0
+        self.failures = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _generate(self, key):
+        """-> (text, cacheable)"""
+        try:
+            with metrics.timed("coach_backend"):
+                return self.backend.generate(key), True
+        except Exception as e:
+            # a slow or missing LLM shouldn't take the coach endpoint down
+            self.failures += 1
+            log.warning("coach backend %s failed (%s); using rules", self.backend.name, e)
+            return self.fallback.generate(key), False
+
+    def message(self, key):
+        """Cached message for key; identical concurrent requests share one backend call."""
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            text = fut.result()
+            # None: the leader was a stream whose client went away mid-answer
+            return text if text is not None else self.message(key)
+        try:
+            text, cacheable = self._generate(key)
+            if cacheable:
+                self.cache.set(key, text)
+            fut.set_result(text)
+            return text
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stream(self, key):
+        """
+        Yield message chunks as the backend produces them. Cache hits and
+        requests joining an in-flight generation get the finished text at once.
+        """
+        text = self.cache.get(key)
+        if text is not None:
+            yield text
+            return
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            text = fut.result()
+            yield text if text is not None else self.message(key)
+            return
+        parts = []
+        try:
+            for part in self.backend.stream(key):
+                parts.append(part)
+                yield part
+            text = "".join(parts).strip()
+            self.cache.set(key, text)
+        except Exception as e:
+            self.failures += 1
+            log.warning("coach backend %s stream failed (%s); using rules", self.backend.name, e)
+            text = self.fallback.generate(key)  # never cache a fallback or a half-sent answer
+            if not parts:
+                yield text
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_result(text)
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+        }
+
+
+_coach = None
+_coach_lock = threading.Lock()
+
+
+def get_coach():
+    global _coach
+    with _coach_lock:
+        if _coach is None:
+            _coach = Coach(OllamaCoach() if COACH_BACKEND == "ollama" else RulesCoach())
+        return _coach
@@ -0,0 +1,94 @@
+"""
+Stand-in for a local Ollama server: POST /api/generate with the same request
+and response shapes (NDJSON chunks when "stream" is true), answering with the
+rules coach after a configurable per-token delay. Lets the LLM coach path be
+run and load-tested without a model.
+
+    python -m backend.ml.coach_stub --port 11434 --token-ms 40 --first-token-ms 300
+    COACH_BACKEND=ollama OLLAMA_URL=http://localhost:11434 uvicorn backend.app.main:app
+"""
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .coach_llm import generate_ai_coach_message
+
+
+def _reply(prompt):
+    # pull the fields back out of coach_llm.build_prompt's text
+    field = lambda name: (re.search(rf"{name}: ([^\n]*)", prompt) or [None, ""])[1]
+    today = re.search(r"mood (\S+), productivity ([\d.]+)/10, ([\d.]+) study hours", prompt)
+    mood, productivity, study = today.groups() if today else ("", "5", "0")
+    return generate_ai_coach_message(mood, float(productivity), float(study), field("Personality"), field("Goals"))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    token_delay = 0.04
+    first_token_delay = 0.3
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        words = _reply(body.get("prompt", "")).split(" ")
+        model = body.get("model", "stub")
+        time.sleep(self.first_token_delay)
+        if not body.get("stream", True):
+            time.sleep(self.token_delay * len(words))
+            self._send(json.dumps({"model": model, "response": " ".join(words), "done": True}).encode())
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, w in enumerate(words):
+            self._chunk({"model": model, "response": w if i == 0 else " " + w, "done": False})
+            time.sleep(self.token_delay)
+        self._chunk({"model": model, "response": "", "done": True})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, data):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, obj):
+        data = json.dumps(obj).encode() + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def serve(host="127.0.0.1", port=11434, token_ms=40, first_token_ms=300):
+    Handler.token_delay = token_ms / 1000
+    Handler.first_token_delay = first_token_ms / 1000
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.ml.coach_stub")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11434)
+    ap.add_argument("--token-ms", type=float, default=40)
+    ap.add_argument("--first-token-ms", type=float, default=300)
+    args = ap.parse_args(argv)
+    server = serve(args.host, args.port, args.token_ms, args.first_token_ms)
+    print(f"coach stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
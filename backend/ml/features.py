@@ -0,0 +1,85 @@
+"""
+Model feature definitions, shared by training and serving.
+
+Each (student, date) gets the day's raw values plus 7-day rolling features per
+metric over the student's logs dated within the last WINDOW_DAYS days
+(inclusive of the day itself):
+
+    <metric>_mean7   mean of the window
+    <metric>_slope7  least-squares slope per day across the window (0 with one day)
+    <metric>_delta7  the day's value minus the window mean
+    logs7            number of logged days in the window
+
+rolling_features is the only implementation: the feature store calls it on a
+few days around each new log and training on whole histories. Windows are
+summed lag by lag in a fixed order, so a row comes out bit-identical whichever
+batch it was computed in.
+
+numpy/pandas are imported on first call, so the column lists stay cheap to
+import (the ORM model and the API import them at startup).
+"""
+RAW_FEATURES = ["sleep_hours","study_hours","activity_minutes","screen_time_hours","productivity"]
+WINDOW_DAYS = 7
+ROLLING_FEATURES = [f"{m}_{kind}7" for m in RAW_FEATURES for kind in ("mean", "slope", "delta")] + ["logs7"]
+MODEL_FEATURES = [*RAW_FEATURES, *ROLLING_FEATURES]
+
+
+def daily(logs):
+    """One row per (student_id, date): the day's last log (highest id)."""
+    return (
+        logs.sort_values(["student_id", "date", "id"], kind="stable")
+        .drop_duplicates(["student_id", "date"], keep="last")
+        .reset_index(drop=True)
+    )
+
+
+def rolling_features(logs):
+    """
+    logs: DataFrame with id, student_id, date and RAW_FEATURES (any order, may
+    span many students) -> one row per (student_id, date) with student_id, date,
+    log_id and MODEL_FEATURES as float64.
+    """
+    import numpy as np
+    import pandas as pd
+
+    d = daily(logs)
+    n_rows = len(d)
+    day = pd.to_datetime(d["date"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+    sid = d["student_id"].to_numpy(np.int64)
+    # rows are sorted by (student, day); a window starts at the first row of the
+    # same student dated within WINDOW_DAYS - 1 days
+    key = (sid << 32) + day
+    start = np.searchsorted(key, key - (WINDOW_DAYS - 1), side="left")
+    Y = {m: pd.to_numeric(d[m], errors="coerce").fillna(0).to_numpy(np.float64) for m in RAW_FEATURES}
+
+    idx = np.arange(n_rows)
+    n = np.zeros(n_rows)
+    su = np.zeros(n_rows)
+    suu = np.zeros(n_rows)
+    sy = {m: np.zeros(n_rows) for m in RAW_FEATURES}
+    suy = {m: np.zeros(n_rows) for m in RAW_FEATURES}
+    # one row per day, so a window holds at most WINDOW_DAYS rows
+    for lag in range(WINDOW_DAYS):
+        j = idx - lag
+        ok = j >= start
+        jj = np.where(ok, j, 0)
+        w = ok.astype(np.float64)
+        u = (day[jj] - day) * w  # days relative to the row's own date (<= 0)
+        n += w
+        su += u
+        suu += u * u
+        for m in RAW_FEATURES:
+            y = Y[m][jj] * w
+            sy[m] += y
+            suy[m] += u * y
+
+    out = {"student_id": sid, "date": d["date"].to_numpy(), "log_id": d["id"].to_numpy(np.int64)}
+    den = n * suu - su * su
+    for m in RAW_FEATURES:
+        mean = sy[m] / n
+        out[m] = Y[m]
+        out[f"{m}_mean7"] = mean
+        out[f"{m}_slope7"] = np.divide(n * suy[m] - su * sy[m], den, out=np.zeros(n_rows), where=den > 0)
+        out[f"{m}_delta7"] = Y[m] - mean
+    out["logs7"] = n
+    return pd.DataFrame(out, columns=["student_id", "date", "log_id", *MODEL_FEATURES])
@@ -0,0 +1,101 @@
+import json
+import os
+
+import numpy as np
+
+# node tables written by save(); all plain dtypes so load() can memory-map them
+ARRAYS = ("feature", "threshold", "children", "is_leaf", "value", "roots", "classes")
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier flattened into contiguous node tables
+    (feature, threshold, children, per-leaf class probabilities). All trees are
+    walked together with vectorized gathers, for one row or a whole batch.
+
+    Leaves point at themselves with an +inf threshold, so a step from a leaf is
+    a no-op; the walk only advances (row, tree) pairs that are still inside the tree.
+
+    The tables are read-only during prediction, so save()/load(mmap_mode="r")
+    lets every worker process serve from one page-cached copy.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, depth, is_leaf=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = depth
+        self.n_trees = len(roots)
+        self.is_leaf = children[:, 0] == np.arange(len(children)) if is_leaf is None else is_leaf
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        trees = [est.tree_ for est in forest.estimators_]
+        offsets = np.cumsum([0] + [t.node_count for t in trees[:-1]])
+        feature, threshold, left, right, value = [], [], [], [], []
+        for off, t in zip(offsets, trees):
+            leaf = t.children_left == -1
+            idx = np.arange(t.node_count) + off
+            feature.append(np.where(leaf, 0, t.feature))
+            threshold.append(np.where(leaf, np.inf, t.threshold))
+            left.append(np.where(leaf, idx, t.children_left + off))
+            right.append(np.where(leaf, idx, t.children_right + off))
+            # same normalisation as DecisionTreeClassifier.predict_proba
+            v = t.value[:, 0, :].astype(np.float64)
+            norm = v.sum(axis=1, keepdims=True)
+            norm[norm == 0] = 1.0
+            value.append(v / norm)
+        classes = forest.classes_
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(feature), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(threshold), dtype=np.float64),
+            children=np.ascontiguousarray(np.column_stack([np.concatenate(left), np.concatenate(right)]), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(value)),
+            roots=offsets.astype(np.intp),
+            # object labels (mood strings) become a fixed-width str array so they can be mapped too
+            classes=classes.astype(str) if classes.dtype == object else classes,
+            depth=max(t.max_depth for t in trees),
+        )
+
+    def save(self, path):
+        """Write the node tables as .npy files (plus meta.json) into directory path."""
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, "classes_" if name == "classes" else name))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"depth": int(self.depth), "n_trees": self.n_trees}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Open tables written by save(); with mmap_mode the pages come from the OS page cache."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+        return cls(depth=meta["depth"], **arrays)
+
+    def apply(self, X):
+        """Leaf node index per (row, tree)."""
+        # scikit-learn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n, n_features = X.shape
+        flat_x = X.ravel()
+        node = np.tile(self.roots, n)
+        x_base = np.repeat(np.arange(n) * n_features, self.n_trees)
+        # only (row, tree) pairs that haven't reached a leaf take another step
+        active = np.flatnonzero(~self.is_leaf[node])
+        while active.size:
+            cur = node[active]
+            go_right = ~(flat_x[x_base[active] + self.feature[cur]] <= self.threshold[cur])
+            nxt = self.children[cur, go_right.view(np.int8)]
+            node[active] = nxt
+            active = active[~self.is_leaf[nxt]]
+        return node.reshape(n, self.n_trees)
+
+    def predict_proba(self, X):
+        return self.value[self.apply(X)].sum(axis=1) / self.n_trees
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
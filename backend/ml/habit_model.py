@@ -1,74 +1,537 @@
 import os
-import numpy as np
-import joblib
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+import json
+import shutil
+import time
+import threading
+from datetime import datetime
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows: the training lock only covers this process
+    fcntl = None
+
+from ..app import metrics
+from .features import MODEL_FEATURES, RAW_FEATURES
+
+# numpy, joblib and scikit-learn are imported where they're used: importing this
+# module (and so the API) stays cheap, and nothing is loaded until load()
 
 MODEL_DIR = "models"
 HABIT_MODEL_PATH = os.path.join(MODEL_DIR, "habit_predict.joblib")
 MOOD_MODEL_PATH = os.path.join(MODEL_DIR, "mood_predict.joblib")
+VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+CURRENT_PATH = os.path.join(MODEL_DIR, "CURRENT")
+TRAIN_LOCK_PATH = os.path.join(MODEL_DIR, "train.lock")
+# saved versions kept on disk; older ones are deleted after each publish
+# (the current version and the one it rolls back to always stay)
+KEEP_VERSIONS = max(2, int(os.getenv("MODEL_KEEP_VERSIONS", "10")))
+# "compiled" serves predictions from flattened node tables (forest_engine) instead of sklearn;
+# the tables are saved with each version and memory-mapped, so worker processes share one copy
+INFERENCE_ENGINE = os.getenv("HABIT_INFERENCE_ENGINE", "sklearn")
+# past roughly this many rows sklearn's C tree walk beats the numpy gathers
+COMPILED_MAX_BATCH = 1024
+
+# raw per-log values; models trained since the feature store also use the rolling
+# MODEL_FEATURES, and each version's manifest records the columns it was fitted on
+FEATURE_COLUMNS = RAW_FEATURES
+
+N_ESTIMATORS = 100
+# incremental updates add trees fitted on the new logs only (warm start)
+MIN_NEW_TREES, MAX_NEW_TREES = 2, 25
+MAX_TREES = 300          # past this many trees the next run is a full refit
+FULL_REFIT_EVERY = 30    # incremental runs between forced full refits
+
+
+def _fit_forest(X, y, n_jobs, base=None, n_new=0):
+    """
+    Runs in a worker process: split, fit and score one RandomForest -> (clf, accuracy).
+    With base, warm-start it and grow n_new extra trees on (X, y) instead of fitting from scratch.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(X,y,test_size=0.2,random_state=42)
+    if base is None:
+        clf = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=42, n_jobs=n_jobs)
+    else:
+        clf = base
+        clf.set_params(warm_start=True, n_estimators=len(clf.estimators_) + n_new, n_jobs=n_jobs)
+    clf.fit(X_train,y_train)
+    clf.set_params(warm_start=False)
+    acc = accuracy_score(y_test, clf.predict(X_test))
+    clf.set_params(n_jobs=None)  # serving predicts are small; don't spin up a thread pool per call
+    return clf, acc
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_manifest(version):
+    with open(os.path.join(VERSIONS_DIR, version, "manifest.json")) as f:
+        return json.load(f)
+
+
+def list_versions():
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    return sorted(v for v in os.listdir(VERSIONS_DIR)
+                  if os.path.exists(os.path.join(VERSIONS_DIR, v, "manifest.json")))
+
+
+def _current_stamp():
+    try:
+        st = os.stat(CURRENT_PATH)
+    except FileNotFoundError:
+        return None
+    # CURRENT is only ever replaced (os.replace), so a new version means a new inode
+    return st.st_ino, st.st_mtime_ns
+
+
+class _FileLock:
+    """
+    Reentrant lock shared by every process on the same models/ dir (flock):
+    worker processes train and publish one at a time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._local.acquire()
+        if self._depth == 0 and fcntl is not None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                self._local.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._local.release()
+
+
+def prune_versions(keep=KEEP_VERSIONS, protected=()):
+    """
+    Delete all but the newest keep saved versions -> removed versions. Versions
+    in protected, and those holding artifacts a kept version still uses (a
+    carried-over mood model), stay.
+    """
+    versions = list_versions()
+    kept = set(versions[-keep:]) | {v for v in protected if v in versions}
+    for v in list(kept):
+        manifest = read_manifest(v)
+        for key in ("habit", "habit_tables", "mood", "mood_tables"):
+            parts = (manifest.get(key) or "").split("/")
+            if parts[0] == "versions" and len(parts) > 1:
+                kept.add(parts[1])
+    old = [v for v in versions if v not in kept]
+    for v in old:
+        shutil.rmtree(os.path.join(VERSIONS_DIR, v), ignore_errors=True)
+    return old
+
+
+class _Lazy:
+    """A joblib artifact loaded on first get(); compiled serving only needs the sklearn forest for big batches and training."""
+
+    def __init__(self, path=None, obj=None):
+        self.path = path
+        self._obj = obj
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._obj is None and self.path:
+            with self._lock:
+                if self._obj is None:
+                    import joblib
+                    self._obj = joblib.load(self.path)
+        return self._obj
 
-FEATURE_COLUMNS = ["sleep_hours","study_hours","activity_minutes","screen_time_hours","productivity"]
 
 class HabitModel:
     def __init__(self):
         os.makedirs(MODEL_DIR, exist_ok=True)
-        self.model = None
-        self.mood_model = None
-        if os.path.exists(HABIT_MODEL_PATH):
-            self.model = joblib.load(HABIT_MODEL_PATH)
-        if os.path.exists(MOOD_MODEL_PATH):
-            self.mood_model = joblib.load(MOOD_MODEL_PATH)
+        self.version = None
+        self.features = FEATURE_COLUMNS
+        self.engine = INFERENCE_ENGINE
+        self._serving = (_Lazy(), _Lazy(), (None, None), self.features)
+        self._lock = threading.RLock()
+        # taken before _lock, never inside it
+        self.train_lock = _FileLock(TRAIN_LOCK_PATH)
+        self._stamp = None
+        self._published = (None, None)  # (CURRENT stamp, version it names)
+        self.loaded = False
+        self.reloads = {"count": 0, "last_ms": None, "last_at": None}
+
+    def load(self):
+        """
+        Load the current version (or the pre-versioning single-file models) once.
+        The app calls this from its lifespan hook; anything that predicts or
+        trains before that loads on first use.
+        """
+        with self._lock:
+            if self.loaded:
+                return
+            self._stamp = _current_stamp()
+            if self._stamp is not None:
+                with open(CURRENT_PATH) as f:
+                    self.load_version(f.read().strip())
+                return
+            self._install(
+                None,
+                _Lazy(HABIT_MODEL_PATH if os.path.exists(HABIT_MODEL_PATH) else None),
+                _Lazy(MOOD_MODEL_PATH if os.path.exists(MOOD_MODEL_PATH) else None),
+            )
+
+    @property
+    def model(self):
+        return self._serving[0].get()
+
+    @property
+    def mood_model(self):
+        return self._serving[1].get()
+
+    def refresh(self):
+        """
+        Pick up a version another process made current. Costs one stat() when
+        nothing changed; while one thread loads the new version the others keep
+        serving the old one.
+        """
+        if not self.loaded:
+            self.load()
+            return False
+        stamp = _current_stamp()
+        if stamp == self._stamp or stamp is None or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if stamp == self._stamp:
+                return False
+            t = time.perf_counter()
+            with open(CURRENT_PATH) as f:
+                version = f.read().strip()
+            changed = version != self.version
+            if changed:
+                self.load_version(version)
+                self.reloads = {
+                    "count": self.reloads["count"] + 1,
+                    "last_ms": round((time.perf_counter() - t) * 1000, 2),
+                    "last_at": time.time(),
+                }
+            self._stamp = stamp
+            return changed
+        finally:
+            self._lock.release()
+
+    def published_version(self):
+        """
+        The version CURRENT names, without loading it (one stat() when nothing
+        changed); the in-process version when there is no CURRENT.
+        """
+        stamp = _current_stamp()
+        if stamp is None:
+            return self.version
+        published = self._published
+        if published[0] != stamp:
+            with open(CURRENT_PATH) as f:
+                published = self._published = (stamp, f.read().strip())
+        return published[1]
+
+    def featurize_row(self, row, features=None):
+        import numpy as np
+        return np.array([row.get(c) or 0 for c in (features or self.features)], dtype=float).reshape(1,-1)
+
+    def _predictors(self, n_rows=1):
+        """
+        (habit, mood, feature columns) for the active engine, read in one go so
+        all three come from the same version.
+        """
+        self.refresh()
+        habit, mood, compiled, features = self._serving
+        if self.engine == "compiled" and compiled[0] is not None and n_rows <= COMPILED_MAX_BATCH:
+            return (*compiled, features)
+        return habit.get(), mood.get(), features
 
-    def featurize_row(self, row):
-        return np.array([row.get(c,0) for c in FEATURE_COLUMNS]).reshape(1,-1)
+    @staticmethod
+    def _timed(kind, model, rows=1):
+        """Inference timer labelled with the engine that actually serves (compiled falls back for big batches)."""
+        metrics.INFERENCE_ROWS.inc(kind, amount=rows)
+        engine = "compiled" if type(model).__name__ == "CompiledForest" else "sklearn"
+        return metrics.timed("inference", metrics.INFERENCE_SECONDS, kind, engine)
 
     def predict_break(self, log):
-        if not self.model or not hasattr(self.model, "classes_"):
+        """log: dict with the model's feature columns (a feature-store row, or a raw log for older versions)."""
+        model, _, features = self._predictors()
+        if not model or not hasattr(model, "classes_"):
             return 0.5
-        x = self.featurize_row(log)
-        p = self.model.predict_proba(x)[0][1]
+        x = self.featurize_row(log, features)
+        with self._timed("break", model):
+            p = model.predict_proba(x)[0][1]
         return float(p)
 
+    def predict_break_batch(self, X, columns=FEATURE_COLUMNS):
+        """
+        X: 2-D array (one row per student) whose columns are named by columns
+        -> array of break probabilities. Features the model needs but X lacks are 0.
+        """
+        import numpy as np
+        X = np.nan_to_num(np.asarray(X, dtype=float), nan=0.0)
+        model, _, features = self._predictors(len(X))
+        if not model or not hasattr(model, "classes_"):
+            return np.full(len(X), 0.5)
+        if not len(X):
+            return np.empty(0)
+        if list(columns) != list(features):
+            pos = {c: i for i, c in enumerate(columns)}
+            X = np.column_stack([X[:, pos[c]] if c in pos else np.zeros(len(X)) for c in features])
+        with self._timed("break_batch", model, len(X)):
+            return model.predict_proba(X)[:, 1]
+
+    def predict_mood_batch(self, X, columns=FEATURE_COLUMNS):
+        """Like predict_break_batch -> array of mood labels ("neutral" without a model)."""
+        import numpy as np
+        X = np.nan_to_num(np.asarray(X, dtype=float), nan=0.0)
+        _, mood_model, features = self._predictors(len(X))
+        if not mood_model or not hasattr(mood_model, "classes_"):
+            return np.full(len(X), "neutral", dtype=object)
+        if not len(X):
+            return np.empty(0, dtype=object)
+        if list(columns) != list(features):
+            pos = {c: i for i, c in enumerate(columns)}
+            X = np.column_stack([X[:, pos[c]] if c in pos else np.zeros(len(X)) for c in features])
+        with self._timed("mood_batch", mood_model, len(X)):
+            return mood_model.predict(X).astype(str)
+
     def predict_mood(self, log):
-        if not self.mood_model or not hasattr(self.mood_model, "classes_"):
+        _, mood_model, features = self._predictors()
+        if not mood_model or not hasattr(mood_model, "classes_"):
             return "neutral"
-        x = self.featurize_row(log)
-        pred = self.mood_model.predict(x)[0]
+        x = self.featurize_row(log, features)
+        with self._timed("mood", mood_model):
+            pred = mood_model.predict(x)[0]
         return str(pred)
 
-    def train_from_dataframe(self, df):
+    # ---------------- Versioned artifacts ----------------
+    def _compile(self, estimator, tables):
+        from .forest_engine import CompiledForest
+        if tables and os.path.exists(tables):
+            return CompiledForest.load(tables)
+        model = estimator.get()  # versions saved before the tables existed
+        return CompiledForest.from_sklearn(model) if hasattr(model, "estimators_") else None
+
+    def _install(self, version, habit, mood, features=FEATURE_COLUMNS, tables=(None, None)):
+        """habit/mood: _Lazy estimators; tables: their saved node-table dirs (or None)."""
+        # predict_* read _serving once, so in-flight calls finish on the old objects
+        compiled = (None, None)
+        if self.engine == "compiled":
+            compiled = (self._compile(habit, tables[0]), self._compile(mood, tables[1]))
+        if compiled[0] is None:
+            habit.get(), mood.get()  # sklearn serving: load now rather than on the first request
+        with self._lock:
+            self.version = version
+            self.features = list(features)
+            self._serving = (habit, mood, compiled, self.features)
+            self.loaded = True
+
+    def load_version(self, version):
+        """Load a saved version from disk and swap it in."""
+        manifest = read_manifest(version)
+        path = lambda key: os.path.join(MODEL_DIR, manifest[key]) if manifest.get(key) else None
+        self._install(
+            version, _Lazy(path("habit")), _Lazy(path("mood")),
+            manifest.get("features", FEATURE_COLUMNS), (path("habit_tables"), path("mood_tables")),
+        )
+        return manifest
+
+    def _publish(self, version):
+        # our own write; refresh() re-reads CURRENT once in case another process raced us
+        _write_atomic(CURRENT_PATH, version)
+        self._stamp = None
+
+    def activate(self, version):
+        """Make version current on disk (atomic pointer swap) and in this process."""
+        with self.train_lock, self._lock:
+            manifest = self.load_version(version)
+            self._publish(version)
+        return manifest
+
+    def rollback(self, version=None):
+        """Re-activate version, or the version that was current before the active one."""
+        self.load()
+        if version is None:
+            if not self.version:
+                raise ValueError("no active model version to roll back from")
+            version = read_manifest(self.version).get("previous")
+            if not version:
+                raise ValueError("no previous model version")
+        if version not in list_versions():
+            raise ValueError(f"unknown model version {version}")
+        return self.activate(version)
+
+    @property
+    def manifest(self):
+        return read_manifest(self.version) if self.version else {}
+
+    def _save_version(self, clf, mclf, metrics, keep_mood=True, **meta):
+        """Write artifacts into a fresh versions/<version> dir; the dir appears atomically."""
+        import joblib
+        from .forest_engine import CompiledForest
+        version = datetime.now().strftime("v%Y%m%dT%H%M%S%f")
+        tmp = os.path.join(VERSIONS_DIR, f".{version}.tmp")
+        os.makedirs(tmp)
+        joblib.dump(clf, os.path.join(tmp, "habit_predict.joblib"))
+        CompiledForest.from_sklearn(clf).save(os.path.join(tmp, "habit_forest"))
+        manifest = {
+            "version": version,
+            "created_at": time.time(),
+            "previous": self.version,
+            "habit": f"versions/{version}/habit_predict.joblib",
+            "habit_tables": f"versions/{version}/habit_forest",
+            "mood": None,
+            "mood_tables": None,
+            "metrics": metrics,
+            **meta,
+        }
+        if mclf is not None:
+            joblib.dump(mclf, os.path.join(tmp, "mood_predict.joblib"))
+            CompiledForest.from_sklearn(mclf).save(os.path.join(tmp, "mood_forest"))
+            manifest["mood"] = f"versions/{version}/mood_predict.joblib"
+            manifest["mood_tables"] = f"versions/{version}/mood_forest"
+        elif keep_mood and self.version:
+            # no new mood model: keep serving the current one
+            previous = read_manifest(self.version)
+            manifest["mood"] = previous.get("mood")
+            manifest["mood_tables"] = previous.get("mood_tables")
+        elif keep_mood and os.path.exists(MOOD_MODEL_PATH):
+            manifest["mood"] = os.path.relpath(MOOD_MODEL_PATH, MODEL_DIR)
+        _write_atomic(os.path.join(tmp, "manifest.json"), json.dumps(manifest, indent=2))
+        os.replace(tmp, os.path.join(VERSIONS_DIR, version))
+        return version
+
+    def _fit_and_publish(self, df, base=None, base_mood=None, n_new=0, watermark=None, **meta):
+        """
+        Fit (or extend base) and publish a new version. Holds the cross-process
+        training lock throughout, so workers publish one at a time and each
+        builds on the version the previous one published.
+        """
+        with self.train_lock:
+            self.refresh()  # the new version's "previous" and carried-over mood model come from the current one
+            features = [c for c in MODEL_FEATURES if c in df.columns]
+            X = df[features].fillna(0).values
+            y = df["break_tomorrow"].values
+            train_mood = "mood" in df.columns and df["mood"].notna().sum()>10
+            if base is not None and base_mood is None:
+                train_mood = False  # nothing to extend; keep the current mood model
+
+            cores = os.cpu_count() or 1
+            n_jobs = max(1, cores // 2) if train_mood else cores
+            with ProcessPoolExecutor(max_workers=2 if train_mood else 1, mp_context=mp.get_context("spawn")) as pool:
+                habit_fut = pool.submit(_fit_forest, X, y, n_jobs, base, n_new)
+                mood_fut = pool.submit(_fit_forest, X, df["mood"].astype(str).to_numpy(dtype=object), n_jobs, base_mood, n_new) if train_mood else None
+                clf, acc = habit_fut.result()
+                mclf, macc = mood_fut.result() if mood_fut else (None, None)
+
+            metrics = {"habit_acc": round(float(acc),3)}
+            if mclf is not None:
+                metrics["mood_acc"] = round(float(macc),3)
+            if "id" in df.columns:
+                # watermark: (last_log_id, last_update_seq) read before df was loaded; the
+                # incremental set leaves out its newest rows, so df's own max id would lag
+                last_log_id, update_seq = watermark or (int(df["id"].max()), None)
+                meta["watermark"] = {"last_log_id": int(last_log_id), "last_date": str(df["date"].max())[:10]}
+                if update_seq is not None:
+                    meta["watermark"]["last_update_seq"] = int(update_seq)
+            os.makedirs(VERSIONS_DIR, exist_ok=True)
+            with self._lock:
+                # an older mood model fitted on other columns can't be carried over
+                keep_mood = features == self.features
+                version = self._save_version(clf, mclf, metrics, keep_mood=keep_mood, features=features, **meta)
+                self._publish(version)
+                manifest = read_manifest(version)
+                mood = _Lazy(obj=mclf) if mclf is not None else (self._serving[1] if keep_mood else _Lazy())
+                tables = [os.path.join(MODEL_DIR, manifest[k]) if manifest.get(k) else None for k in ("habit_tables", "mood_tables")]
+                self._install(version, _Lazy(obj=clf), mood, features, tables)
+            prune_versions(protected={version, manifest.get("previous")})
+            return {**metrics, "version": version, "mode": meta["mode"], "trees": len(clf.estimators_)}
+
+    def train_from_dataframe(self, df, watermark=None):
         """
-        df: pandas DataFrame with feature columns and 'break_tomorrow' (0/1) and 'mood' labels
+        df: pandas DataFrame with feature columns and 'break_tomorrow' (0/1) and 'mood' labels;
+        watermark: (last log id, last in-place rewrite seq) df reflects, read before loading it
+
+        The habit and mood forests fit in parallel worker processes, then the new
+        version is written to disk and swapped in atomically.
         """
-        # Train habit break model
-        X = df[FEATURE_COLUMNS].fillna(0).values
-        y = df["break_tomorrow"].values
-        if len(y) < 10:
+        if len(df) < 10:
             return {"error":"not enough data to train"}
-        X_train, X_test, y_train, y_test = train_test_split(X,y,test_size=0.2,random_state=42)
-        clf = RandomForestClassifier(n_estimators=100, random_state=42)
-        clf.fit(X_train,y_train)
-        preds = clf.predict(X_test)
-        acc = accuracy_score(y_test,preds)
-        joblib.dump(clf, HABIT_MODEL_PATH)
-        self.model = clf
-
-        # Train mood predictor if 'mood' exists
-        mood_info = {}
-        if "mood" in df.columns and df["mood"].notna().sum()>10:
-            X2 = df[FEATURE_COLUMNS].fillna(0).values
-            y2 = df["mood"].astype(str).values
-            X2_train,X2_test,y2_train,y2_test = train_test_split(X2,y2,test_size=0.2,random_state=42)
-            mclf = RandomForestClassifier(n_estimators=100, random_state=42)
-            mclf.fit(X2_train,y2_train)
-            macc = accuracy_score(y2_test, mclf.predict(X2_test))
-            joblib.dump(mclf, MOOD_MODEL_PATH)
-            self.mood_model = mclf
-            mood_info = {"mood_acc": round(float(macc),3)}
-
-        return {"habit_acc": round(float(acc),3), **mood_info}
+        return self._fit_and_publish(df, watermark=watermark, mode="full", trained_rows=len(df), incremental_runs=0)
+
+    @property
+    def watermark(self):
+        return self.manifest.get("watermark")
+
+    def full_refit_reason(self):
+        """None when an incremental update is possible, else why a full refit is needed."""
+        manifest = self.manifest
+        if not manifest.get("watermark") or not hasattr(self.model, "estimators_"):
+            return "no trained version with a watermark"
+        if len(self.model.estimators_) >= MAX_TREES:
+            return f"forest reached {MAX_TREES} trees"
+        if manifest.get("features", FEATURE_COLUMNS) != MODEL_FEATURES:
+            return "feature set changed"
+        if manifest.get("incremental_runs", 0) >= FULL_REFIT_EVERY:
+            return f"{FULL_REFIT_EVERY} incremental runs since the last full refit"
+        return None
+
+    def update_from_dataframe(self, df, watermark=None):
+        """
+        Incremental update from logs newer than the watermark (or rewritten since): both forests are
+        warm-started and grow a few trees fitted on df only, so the cost scales
+        with the new data. Returns {"refit": reason} when a full refit is needed instead,
+        and skips (the logs stay past the watermark for the next run) when df lacks a
+        break label the forest was fitted on: warm-started trees must share its classes.
+        A mood label missing from df only keeps the current mood model.
+        """
+        reason = self.full_refit_reason()
+        if reason:
+            return {"refit": reason}
+        if len(df) < 10:
+            return {"error":"not enough new data to update"}
+        import numpy as np
+        manifest = self.manifest
+        if set(np.unique(df["break_tomorrow"])) != set(self.model.classes_):
+            return {"mode": "incremental", "skipped": "new logs don't cover every break label yet",
+                    "version": self.version}
+        base_mood = self.mood_model if hasattr(self.mood_model, "estimators_") else None
+        if base_mood is not None and set(df["mood"].dropna().astype(str)) != set(base_mood.classes_):
+            base_mood = None
+
+        trained_rows = manifest.get("trained_rows", len(df))
+        n_new = int(np.clip(round(N_ESTIMATORS * len(df) / trained_rows), MIN_NEW_TREES, MAX_NEW_TREES))
+        return self._fit_and_publish(
+            df, base=self.model, base_mood=base_mood, n_new=n_new, watermark=watermark, mode="incremental",
+            trained_rows=trained_rows + len(df),
+            incremental_runs=manifest.get("incremental_runs", 0) + 1,
+        )
 
 habit_model = HabitModel()
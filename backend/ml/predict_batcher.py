@@ -0,0 +1,88 @@
+"""
+Micro-batching for single-student predictions (enable with PREDICT_BATCHER=1).
+
+Concurrent predict_break / predict_mood calls put their feature row on a queue
+and wait on a future. One background thread collects rows for up to
+PREDICT_BATCH_MAX_WAIT_MS (or PREDICT_BATCH_MAX_ROWS), builds one feature
+matrix per kind and resolves every future from a single predict_proba /
+predict call. Under load, N dashboard requests cost one model call instead of
+N; an idle request pays at most the wait. Disabled, the calls go straight to
+the model as before.
+"""
+import os
+from concurrent.futures import Future
+
+from ..app.micro_batch import MicroBatcher
+from .habit_model import habit_model
+
+PREDICT_BATCHER = os.getenv("PREDICT_BATCHER", "0") == "1"
+PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "64"))
+PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+
+
+class PredictBatcher(MicroBatcher):
+    thread_name = "predict-batcher"
+
+    def __init__(self, model=habit_model, enabled=PREDICT_BATCHER,
+                 max_rows=PREDICT_BATCH_MAX_ROWS, max_wait_ms=PREDICT_BATCH_MAX_WAIT_MS):
+        super().__init__(max_rows, max_wait_ms)
+        self.model = model
+        self.enabled = enabled
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_rows = 0
+        self.failed = 0
+
+    def submit(self, kind, features):
+        """kind: "break" or "mood"; features: feature-store row or raw log -> Future."""
+        self.start()
+        fut = Future()
+        self._queue.put((kind, features, fut))
+        return fut
+
+    def predict_break(self, features):
+        if not self.enabled:
+            return self.model.predict_break(features)
+        return self.submit("break", features).result()
+
+    def predict_mood(self, features):
+        if not self.enabled:
+            return self.model.predict_mood(features)
+        return self.submit("mood", features).result()
+
+    def _flush(self, batch):
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_batch_rows = max(self.max_batch_rows, len(batch))
+        for kind, fn, cast in (("break", self.model.predict_break_batch, float),
+                               ("mood", self.model.predict_mood_batch, str)):
+            items = [(f, fut) for k, f, fut in batch if k == kind]
+            if not items:
+                continue
+            try:
+                # columns of the current version (loading it first); the batch
+                # predictors remap if a newer one lands meanwhile
+                self.model.refresh()
+                columns = self.model.features
+                X = [[row.get(c) or 0 for c in columns] for row, _ in items]
+                for (_, fut), value in zip(items, fn(X, columns)):
+                    fut.set_result(cast(value))
+            except Exception as e:
+                self.failed += len(items)
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed": self.failed,
+            "avg_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0,
+            "max_batch_rows": self.max_batch_rows,
+        }
+
+
+predict_batcher = PredictBatcher()
@@ -1,21 +1,99 @@
+import operator
+from collections import namedtuple
+
+# One row per recommendation: fires when `feature op threshold`; a missing
+# feature counts as `default`. Order is the order messages are returned in.
+Rule = namedtuple("Rule", "id feature op threshold default message")
+
+RECOMMENDATION_RULES = [
+    Rule("sleep", "sleep_hours", "<", 6, 0, "Improve sleep: try wind-down routine, avoid screens 1 hour before bed."),
+    Rule("activity", "activity_minutes", "<", 20, 0, "Increase activity: short 20-min walk daily or light yoga."),
+    Rule("study", "study_hours", "<", 2, 0, "Try focused study: 2 × 50-min sessions or Pomodoro 4 × 25 min."),
+    Rule("screen", "screen_time_hours", ">", 6, 0, "Reduce screen time: use app-blocker during study hours."),
+    Rule("productivity", "productivity", "<", 5, 5, "Micro-goals: set 3 small tasks today and reward completion."),
+]
+BALANCED = "Keep going — your routine looks balanced. Maintain consistency."
+
+# Routine entries driven by 7-log averages: (key, feature, op, threshold,
+# value when true, value when false -- None leaves the key out).
+RoutineRule = namedtuple("RoutineRule", "key feature op threshold then otherwise")
+
+ROUTINE_RULES = [
+    RoutineRule("exercise", "activity_minutes", "<", 20, "20-minute walk", "Maintain current routine"),
+    RoutineRule("sleep_tip", "sleep_hours", "<", 6, "Cut late-night caffeine, wind down 60 minutes before bed", None),
+    RoutineRule("screen_tip", "screen_time_hours", ">", 6, "Schedule 2 'no-screen' focus blocks of 50 minutes", None),
+]
+ROUTINE_BASE = {
+    "wake_up": "7:00 AM",
+    "morning_study": None,  # from average study hours
+    "exercise": None,       # from ROUTINE_RULES
+    "afternoon_focus": "4 × 25-minute Pomodoro sessions",
+    "evening_unwind": "Avoid screens 45 minutes before sleep",
+    "sleep": "Aim for 7–8 hours"
+}
+
+# also elementwise on numpy arrays; numpy itself is only imported by the cohort helpers
+_OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
 def generate_recommendations(latest_log):
-    recs = []
-    sleep = latest_log.get("sleep_hours",0)
-    study = latest_log.get("study_hours",0)
-    activity = latest_log.get("activity_minutes",0)
-    screen = latest_log.get("screen_time_hours",0)
-    prod = latest_log.get("productivity",5)
-
-    if sleep < 6:
-        recs.append("Improve sleep: try wind-down routine, avoid screens 1 hour before bed.")
-    if activity < 20:
-        recs.append("Increase activity: short 20-min walk daily or light yoga.")
-    if study < 2:
-        recs.append("Try focused study: 2 × 50-min sessions or Pomodoro 4 × 25 min.")
-    if screen > 6:
-        recs.append("Reduce screen time: use app-blocker during study hours.")
-    if prod < 5:
-        recs.append("Micro-goals: set 3 small tasks today and reward completion.")
-    if not recs:
-        recs.append("Keep going — your routine looks balanced. Maintain consistency.")
-    return recs
+    recs = [r.message for r in RECOMMENDATION_RULES
+            if _OPS[r.op](latest_log.get(r.feature, r.default), r.threshold)]
+    return recs or [BALANCED]
+
+
+def _column(features, name, default):
+    import numpy as np
+    col = np.asarray(features[name], dtype=float)
+    return np.where(np.isnan(col), default, col)
+
+
+def rule_masks(features, rules=RECOMMENDATION_RULES):
+    """
+    Evaluate every rule over a whole cohort at once. features maps column name
+    -> array (a DataFrame works); returns an (n_students, n_rules) bool matrix.
+    """
+    import numpy as np
+    return np.column_stack([_OPS[r.op](_column(features, r.feature, r.default), r.threshold) for r in rules])
+
+
+def recommendations_from_masks(masks, rules=RECOMMENDATION_RULES):
+    import numpy as np
+    messages = np.array([r.message for r in rules], dtype=object)
+    return [list(messages[row]) or [BALANCED] for row in masks]
+
+
+def study_block(avg_study):
+    return f"{max(1, int(avg_study))} hour focused study"
+
+
+def generate_routine(avg):
+    """Routine from 7-log averages ({feature: mean})."""
+    routine = dict(ROUTINE_BASE)
+    routine["morning_study"] = study_block(avg["study_hours"])
+    for r in ROUTINE_RULES:
+        value = r.then if _OPS[r.op](avg[r.feature], r.threshold) else r.otherwise
+        if value is None:
+            routine.pop(r.key, None)
+        else:
+            routine[r.key] = value
+    return routine
+
+
+def routine_cohort(avg):
+    """generate_routine for every row of a feature-average matrix, rules evaluated as masks."""
+    import numpy as np
+    study = np.maximum(1, np.asarray(avg["study_hours"], dtype=float).astype(int))
+    masks = np.column_stack([_OPS[r.op](np.asarray(avg[r.feature], dtype=float), r.threshold) for r in ROUTINE_RULES])
+    out = []
+    for hours, row in zip(study, masks):
+        routine = dict(ROUTINE_BASE)
+        routine["morning_study"] = f"{hours} hour focused study"
+        for r, hit in zip(ROUTINE_RULES, row):
+            value = r.then if hit else r.otherwise
+            if value is None:
+                routine.pop(r.key, None)
+            else:
+                routine[r.key] = value
+        out.append(routine)
+    return out
@@ -1,31 +1,172 @@
+import numpy as np
 import pandas as pd
+from sqlalchemy import func, or_, select, tuple_
 from .habit_model import habit_model, FEATURE_COLUMNS
+from .features import ROLLING_FEATURES
+from ..app import archive, feature_store
 
-def load_logs_to_df(db_session):
+CHUNK_SIZE = 100_000
+IN_CHUNK = 500
+LOG_COLUMNS = ["id", "student_id", "date", *FEATURE_COLUMNS, "mood"]
+
+
+def _compact(chunk):
+    chunk["id"] = chunk["id"].astype(np.int64)
+    chunk["student_id"] = chunk["student_id"].fillna(-1).astype(np.int32)
+    chunk["date"] = pd.to_datetime(chunk["date"])
+    for c in FEATURE_COLUMNS:
+        chunk[c] = pd.to_numeric(chunk[c], errors="coerce").astype(np.float32)
+    return chunk
+
+
+def read_log_chunks(db_session, chunksize=CHUNK_SIZE, min_log_id=None, min_update_seq=None):
+    """
+    Yield habit_logs as typed DataFrame chunks read straight from SQL columns
+    (no ORM instances). Dates come back as raw ISO strings and are parsed per chunk.
+    min_log_id restricts the scan to logs with a larger id (incremental training),
+    plus with min_update_seq those rewritten in place after that seq.
+    """
+    from ..models.habit import HabitLog, HabitLogUpdate
+    conn = db_session.connection()
+    stmt = select(*[getattr(HabitLog, c) for c in LOG_COLUMNS])
+    if min_log_id is not None:
+        newer = HabitLog.id > int(min_log_id)
+        if min_update_seq is not None:
+            edited = select(HabitLogUpdate.log_id).where(HabitLogUpdate.seq > int(min_update_seq))
+            newer = or_(newer, HabitLog.id.in_(edited))
+        stmt = stmt.where(newer)
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    # plain DBAPI cursor: building SQLAlchemy Row objects costs more than the fetch itself
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(sql)
+        while True:
+            part = cursor.fetchmany(chunksize)
+            if not part:
+                break
+            yield _compact(pd.DataFrame.from_records(part, columns=LOG_COLUMNS))
+    finally:
+        cursor.close()
+
+
+def last_update_seq(db_session):
+    """Seq of the latest in-place log rewrite (0 when none): the watermark's second half."""
+    from ..models.habit import HabitLogUpdate
+    return db_session.execute(select(func.max(HabitLogUpdate.seq))).scalar() or 0
+
+
+def label_break_tomorrow(df):
+    """
+    break_tomorrow = 1 when the student's next log is for the next calendar day
+    and that day has productivity < 3 or zero study hours.
     """
-    Query habit_logs and construct dataframe with yesterday->today mapping to compute break_tomorrow labels.
+    df = df.sort_values(["student_id", "date", "id"], kind="stable", ignore_index=True)
+    g = df.groupby("student_id", sort=False)
+    next_date = g["date"].shift(-1)
+    next_prod = g["productivity"].shift(-1).fillna(0)
+    next_study = g["study_hours"].shift(-1).fillna(0)
+    consecutive = (next_date - df["date"]) == pd.Timedelta(days=1)
+    df["break_tomorrow"] = (consecutive & ((next_prod < 3) | (next_study == 0))).astype(np.int8)
+    return df
+
+
+def attach_features(db_session, df, all_students=True):
     """
+    Add the feature store's ROLLING_FEATURES to each log row by (student_id, date),
+    building store rows first for students it doesn't cover yet.
+    """
+    ids = None if all_students else df["student_id"].unique().tolist()
+    feats = feature_store.read_frame(db_session, ids)
+    missing = set(df["student_id"].unique().tolist()) - set(feats["student_id"].unique().tolist())
+    if missing:
+        feature_store.rebuild(db_session, sorted(missing))
+        feats = pd.concat([feats, feature_store.read_frame(db_session, sorted(missing))], ignore_index=True)
+    feats = feats[["student_id", "date", *ROLLING_FEATURES]].astype({"student_id": np.int32, **{c: np.float32 for c in ROLLING_FEATURES}})
+    return df.merge(feats, on=["student_id", "date"], how="left")
+
+
+def read_archived(min_log_id=None):
+    """Archived logs in the same shape as attach_features output (their rolling features were archived with them)."""
+    cold = archive.read_logs([*LOG_COLUMNS, *ROLLING_FEATURES], min_log_id=min_log_id)
+    if cold.empty:
+        return None
+    return _compact(cold).astype({c: np.float32 for c in ROLLING_FEATURES})
+
+
+def _neighbours(db_session, df):
+    """Hot logs dated the day before or after a (student_id, date) in df, other than df's own rows."""
     from ..models.habit import HabitLog
-    logs = db_session.query(HabitLog).order_by(HabitLog.student_id, HabitLog.date).all()
-    rows = []
-    for l in logs:
-        rows.append({
-            "student_id": l.student_id,
-            "date": l.date.isoformat(),
-            **{c: getattr(l, c) for c in FEATURE_COLUMNS},
-            "mood": getattr(l, "mood", None)
-        })
-    if not rows:
+    day = pd.Timedelta(days=1)
+    keys = df[["student_id", "date"]]
+    pairs = pd.concat([keys.assign(date=keys["date"] - day), keys.assign(date=keys["date"] + day)])
+    pairs = list({(int(s), d.date()) for s, d in zip(pairs["student_id"], pairs["date"])})
+    stmt = select(*[getattr(HabitLog, c) for c in LOG_COLUMNS])
+    key = tuple_(HabitLog.student_id, HabitLog.date)
+    parts = [pd.DataFrame.from_records(db_session.execute(stmt.where(key.in_(pairs[i:i + IN_CHUNK]))).all(), columns=LOG_COLUMNS)
+             for i in range(0, len(pairs), IN_CHUNK)]
+    found = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=LOG_COLUMNS)
+    return _compact(found[~found["id"].isin(df["id"])].reset_index(drop=True))
+
+
+def _last_dates(db_session, student_ids):
+    """student_id -> date of the student's newest hot log."""
+    from ..models.habit import HabitLog
+    ids = [int(s) for s in student_ids]
+    out = {}
+    for i in range(0, len(ids), IN_CHUNK):
+        out.update(db_session.execute(
+            select(HabitLog.student_id, func.max(HabitLog.date))
+            .where(HabitLog.student_id.in_(ids[i:i + IN_CHUNK])).group_by(HabitLog.student_id)
+        ).all())
+    return pd.Series({s: pd.Timestamp(d) for s, d in out.items()}, dtype="datetime64[ns]")
+
+
+def _incremental_labels(db_session, new):
+    """
+    new (hot logs past the watermark) with real break labels: each row's next
+    day and the day before (whose label the new row decides) are read as well.
+    The day-before rows are returned too; the next-day rows only inform labels,
+    and rows with no later log yet (label unknown) are dropped.
+    """
+    around = _neighbours(db_session, new)
+    keys = set(zip(new["student_id"], new["date"] - pd.Timedelta(days=1)))
+    before = pd.Series([k in keys for k in zip(around["student_id"], around["date"])], dtype=bool)
+    df = label_break_tomorrow(pd.concat([new.assign(_keep=True), around.assign(_keep=before.values)], ignore_index=True))
+    last = _last_dates(db_session, df["student_id"].unique())
+    labelled = df["date"].values < df["student_id"].map(last).values
+    return df[df["_keep"] & labelled].drop(columns="_keep").reset_index(drop=True)
+
+
+def last_log_id(db_session):
+    """Largest log id (0 when none): the watermark's first half, read before loading."""
+    from ..models.habit import HabitLog
+    return db_session.execute(select(func.max(HabitLog.id))).scalar() or 0
+
+
+def load_logs_to_df(db_session, chunksize=CHUNK_SIZE, min_log_id=None, min_update_seq=None):
+    """
+    Build the training frame over hot (SQLite) and archived logs: float32 raw +
+    rolling features, categorical mood and break_tomorrow labels.
+
+    With min_log_id only logs past it (and, past min_update_seq, rewritten ones)
+    are loaded, plus the day before each (now labelled by it) and the day after
+    (to label it). Rows whose next day isn't logged yet are left out rather than
+    trained as "no break"; they come back as the day before of a later run.
+    Rolling features still see the full history.
+    """
+    incremental = min_log_id is not None
+    chunks = list(read_log_chunks(db_session, chunksize, min_log_id, min_update_seq))
+    hot = pd.concat(chunks, ignore_index=True) if chunks else None
+    if hot is not None and incremental:
+        hot = _incremental_labels(db_session, hot)
+    if hot is not None and not hot.empty:
+        hot = attach_features(db_session, hot, all_students=not incremental)
+    cold = read_archived(min_log_id)
+    if cold is not None and incremental:
+        cold = label_break_tomorrow(cold)  # archived rows past a watermark: rare, labelled among themselves
+    df = archive.combine(hot, cold)
+    if df is None or df.empty:
         return pd.DataFrame()
-    df = pd.DataFrame(rows)
-    # compute break_tomorrow: if next day's productivity == 0 or study_hours ==0 -> consider break
-    df = df.sort_values(["student_id","date"])
-    df["break_tomorrow"] = 0
-    for sid in df["student_id"].unique():
-        s = df[df["student_id"]==sid].reset_index(drop=True)
-        for i in range(len(s)-1):
-            # simplistic rule: if next day productivity < 3 or study_hours==0 => break
-            next_prod = s.loc[i+1,"productivity"] or 0
-            next_study = s.loc[i+1,"study_hours"] or 0
-            df.loc[s.index[i],"break_tomorrow"] = 1 if (next_prod < 3 or next_study == 0) else 0
-    return df
+    df["mood"] = df["mood"].astype("category")
+    # incremental rows are labelled already, against their neighbours
+    return df if incremental else label_break_tomorrow(df)
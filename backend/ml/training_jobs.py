@@ -0,0 +1,126 @@
+"""
+Background training jobs. Job state lives in one JSON file per job under
+models/jobs/, so GET /habits/train/{job_id} answers on every worker process
+(uvicorn --workers N), not only the one that accepted the job. Each process
+runs its jobs one at a time; across processes habit_model.train_lock makes
+them train and publish one after another.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ..app import metrics
+from ..app.db import SessionLocal
+from .habit_model import MODEL_DIR, _write_atomic, habit_model
+
+MAX_JOBS_KEPT = 100
+JOBS_DIR = os.path.join(MODEL_DIR, "jobs")
+
+# one job at a time; the fits themselves fan out to a process pool in train_from_dataframe
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit-train")
+_lock = threading.Lock()
+
+
+def _path(job_id):
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _save(job):
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    _write_atomic(_path(job["job_id"]), json.dumps(job))
+
+
+def _update(job_id, **fields):
+    # only the process running a job writes its file
+    with _lock:
+        job = get_job(job_id) or {"job_id": job_id}
+        job.update(fields)
+        _save(job)
+
+
+def _prune_jobs():
+    try:
+        names = [n for n in os.listdir(JOBS_DIR) if n.endswith(".json")]
+    except FileNotFoundError:
+        return
+    paths = sorted((os.path.join(JOBS_DIR, n) for n in names), key=os.path.getmtime)
+    for path in paths[:-MAX_JOBS_KEPT]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+MIN_NEW_LOGS = 10
+
+
+def _train(mode):
+    from .train_habit_model import last_log_id, last_update_seq, load_logs_to_df  # pandas; only needed once a job runs
+    # the whole run holds the cross-process lock: the watermark read here is
+    # still the current one when the update publishes
+    with habit_model.train_lock, SessionLocal() as db:
+        habit_model.refresh()  # another worker may have published since our last predict
+        refit_reason = habit_model.full_refit_reason() if mode == "incremental" else "requested"
+        # read before the logs: a write landing meanwhile is picked up (again) next time
+        mark = (last_log_id(db), last_update_seq(db))
+        if refit_reason is None:
+            watermark = habit_model.watermark
+            # rewrites keep their id; watermarks from before rewrites were tracked start at 0
+            df = load_logs_to_df(db, min_log_id=watermark["last_log_id"],
+                                 min_update_seq=watermark.get("last_update_seq", 0))
+            if len(df) < MIN_NEW_LOGS:
+                return {"mode": "incremental", "skipped": f"{len(df)} new or edited logs since the watermark",
+                        "version": habit_model.version}
+            res = habit_model.update_from_dataframe(df, mark)
+            if "refit" not in res:
+                return res
+            refit_reason = res["refit"]
+        df = load_logs_to_df(db)
+        db.close()  # don't hold a connection through the fit
+        if df.empty:
+            raise ValueError("Not enough habit logs to train")
+        return {**habit_model.train_from_dataframe(df, mark), "refit_reason": refit_reason}
+
+
+def _run(job_id, mode):
+    _update(job_id, status="running", started_at=time.time())
+    start, status = time.perf_counter(), "failed"
+    try:
+        res = _train(mode)
+        if "error" in res:
+            raise ValueError(res["error"])
+        status = "succeeded"
+        _update(job_id, status=status, result=res, finished_at=time.time())
+    except Exception as e:
+        _update(job_id, status=status, error=str(e), finished_at=time.time())
+    finally:
+        metrics.TRAINING_SECONDS.observe(time.perf_counter() - start, mode, status)
+
+
+def submit_training(mode="incremental"):
+    """
+    Queue a training job and return its status dict immediately.
+    mode="incremental" updates from logs past the watermark and falls back to a
+    full refit when that isn't possible; mode="full" always refits from scratch.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    job = {"job_id": job_id, "mode": mode, "status": "queued", "created_at": time.time()}
+    with _lock:
+        _save(job)
+        _prune_jobs()
+    _executor.submit(_run, job_id, mode)
+    return job
+
+
+def get_job(job_id):
+    """Job status from any worker process, None for an unknown (or pruned) id."""
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_path(job_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
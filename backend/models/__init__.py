@@ -1,2 +1,5 @@
 from .student import Student
-from .habit import HabitLog
+from .habit import HabitLog, HabitLogUpdate
+from .stats import StudentStats
+from .insights import StudentInsights
+from .features import HabitFeatures
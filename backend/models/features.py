@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Date, Float, Table
+from ..app.db import Base
+from ..ml.features import MODEL_FEATURES
+
+class HabitFeatures(Base):
+    """Per-(student, date) model features, maintained on every log write (see app/feature_store.py)."""
+    __table__ = Table(
+        "habit_features",
+        Base.metadata,
+        Column("student_id", Integer, primary_key=True),
+        Column("date", Date, primary_key=True),
+        Column("log_id", Integer),  # the day's log the raw values come from
+        *[Column(c, Float) for c in MODEL_FEATURES],
+    )
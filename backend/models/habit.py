@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, Float, String, Date
+from sqlalchemy import Column, Integer, Float, String, Date, Index
 from ..app.db import Base
 
 class HabitLog(Base):
     __tablename__ = "habit_logs"
+    # one log per student and day (POST /habits/log upserts on it); also serves
+    # every student_id + date-ordered read. Existing databases: app/migrations.py
+    __table_args__ = (Index("ux_habit_logs_student_date", "student_id", "date", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, index=True)
@@ -14,3 +17,16 @@ class HabitLog(Base):
     mood = Column(String)
     screen_time_hours = Column(Float)
     productivity = Column(Float)
+
+
+class HabitLogUpdate(Base):
+    """
+    Logs rewritten in place by the upsert (which keeps their id), one row per
+    log with the sequence number of its latest rewrite: incremental training
+    reads logs past its id watermark plus those past its seq watermark.
+    """
+    __tablename__ = "habit_log_updates"
+    __table_args__ = {"sqlite_autoincrement": True}  # a re-recorded log never gets a seq already handed out
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    log_id = Column(Integer, nullable=False, unique=True)
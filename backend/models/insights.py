@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Float, Text, JSON
+from ..app.db import Base
+
+class StudentInsights(Base):
+    """Precomputed coach/routine/recommendation outputs (see app/insights.py)."""
+    __tablename__ = "student_insights"
+
+    student_id = Column(Integer, primary_key=True)
+    stats_version = Column(Integer, nullable=False)  # student_stats.version they were derived from
+    coach_message = Column(Text)
+    routine = Column(JSON)
+    recommendations = Column(JSON)
+    computed_at = Column(Float)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date, JSON
+from ..app.db import Base
+
+class StudentStats(Base):
+    """Per-student aggregates kept up to date on every habit-log write (see app/stats.py)."""
+    __tablename__ = "student_stats"
+
+    student_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)   # bumped on every write
+    log_count = Column(Integer, nullable=False, default=0)
+    last_log_id = Column(Integer)
+    last_date = Column(Date)
+
+    window = Column(JSON)        # most recent logs, newest first
+    last7 = Column(JSON)         # {metric: sum} over window[:7]
+    prev7 = Column(JSON)         # {metric: sum} over window[7:14]
+    last30 = Column(JSON)        # {metric: sum} over window[:30]
+    mood_counts = Column(JSON)   # over window[:30]
+    study_streak = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal
+import asyncio
+from datetime import date
+
+from ..app.db import SessionLocal, get_async_db
+from ..app import ingest, insights, stats as student_stats
+from ..app.write_batcher import WRITE_BATCHER
+from ..app.pagination import MAX_PAGE, encode_cursor, page_headers, stream_rows
+from ..schemas.habit import DashboardOut, HabitCreate, HabitOut, PredictionOut, RoutineOutput
+from ..ml.habit_model import habit_model
+from ..ml.predict_batcher import predict_batcher
+from .habits import analytics_cohort, build_analytics, build_dashboard, dashboard_not_modified, enqueue_log, logs_query, recommend_cohort, risk_label
+
+# async twins of the hot routes in routers/habits.py, mounted ahead of them when
+# DB_MODE=async; everything else keeps being served by the sync router
+router = APIRouter(prefix="/habits", tags=["habits"])
+
+
+async def _in_thread(fn, *args):
+    """
+    fn(db, *args) with its own sync session in the threadpool. The stats,
+    insights and ingest helpers are sync ORM code with real Python work
+    (window merges, pandas feature-store rebuilds); run_sync would run all of
+    it on the event loop.
+    """
+    def call():
+        with SessionLocal() as db:
+            return fn(db, *args)
+    return await run_in_threadpool(call)
+
+def _cached(student_id, key):
+    # latest-log cache hits need neither a session nor a thread hop
+    entry = student_stats.latest_cache.get(student_id)
+    return (True, entry) if entry is not None and key in entry else (False, None)
+
+def _404():
+    return HTTPException(status_code=404, detail="No habit logs found")
+
+async def _stats_or_404(student_id):
+    stats = await _in_thread(student_stats.get_stats, student_id)
+    if not stats:
+        raise _404()
+    return stats
+
+async def _latest_features(student_id):
+    hit, entry = _cached(student_id, "features")
+    return entry["features"] if hit else await _in_thread(insights.latest_features, student_id)
+
+async def _predict_break(features):
+    # batched: wait on the batcher's future without holding a threadpool thread
+    if predict_batcher.enabled:
+        return await asyncio.wrap_future(predict_batcher.submit("break", features))
+    return await run_in_threadpool(habit_model.predict_break, features)
+
+@router.post("/log", response_model=HabitOut)
+async def create_log(data: HabitCreate):
+    if WRITE_BATCHER:
+        return await enqueue_log(data)
+    row = data.dict()
+    await _in_thread(ingest.insert_chunk, [row])
+    return row
+
+@router.get("/logs/{student_id}", response_model=List[HabitOut])
+async def get_logs(
+    student_id: int,
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE),
+    cursor: str | None = None,
+    from_: date | None = Query(None, alias="from"),
+    to: date | None = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = logs_query(student_id, cursor, from_, to)
+    if limit is None or format == "ndjson":
+        return stream_rows(stmt.limit(limit) if limit else stmt, format)
+    rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        page_headers(response, request, encode_cursor(rows[-1]["date"], rows[-1]["id"]))
+    return rows
+
+@router.get("/predict/{student_id}", response_model=PredictionOut)
+async def predict_break(student_id: int):
+    features = await _latest_features(student_id)
+    if not features:
+        raise _404()
+    prob = await _predict_break(features)
+    return PredictionOut(break_probability=round(prob,3), label=risk_label(prob))
+
+async def _latest_or_404(student_id):
+    hit, latest = _cached(student_id, "log")
+    if not hit:
+        latest = await _in_thread(insights.latest, student_id)
+    if latest is None:
+        raise _404()
+    return latest
+
+@router.get("/routine/{student_id}", response_model=RoutineOutput)
+async def routine(student_id: int):
+    return RoutineOutput(routine=(await _latest_or_404(student_id))["routine"])
+
+router.get("/analytics/cohort")(analytics_cohort)
+
+@router.get("/analytics/{student_id}")
+async def analytics(student_id: int):
+    return build_analytics(await _stats_or_404(student_id))
+
+# declared ahead of /recommend/{student_id} so that route doesn't swallow it
+router.get("/recommend/cohort")(recommend_cohort)
+
+@router.get("/recommend/{student_id}")
+async def recommend(student_id: int):
+    return {"recommendations": (await _latest_or_404(student_id))["recommendations"]}
+
+@router.get("/dashboard/{student_id}", response_model=DashboardOut)
+async def dashboard(student_id: int, request: Request, response: Response):
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = dashboard_not_modified(student_id, if_none_match)
+    if not_modified:
+        return not_modified
+    s = await _stats_or_404(student_id)
+    not_modified = dashboard_not_modified(student_id, if_none_match, s.version)
+    if not_modified:
+        return not_modified
+    features = await _latest_features(student_id) or student_stats.entry_dict(s.window[0])
+    return build_dashboard(s, await _predict_break(features), response)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal
+
+from ..app.db import get_async_db
+from ..app import insights, stats as student_stats
+from ..app.pagination import MAX_PAGE, page_headers, stream_rows
+from ..models.student import Student
+from ..schemas.student import StudentCreate, StudentOut, StudentUpdate
+from .students import students_query
+
+# async twins of routers/students.py, mounted ahead of them when DB_MODE=async
+router = APIRouter(prefix="/students", tags=["students"])
+
+@router.post("/", response_model=StudentOut)
+async def create_student(payload: StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    s = Student(**payload.dict())
+    db.add(s)
+    await db.commit()
+    return s
+
+@router.get("/", response_model=List[StudentOut])
+async def list_students(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE),
+    cursor: str | None = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = students_query(cursor)
+    if limit is None or format == "ndjson":
+        return stream_rows(stmt.limit(limit) if limit else stmt, format)
+    rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        page_headers(response, request, str(rows[-1]["id"]))
+    return rows
+
+@router.get("/{student_id}", response_model=StudentOut)
+async def get_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    s = await db.get(Student, student_id)
+    if not s:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return s
+
+@router.patch("/{student_id}", response_model=StudentOut)
+async def update_student(student_id: int, payload: StudentUpdate, db: AsyncSession = Depends(get_async_db)):
+    s = await db.get(Student, student_id)
+    if not s:
+        raise HTTPException(status_code=404, detail="Student not found")
+    for k,v in payload.dict(exclude_unset=True).items():
+        setattr(s,k,v)
+    await db.run_sync(insights.invalidate, [student_id])
+    await db.commit()
+    student_stats.forget([student_id])
+    return s
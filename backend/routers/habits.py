@@ -1,157 +1,453 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, select, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Dict
-import pandas as pd
+from typing import List, Literal
+from datetime import date
+import asyncio
+import json
 
 from ..app.db import get_db
+from ..app import export, feature_store, ingest, insights, metrics, stats as student_stats
+from ..app.insights import build_routine
+from ..app.write_batcher import RETRY_AFTER_S, WRITE_BATCHER, QueueFull, write_batcher
+from ..app.pagination import MAX_PAGE, decode_log_cursor, encode_cursor, page_headers, stream_records, stream_rows
 from ..models.habit import HabitLog
-from ..models.student import Student
+from ..models.stats import StudentStats
 from ..schemas.habit import (
     HabitCreate,
     HabitOut,
+    BulkIngestOut,
     PredictionOut,
+    StudentPredictionOut,
+    BatchPredictIn,
     CoachOutput,
     RoutineOutput,
+    TrainJobOut,
+    ModelVersionOut,
+    DashboardOut,
+)
+from ..ml.habit_model import habit_model, FEATURE_COLUMNS, list_versions
+from ..ml.features import MODEL_FEATURES
+from ..ml import training_jobs
+from ..ml.coach_llm import get_coach
+from ..ml.predict_batcher import predict_batcher
+from ..ml.recommender import (
+    RECOMMENDATION_RULES,
+    generate_recommendations,
+    recommendations_from_masks,
+    routine_cohort,
+    rule_masks,
 )
-from ..ml.habit_model import habit_model
-from ..ml.coach_llm import generate_ai_coach_message
-from ..ml.recommender import generate_recommendations
-from ..ml.train_habit_model import load_logs_to_df
 
 router = APIRouter(prefix="/habits", tags=["habits"])
 
+LOW_RISK, HIGH_RISK = 0.4, 0.7
+IN_CHUNK = 5000  # keep IN (...) lists well under SQLite's bound-parameter limit
+
+
+def risk_label(prob):
+    return "Low Risk" if prob < LOW_RISK else "Medium Risk" if prob < HIGH_RISK else "High Risk"
+
+
+def latest_logs(db, student_ids=None, columns=FEATURE_COLUMNS):
+    """
+    Latest log per student in one query (max(date) per student joined back)
+    -> list of (student_id, *columns) rows. Same-day duplicates resolve to the highest id.
+    """
+    def run(ids):
+        latest = select(HabitLog.student_id, func.max(HabitLog.date).label("date")).group_by(HabitLog.student_id)
+        if ids is not None:
+            latest = latest.where(HabitLog.student_id.in_(ids))
+        latest = latest.subquery()
+        stmt = (
+            select(HabitLog.student_id, *[getattr(HabitLog, c) for c in columns])
+            .join(latest, and_(HabitLog.student_id == latest.c.student_id, HabitLog.date == latest.c.date))
+            .order_by(HabitLog.id)
+        )
+        return {r[0]: r for r in db.execute(stmt)}
+
+    if student_ids is None:
+        return list(run(None).values())
+    ids = list(dict.fromkeys(student_ids))
+    rows = {}
+    for i in range(0, len(ids), IN_CHUNK):
+        rows.update(run(ids[i:i + IN_CHUNK]))
+    return list(rows.values())
+
+
+def insert_log(db, data):
+    # one log per (student, date): logging a day again overwrites it, keeping its id
+    row = data.dict()
+    ingest.insert_chunk(db, [row])
+    return row
+
+async def enqueue_log(data):
+    """Hand the row to the group-commit writer; resolves once its batch is committed."""
+    try:
+        # with WRITE_QUEUE_WAIT_MS a full queue makes submit block: wait in a thread, not on the loop
+        if write_batcher.queue_wait:
+            fut = await run_in_threadpool(write_batcher.submit, data.dict())
+        else:
+            fut = write_batcher.submit(data.dict())
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_S)})
+    return {**data.dict(), "id": await asyncio.wrap_future(fut)}
 
-# basic CRUD from before (create_log, get_logs, predict, coach, routine) - keep as is
 @router.post("/log", response_model=HabitOut)
-def create_log(data: HabitCreate, db: Session = Depends(get_db)):
-    log = HabitLog(**data.dict())
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+async def create_log(data: HabitCreate, db: Session = Depends(get_db)):
+    if WRITE_BATCHER:
+        return await enqueue_log(data)
+    return await run_in_threadpool(insert_log, db, data)
+
+@router.get("/batcher")
+def batcher_stats():
+    """Queue depth and flush latency of the group-commit writer (WRITE_BATCHER=1)."""
+    return write_batcher.stats()
+
+@router.post("/logs/bulk", response_model=BulkIngestOut)
+async def bulk_create_logs(request: Request, format: str | None = None, db: Session = Depends(get_db)):
+    """
+    Stream NDJSON (default) or CSV rows, validate them in chunks and insert each
+    chunk with one executemany in its own transaction.
+    """
+    fmt = (format or "").lower()
+    if not fmt:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    inserted, updated, failed, errors = 0, 0, 0, []
+
+    async def flush(records):
+        nonlocal inserted, updated, failed
+        n, u, errs = await run_in_threadpool(ingest.ingest_chunk, db, records)
+        inserted += n
+        updated += u
+        failed += len(errs)
+        errors.extend(errs[:max(0, ingest.MAX_REPORTED_ERRORS - len(errors))])
+
+    pending = []
+    async for rec in ingest.iter_records(request.stream(), fmt):
+        pending.append(rec)
+        if len(pending) >= ingest.CHUNK_SIZE:
+            await flush(pending)
+            pending = []
+    await flush(pending)
+    return BulkIngestOut(inserted=inserted, updated=updated, failed=failed, errors=errors)
+
+def logs_query(student_id, cursor=None, from_=None, to=None):
+    stmt = select(*[getattr(HabitLog, c) for c in HabitOut.model_fields]).where(HabitLog.student_id == student_id)
+    if from_:
+        stmt = stmt.where(HabitLog.date >= from_)
+    if to:
+        stmt = stmt.where(HabitLog.date <= to)
+    if cursor:
+        stmt = stmt.where(tuple_(HabitLog.date, HabitLog.id) > tuple_(*decode_log_cursor(cursor)))
+    return stmt.order_by(HabitLog.date, HabitLog.id)
+
+@router.get("/export")
+def export_logs(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    from_: date | None = Query(None, alias="from"),
+    to: date | None = None,
+    student_id: List[int] | None = Query(None),
+    predictions: bool = False,
+    archived: bool = True,
+):
+    """
+    Every matching log (repeat student_id to pick students), streamed as it is read.
+    predictions=true adds each student's current break_probability and predicted_mood;
+    archived=false skips logs moved to cold storage.
+    """
+    return export.stream_export(format, student_id, from_, to, predictions, archived)
 
 @router.get("/logs/{student_id}", response_model=List[HabitOut])
-def get_logs(student_id: int, db: Session = Depends(get_db)):
-    logs = db.query(HabitLog).filter(HabitLog.student_id == student_id).order_by(HabitLog.date).all()
-    return logs
+def get_logs(
+    student_id: int,
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE),
+    cursor: str | None = None,
+    from_: date | None = Query(None, alias="from"),
+    to: date | None = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_db),
+):
+    """
+    Logs in (date, id) order, optionally limited to [from, to].
+    With limit (JSON) one keyset page is returned and the next page's cursor is sent in
+    X-Next-Cursor / Link. Otherwise rows are streamed from a server-side cursor, as a JSON
+    array or NDJSON; an NDJSON page's last row (date,id) is the cursor for the next one.
+    """
+    stmt = logs_query(student_id, cursor, from_, to)
+    if limit is None or format == "ndjson":
+        return stream_rows(stmt.limit(limit) if limit else stmt, format)
+    rows = db.execute(stmt.limit(limit + 1)).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        page_headers(response, request, encode_cursor(rows[-1]["date"], rows[-1]["id"]))
+    return rows
     
 
 @router.get("/predict/{student_id}", response_model=PredictionOut)
 def predict_break(student_id: int, db: Session = Depends(get_db)):
-    log = db.query(HabitLog).filter(HabitLog.student_id == student_id).order_by(HabitLog.date.desc()).first()
-    if not log:
+    # one point lookup in the feature store (raw + rolling features of the latest day), cached until the next write
+    features = insights.latest_features(db, student_id)
+    if not features:
         raise HTTPException(status_code=404, detail="No habit logs found")
-    prob = habit_model.predict_break({
-        "sleep_hours": log.sleep_hours,
-        "study_hours": log.study_hours,
-        "activity_minutes": log.activity_minutes,
-        "screen_time_hours": log.screen_time_hours,
-        "productivity": log.productivity
-    })
-    label = "Low Risk" if prob < 0.4 else "Medium Risk" if prob < 0.7 else "High Risk"
-    return PredictionOut(break_probability=round(prob,3), label=label)
+    prob = predict_batcher.predict_break(features)
+    return PredictionOut(break_probability=round(prob,3), label=risk_label(prob))
+
+@router.post("/predict/batch", response_model=List[StudentPredictionOut])
+def predict_break_batch(payload: BatchPredictIn, db: Session = Depends(get_db)):
+    """Break risk for a cohort: one latest-features query, one feature matrix, one predict_proba call."""
+    import numpy as np
+    rows = feature_store.latest_many(db, payload.student_ids)
+    if not rows:
+        return []
+    X = np.array([r[1:] for r in rows], dtype=float)
+    probs = habit_model.predict_break_batch(X, MODEL_FEATURES)
+    labels = np.select([probs < LOW_RISK, probs < HIGH_RISK], ["Low Risk", "Medium Risk"], "High Risk")
+    return [
+        {"student_id": r[0], "break_probability": round(float(p), 3), "label": str(lbl)}
+        for r, p, lbl in zip(rows, probs, labels)
+    ]
+
+def coach_key_for(db, student_id):
+    key = insights.latest_coach_key_for(db, student_id)
+    if key is None:
+        raise HTTPException(status_code=404, detail="No habit logs found")
+    return key
 
 @router.get("/coach/{student_id}", response_model=CoachOutput)
 def coach(student_id: int, db: Session = Depends(get_db)):
-    log = db.query(HabitLog).filter(HabitLog.student_id == student_id).order_by(HabitLog.date.desc()).first()
-    if not log:
+    message = insights.coach_message(db, student_id)
+    if message is None:
         raise HTTPException(status_code=404, detail="No habit logs found")
-    student = db.query(Student).filter(Student.id == student_id).first()
-    personality = student.personality if student else None
-    message = generate_ai_coach_message(
-        mood=log.mood,
-        productivity=log.productivity,
-        study_hours=log.study_hours,
-        personality=personality,
-        goals=(student.goals if student else None)
-    )
     return CoachOutput(message=message)
 
+@router.get("/coach/{student_id}/stream")
+def coach_stream(student_id: int, db: Session = Depends(get_db)):
+    """Server-sent events: one `data: {"token": ...}` per chunk, then `event: done` with the full message."""
+    key = coach_key_for(db, student_id)
+
+    def events():
+        parts = []
+        for token in get_coach().stream(key):
+            parts.append(token)
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'message': ''.join(parts).strip()})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/coach-stats")
+def coach_stats():
+    return get_coach().stats()
+
+def _stats_or_404(db, student_id):
+    stats = student_stats.get_stats(db, student_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No habit logs found")
+    return stats
+
+def _latest_or_404(db, student_id):
+    # precomputed insights (or on-demand outputs after a newer log), cached until the next write
+    latest = insights.latest(db, student_id)
+    if latest is None:
+        raise HTTPException(status_code=404, detail="No habit logs found")
+    return latest
+
 @router.get("/routine/{student_id}", response_model=RoutineOutput)
 def routine(student_id: int, db: Session = Depends(get_db)):
-    # compute 7-day averages
-    logs = db.query(HabitLog).filter(HabitLog.student_id == student_id).order_by(HabitLog.date.desc()).limit(7).all()
-    if not logs:
-        raise HTTPException(status_code=404, detail="No habit logs found")
-    avg = lambda attr: sum((getattr(l,attr) or 0) for l in logs)/len(logs)
-    routine = {
-        "wake_up": "7:00 AM",
-        "morning_study": f"{max(1, int(avg('study_hours')))} hour focused study",
-        "exercise": "20-minute walk" if avg('activity_minutes') < 20 else "Maintain current routine",
-        "afternoon_focus": "4 × 25-minute Pomodoro sessions",
-        "evening_unwind": "Avoid screens 45 minutes before sleep",
-        "sleep": "Aim for 7–8 hours"
-    }
-    # add personalized tweak
-    if avg("sleep_hours") < 6:
-        routine["sleep_tip"] = "Cut late-night caffeine, wind down 60 minutes before bed"
-    if avg("screen_time_hours") > 6:
-        routine["screen_tip"] = "Schedule 2 'no-screen' focus blocks of 50 minutes"
-    return RoutineOutput(routine=routine)
+    return RoutineOutput(routine=_latest_or_404(db, student_id)["routine"])
 
 # ---------------- Analytics ----------------
-@router.get("/analytics/{student_id}")
-def analytics(student_id: int, db: Session = Depends(get_db)):
-    logs = db.query(HabitLog).filter(HabitLog.student_id == student_id).order_by(HabitLog.date.desc()).limit(30).all()
-    if not logs:
-        raise HTTPException(status_code=404, detail="No habit logs found")
-    df = pd.DataFrame([{
-        "date": l.date.isoformat(),
-        "sleep_hours": l.sleep_hours,
-        "study_hours": l.study_hours,
-        "activity_minutes": l.activity_minutes,
-        "screen_time_hours": l.screen_time_hours,
-        "productivity": l.productivity,
-        "mood": l.mood
-    } for l in logs])
-    df["date"] = pd.to_datetime(df["date"])
+def build_analytics(s):
+    # last-30-log aggregates, maintained on write in student_stats
+    n = len(s.window)
     stats = {
-        "avg_sleep": round(df["sleep_hours"].mean(),2),
-        "avg_study": round(df["study_hours"].mean(),2),
-        "avg_activity": round(df["activity_minutes"].mean(),2),
-        "avg_productivity": round(df["productivity"].mean(),2),
-        "mood_counts": df["mood"].value_counts().to_dict()
+        "avg_sleep": round(s.last30["sleep_hours"]/n,2),
+        "avg_study": round(s.last30["study_hours"]/n,2),
+        "avg_activity": round(s.last30["activity_minutes"]/n,2),
+        "avg_productivity": round(s.last30["productivity"]/n,2),
+        "mood_counts": s.mood_counts
     }
     # trends (compare last 7 vs previous 7)
-    if len(df)>=14:
-        last7 = df.head(7)
-        prev7 = df.iloc[7:14]
-        stats["study_trend"] = round(last7["study_hours"].mean() - prev7["study_hours"].mean(),3)
-        stats["sleep_trend"] = round(last7["sleep_hours"].mean() - prev7["sleep_hours"].mean(),3)
-    # streaks
-    streaks = {}
-    # study streak: consecutive days with study_hours >= 1 starting from most recent
-    cons_study = 0
-    for _, row in df.iterrows():
-        if row["study_hours"] >= 1:
-            cons_study += 1
-        else:
-            break
-    streaks["study_streak"] = cons_study
-    stats["streaks"] = streaks
+    if n>=14:
+        stats["study_trend"] = round(s.last7["study_hours"]/7 - s.prev7["study_hours"]/7,3)
+        stats["sleep_trend"] = round(s.last7["sleep_hours"]/7 - s.prev7["sleep_hours"]/7,3)
+    # study streak: consecutive logs with study_hours >= 1 starting from most recent
+    stats["streaks"] = {"study_streak": s.study_streak}
     return stats
 
+@router.get("/analytics/cohort")
+def analytics_cohort(
+    source: Literal["stats", "logs"] = "stats",
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_db),
+):
+    """
+    /analytics/{student_id} for every student plus percentile ranks across the
+    cohort. source=logs recomputes from habit_logs in SQL instead of student_stats.
+    """
+    from ..app import cohort  # pandas; imported on first use
+    with metrics.timed("cohort_frame"):
+        frame = cohort.cohort_frame(db, source)
+    return stream_records(cohort.records(frame), format)
+
+@router.get("/analytics/{student_id}")
+def analytics(student_id: int, db: Session = Depends(get_db)):
+    return build_analytics(_stats_or_404(db, student_id))
+
 # ---------------- Recommendations ----------------
+RULE_IDS = [r.id for r in RECOMMENDATION_RULES]
+
+def routine_averages(db, student_ids):
+    """student_id -> 7-log feature averages from student_stats (building missing rows)."""
+    def load(ids):
+        for i in range(0, len(ids), IN_CHUNK):
+            for sid, last7, count in db.execute(
+                select(StudentStats.student_id, StudentStats.last7, StudentStats.log_count)
+                .where(StudentStats.student_id.in_(ids[i:i + IN_CHUNK]))
+            ):
+                avgs[sid] = [last7[c] / min(7, count) for c in FEATURE_COLUMNS]
+
+    avgs = {}
+    load(student_ids)
+    missing = [sid for sid in student_ids if sid not in avgs]
+    if missing:
+        student_stats.rebuild(db, missing)
+        load(missing)
+    return avgs
+
+@router.get("/recommend/cohort")
+def recommend_cohort(
+    rule: List[str] | None = Query(None, description=f"only students matching any of: {', '.join(RULE_IDS)}"),
+    routine: bool = False,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_db),
+):
+    """
+    Recommendations (and optionally routines) for every student with logs. The
+    rule table is evaluated as boolean masks over one latest-log feature matrix.
+    """
+    import numpy as np
+    unknown = set(rule or []) - set(RULE_IDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown rule(s): {', '.join(sorted(unknown))}")
+    rows = latest_logs(db)
+    if not rows:
+        return stream_records([], format)
+    X = np.array(rows, dtype=float)
+    ids = X[:, 0].astype(int)
+    masks = rule_masks({c: X[:, i] for i, c in enumerate(FEATURE_COLUMNS, start=1)})
+    if rule:
+        keep = masks[:, [RULE_IDS.index(r) for r in rule]].any(axis=1)
+        ids, masks = ids[keep], masks[keep]
+    recs = recommendations_from_masks(masks)
+    rule_ids = np.array(RULE_IDS, dtype=object)
+    out = [
+        {"student_id": int(sid), "rules": list(rule_ids[m]), "recommendations": r}
+        for sid, m, r in zip(ids, masks, recs)
+    ]
+    if routine and out:
+        avgs = routine_averages(db, [o["student_id"] for o in out])
+        A = np.array([avgs[o["student_id"]] for o in out])
+        for o, r in zip(out, routine_cohort({c: A[:, i] for i, c in enumerate(FEATURE_COLUMNS)})):
+            o["routine"] = r
+    return stream_records(out, format)
+
 @router.get("/recommend/{student_id}")
 def recommend(student_id: int, db: Session = Depends(get_db)):
-    log = db.query(HabitLog).filter(HabitLog.student_id == student_id).order_by(HabitLog.date.desc()).first()
-    if not log:
-        raise HTTPException(status_code=404, detail="No habit logs found")
-    latest = {
-        "sleep_hours": log.sleep_hours,
-        "study_hours": log.study_hours,
-        "activity_minutes": log.activity_minutes,
-        "screen_time_hours": log.screen_time_hours,
-        "productivity": log.productivity
-    }
-    recs = generate_recommendations(latest)
-    return {"recommendations": recs}
+    return {"recommendations": _latest_or_404(db, student_id)["recommendations"]}
+
+# ---------------- Dashboard ----------------
+def dashboard_etag(student_id, stats_version):
+    # changes whenever the student writes a log or a new model version is published;
+    # reads CURRENT rather than loading the model, so a 304 never waits on a load
+    return f'W/"{student_id}-{stats_version}-{habit_model.published_version() or 0}"'
+
+def dashboard_not_modified(student_id, if_none_match, stats_version=None):
+    """
+    304 when If-None-Match is the student's dashboard ETag at stats_version
+    (default: the version this process last saw, so no DB access), else None.
+    """
+    if stats_version is None:
+        stats_version = student_stats.known_versions.get(student_id)
+    if if_none_match and stats_version is not None and if_none_match == dashboard_etag(student_id, stats_version):
+        return Response(status_code=304, headers={"ETag": if_none_match})
+    return None
+
+def build_dashboard(s, prob, response):
+    """DashboardOut from a stats row and the break probability of its newest log."""
+    latest = student_stats.entry_dict(s.window[0])
+    response.headers["ETag"] = dashboard_etag(s.student_id, s.version)
+    return DashboardOut(
+        student_id=s.student_id,
+        version=s.version,
+        last_date=s.last_date,
+        prediction=PredictionOut(break_probability=round(prob,3), label=risk_label(prob)),
+        recommendations=generate_recommendations(latest),
+        routine=build_routine(s),
+        analytics=build_analytics(s),
+    )
+
+@router.get("/dashboard/{student_id}", response_model=DashboardOut)
+def dashboard(student_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Prediction, recommendations, routine and analytics from a single student_stats read.
+    Honors If-None-Match: a repeat load whose version this process already knows is
+    answered 304 before any DB access (the session only connects on first query).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = dashboard_not_modified(student_id, if_none_match)
+    if not_modified:
+        return not_modified
+    s = _stats_or_404(db, student_id)
+    not_modified = dashboard_not_modified(student_id, if_none_match, s.version)
+    if not_modified:
+        return not_modified
+    features = insights.latest_features(db, student_id) or student_stats.entry_dict(s.window[0])
+    return build_dashboard(s, predict_batcher.predict_break(features), response)
 
 # ---------------- Training endpoint ----------------
-@router.post("/train")
-def train_model(db: Session = Depends(get_db)):
-    df = load_logs_to_df(db)
-    if df.empty:
-        raise HTTPException(status_code=400, detail="Not enough habit logs to train")
-    res = habit_model.train_from_dataframe(df)
-    return {"result": res}
+@router.post("/train", response_model=TrainJobOut, status_code=202)
+def train_model(mode: Literal["incremental", "full"] = "incremental"):
+    """
+    Queue a background training job; poll GET /habits/train/{job_id} for the result.
+    Incremental runs only read logs newer than the model's watermark.
+    """
+    return training_jobs.submit_training(mode)
+
+@router.get("/train/{job_id}", response_model=TrainJobOut)
+def train_status(job_id: str):
+    job = training_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job
+
+@router.get("/model", response_model=ModelVersionOut)
+def model_version():
+    habit_model.refresh()
+    manifest = habit_model.manifest
+    return ModelVersionOut(
+        version=habit_model.version,
+        previous=manifest.get("previous"),
+        metrics=manifest.get("metrics", {}),
+        mode=manifest.get("mode"),
+        watermark=manifest.get("watermark"),
+        versions=list_versions(),
+        engine=habit_model.engine,
+        reloads=habit_model.reloads,
+    )
+
+@router.post("/model/rollback", response_model=ModelVersionOut)
+def rollback_model(version: str | None = None):
+    """Re-activate the previous model version (or the given one)."""
+    try:
+        habit_model.rollback(version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_version()
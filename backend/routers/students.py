@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 
 from ..app.db import get_db
+from ..app import insights, stats as student_stats
+from ..app.pagination import MAX_PAGE, decode_id_cursor, page_headers, stream_rows
 from ..models.student import Student
 from ..schemas.student import StudentCreate, StudentOut, StudentUpdate
 
@@ -16,9 +19,33 @@ def create_student(payload: StudentCreate, db: Session = Depends(get_db)):
     db.refresh(s)
     return s
 
+def students_query(cursor=None):
+    stmt = select(*[getattr(Student, c) for c in StudentOut.model_fields])
+    if cursor:
+        stmt = stmt.where(Student.id > decode_id_cursor(cursor))
+    return stmt.order_by(Student.id)
+
 @router.get("/", response_model=List[StudentOut])
-def list_students(db: Session = Depends(get_db)):
-    return db.query(Student).all()
+def list_students(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE),
+    cursor: str | None = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_db),
+):
+    """
+    Students in id order. With limit (JSON) one keyset page is returned and the next
+    cursor (last id) is sent in X-Next-Cursor / Link; otherwise rows are streamed.
+    """
+    stmt = students_query(cursor)
+    if limit is None or format == "ndjson":
+        return stream_rows(stmt.limit(limit) if limit else stmt, format)
+    rows = db.execute(stmt.limit(limit + 1)).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        page_headers(response, request, str(rows[-1]["id"]))
+    return rows
 
 @router.get("/{student_id}", response_model=StudentOut)
 def get_student(student_id: int, db: Session = Depends(get_db)):
@@ -34,6 +61,8 @@ def update_student(student_id: int, payload: StudentUpdate, db: Session = Depend
         raise HTTPException(status_code=404, detail="Student not found")
     for k,v in payload.dict(exclude_unset=True).items():
         setattr(s,k,v)
+    insights.invalidate(db, [student_id])  # coach messages depend on the profile
     db.commit()
+    student_stats.forget([student_id])
     db.refresh(s)
     return s
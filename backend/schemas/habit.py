@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import date
+from typing import List, Optional, Dict, Any
 
 class HabitCreate(BaseModel):
     student_id: int
@@ -21,9 +22,53 @@ class PredictionOut(BaseModel):
     break_probability: float
     label: str
 
+class StudentPredictionOut(PredictionOut):
+    student_id: int
+
+class BatchPredictIn(BaseModel):
+    student_ids: Optional[List[int]] = None  # None -> every student with logs
+
 class CoachOutput(BaseModel):
     message: str
 
 class RoutineOutput(BaseModel):
     routine: dict
 
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkIngestOut(BaseModel):
+    inserted: int  # new days
+    updated: int  # already logged days overwritten in place
+    failed: int
+    errors: List[BulkRowError]
+
+class TrainJobOut(BaseModel):
+    job_id: str
+    mode: str  # incremental | full
+    status: str  # queued | running | succeeded | failed
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class ModelVersionOut(BaseModel):
+    version: Optional[str]
+    previous: Optional[str] = None
+    metrics: Dict[str, Any] = {}
+    mode: Optional[str] = None
+    watermark: Optional[Dict[str, Any]] = None
+    versions: List[str] = []
+    engine: Optional[str] = None
+    reloads: Dict[str, Any] = {}  # versions picked up from other processes (count, last_ms, last_at)
+
+class DashboardOut(BaseModel):
+    student_id: int
+    version: int  # student_stats version the response was built from
+    last_date: date
+    prediction: PredictionOut
+    recommendations: List[str]
+    routine: dict
+    analytics: dict
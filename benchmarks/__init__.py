@@ -0,0 +1,20 @@
+"""
+Benchmark suite. Every module runs with `python -m benchmarks.<name> --help`
+and prints one JSON document ({"benchmark", "meta", "results"}; --out also
+writes it to a file). Compare two runs with `python -m benchmarks.compare`.
+
+    synthetic                seeded Student/HabitLog generator (N students x M days)
+    micro                    load_logs_to_df, train_from_dataframe, predict_break,
+                             analytics, generate_recommendations
+    loadgen                  in-process load over a route mix: p50/p95/p99 and req/s per route
+    load_db                  read/write load per DB mode (sync, async, write batcher)
+    bench_training_set       vectorized vs legacy training-set build
+    bench_inference          sklearn vs compiled forest predict
+    bench_model_serving      per-worker memory and hot reload across worker processes
+    bench_cohort_analytics   school-wide analytics frame
+    bench_startup            import/startup time; exits 1 on regressions
+    bench_predict_batching   throughput vs tail latency of prediction micro-batching
+    bench_archive            DB size, training scan and hot reads before/after archiving
+    bench_export             streaming export rows/s and peak RSS per format
+    bench_latest_cache       predict/coach/recommend/routine latency, latest-log cache off vs on
+"""
@@ -0,0 +1,72 @@
+"""
+Hot/cold tiering (backend/app/archive.py): SQLite size, a full-history
+training scan and the per-student hot reads, before and after archiving logs
+older than --horizon-days.
+
+    python -m benchmarks.bench_archive --students 2000 --days 365 --horizon-days 90
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from .common import add_output_args, emit, time_calls, time_once
+from .synthetic import populate
+
+
+def _measure(db, db_path, sample):
+    from backend.app import feature_store, stats
+    from backend.ml.train_habit_model import load_logs_to_df
+    seconds, df = time_once(load_logs_to_df, db)
+    return {
+        "db_mb": round(os.path.getsize(db_path) / 2**20, 2),
+        "load_logs_to_df_s": seconds,
+        "training_rows": len(df),
+        "feature_latest": time_calls(lambda sid: feature_store.latest(db, sid), [(s,) for s in sample]),
+        "stats_get": time_calls(lambda sid: stats.get_stats(db, sid), [(s,) for s in sample]),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=1000)
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--horizon-days", type=int, default=90)
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    out = os.path.abspath(args.out) if args.out else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # settings are read at import time; archive/ is cwd-relative
+        db_path = os.path.join(tmp, "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        os.chdir(tmp)
+        from sqlalchemy import func, select
+        from backend.app import archive, feature_store, stats
+        from backend.app.db import SessionLocal, engine
+        from backend.models.habit import HabitLog
+
+        results = {"students": args.students, "days": args.days, "horizon_days": args.horizon_days,
+                   "rows": populate(engine, args.students, args.days, args.seed)}
+        rng = random.Random(args.seed)
+        sample = [rng.randint(1, args.students) for _ in range(args.calls)]
+        with SessionLocal() as db:
+            feature_store.rebuild(db)
+            stats.rebuild(db)
+            archive.vacuum()
+            results["before"] = _measure(db, db_path, sample)
+            today = db.execute(select(func.max(HabitLog.date))).scalar()
+            seconds, res = time_once(archive.archive_logs, db, args.horizon_days, today)
+            results["archive"] = {"s": seconds, "logs": res["logs"], "months": res["months"]}
+            db.close()
+            results["archive"]["vacuum_s"], _ = time_once(archive.vacuum)
+            results["archive"]["parquet_mb"] = round(archive.stats()["bytes"] / 2**20, 2)
+            results["after"] = _measure(db, db_path, sample)
+        engine.dispose()
+    emit("archive", results, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Time the cohort analytics builder from student_stats and from habit_logs.
+
+    python -m benchmarks.bench_cohort_analytics --students 100000 --days 365
+
+student_stats is backfilled first (timed separately; in production it is
+maintained on every write). Peak RSS is reported because the builder keeps
+only per-student aggregates in memory, never the logs.
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import cohort, stats
+from .common import add_output_args, emit
+from .synthetic import populate
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=20_000)
+    ap.add_argument("--days", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--skip-logs", action="store_true", help="don't time the source=logs path")
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        rows = populate(engine, args.students, args.days, args.seed)
+        Session = sessionmaker(bind=engine)
+        results = {"students": args.students, "rows": rows}
+
+        with Session() as db:
+            t = time.perf_counter()
+            stats.rebuild(db)
+            results["stats_backfill_s"] = round(time.perf_counter() - t, 2)
+
+        sources = ["stats"] if args.skip_logs else ["stats", "logs"]
+        for source in sources:
+            with Session() as db:
+                t = time.perf_counter()
+                df = cohort.cohort_frame(db, source)
+                built = time.perf_counter() - t
+                t = time.perf_counter()
+                n = sum(1 for _ in cohort.records(df))
+                results[source] = {
+                    "students": n,
+                    "frame_s": round(built, 2),
+                    "records_s": round(time.perf_counter() - t, 2),
+                }
+        engine.dispose()
+
+    results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    emit("cohort_analytics", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+GET /habits/export: rows/s and peak RSS per format, and the latency of
+/students/{id} requests served while the export is streaming.
+
+    python -m benchmarks.bench_export --students 5000 --days 365 --formats csv,ndjson,parquet
+
+Every format runs in a fresh interpreter against the same populated DB, so
+peak RSS is that export's alone; a flat peak as --days grows is the
+constant-memory property.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import REPO, add_output_args, emit, percentiles
+
+
+def _peak_rss_mb():
+    # VmHWM starts over at exec; ru_maxrss would include the parent's peak from before the fork
+    with open("/proc/self/status") as f:
+        kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    return round(kb / 1024, 1)
+
+
+async def _run(fmt, predictions, students, probes):
+    import httpx
+    from backend.app.main import app
+
+    rng = random.Random(0)
+    async with app.router.lifespan_context(app):
+        rss0 = _peak_rss_mb()  # after warm-up: with --predictions the model itself is most of the peak
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            done = asyncio.Event()
+
+            async def export():
+                # raw ASGI call that counts and drops the body: httpx's ASGI transport
+                # would buffer the whole response in this process
+                size = 0
+                scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                         "scheme": "http", "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+                         "path": "/habits/export", "raw_path": b"/habits/export", "headers": [],
+                         "query_string": f"format={fmt}&predictions={str(predictions).lower()}".encode()}
+
+                requested = False
+
+                async def receive():
+                    nonlocal requested
+                    if not requested:
+                        requested = True
+                        return {"type": "http.request", "body": b"", "more_body": False}
+                    await done.wait()
+                    return {"type": "http.disconnect"}
+
+                async def send(message):
+                    nonlocal size
+                    size += len(message.get("body", b""))
+
+                t = time.perf_counter()
+                await app(scope, receive, send)
+                done.set()
+                return time.perf_counter() - t, size
+
+            async def probe():
+                lat = []
+                while not done.is_set() and len(lat) < probes:
+                    t = time.perf_counter()
+                    await client.get(f"/students/{rng.randint(1, students)}")
+                    lat.append(time.perf_counter() - t)
+                    await asyncio.sleep(0.005)
+                return lat
+
+            (seconds, size), lat = await asyncio.gather(export(), probe())
+    return {
+        "s": round(seconds, 3),
+        "mb": round(size / 2**20, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": round(_peak_rss_mb() - rss0, 1),  # what the export added
+        "concurrent_students": {"requests": len(lat), **percentiles(lat)},
+    }
+
+
+def _child(args):
+    res = asyncio.run(_run(args.format, args.predictions, args.students, args.probes))
+    print(json.dumps(res))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=2000)
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--formats", default="csv,ndjson,parquet")
+    ap.add_argument("--predictions", action="store_true", help="join break probability / mood (trains a model first)")
+    ap.add_argument("--probes", type=int, default=2000, help="max /students requests during each export")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--format", help=argparse.SUPPRESS)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    if args.child:
+        return _child(args)
+    out = os.path.abspath(args.out) if args.out else None
+
+    results = {"students": args.students, "days": args.days, "predictions": args.predictions}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.chdir(tmp)
+        from backend.app import feature_store
+        from backend.app.db import SessionLocal, engine
+        from .synthetic import populate
+
+        results["rows"] = populate(engine, args.students, args.days)
+        if args.predictions:
+            from backend.ml.habit_model import habit_model
+            from backend.ml.train_habit_model import load_logs_to_df
+            with SessionLocal() as db:
+                habit_model.train_from_dataframe(load_logs_to_df(db))
+        else:
+            with SessionLocal() as db:
+                feature_store.rebuild(db)
+        engine.dispose()
+
+        env = {**os.environ, "PYTHONPATH": REPO + os.pathsep + os.environ.get("PYTHONPATH", "")}
+        cmd = [sys.executable, "-m", "benchmarks.bench_export", "--child", "--students", str(args.students),
+               "--probes", str(args.probes)] + (["--predictions"] if args.predictions else [])
+        for fmt in args.formats.split(","):
+            res = json.loads(subprocess.run(cmd + ["--format", fmt], cwd=tmp, env=env,
+                                            capture_output=True, text=True, check=True).stdout)
+            res["rows_per_s"] = int(results["rows"] / res["s"])
+            results[fmt] = res
+    emit("export", results, out)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
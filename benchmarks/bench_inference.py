@@ -0,0 +1,72 @@
+"""
+Single-row latency and batch throughput of the sklearn path vs the compiled
+forest engine, plus the largest probability difference between them.
+
+    python -m benchmarks.bench_inference --rows 50000 --calls 2000
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from backend.ml.forest_engine import CompiledForest
+from backend.ml.habit_model import FEATURE_COLUMNS
+from .common import add_output_args, emit
+from .synthetic import generate_logs
+
+
+def _latency(fn, rows, calls):
+    ts = np.empty(calls)
+    for i in range(calls):
+        x = rows[i % len(rows)][None, :]
+        t = time.perf_counter()
+        fn(x)
+        ts[i] = time.perf_counter() - t
+    return {"p50_us": round(float(np.percentile(ts, 50)) * 1e6, 1),
+            "p99_us": round(float(np.percentile(ts, 99)) * 1e6, 1)}
+
+
+def _throughput(fn, X, repeat=3):
+    best = min(_timed(fn, X) for _ in range(repeat))
+    return int(len(X) / best)
+
+
+def _timed(fn, X):
+    t = time.perf_counter()
+    fn(X)
+    return time.perf_counter() - t
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000, help="training rows")
+    ap.add_argument("--calls", type=int, default=2000, help="single-row calls per engine")
+    ap.add_argument("--batch", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=0)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    cols = generate_logs(max(1, args.rows // 100), 100, args.seed)
+    X = np.column_stack([cols[c] for c in FEATURE_COLUMNS]).astype(float)
+    y_break = (cols["productivity"] < 4).astype(int) ^ (np.random.default_rng(args.seed).random(len(X)) < 0.1)
+    results = {"train_rows": len(X)}
+    for name, y in (("habit", y_break), ("mood", cols["mood"])):
+        clf = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+        compiled = CompiledForest.from_sklearn(clf)
+        batch = X[: args.batch]
+        diff = float(np.abs(clf.predict_proba(batch) - compiled.predict_proba(batch)).max())
+        results[name] = {
+            "nodes": int(len(compiled.feature)),
+            "max_abs_proba_diff": diff,
+            "labels_equal": bool((clf.predict(batch) == compiled.predict(batch)).all()),
+            "sklearn_single": _latency(clf.predict_proba, X, args.calls),
+            "compiled_single": _latency(compiled.predict_proba, X, args.calls),
+            "sklearn_batch_rows_per_s": _throughput(clf.predict_proba, batch),
+            "compiled_batch_rows_per_s": _throughput(compiled.predict_proba, batch),
+        }
+    emit("inference", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Latest-log cache (stats.latest_cache): latency of predict / coach / recommend /
+routine with the cache off (LATEST_CACHE_SIZE=0) and on, under a read-heavy
+loadgen mix with some log writes invalidating entries (through the
+group-commit writer unless WRITE_BATCHER=0: a tenth of the requests writing
+in parallel would otherwise hit SQLite's busy timeout). Each setting runs in
+a fresh interpreter since the settings are read at import.
+
+    python -m benchmarks.bench_latest_cache --students 300 --requests 6000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from .common import REPO, add_output_args, emit
+
+MIX = "predict=3,recommend=2,routine=1,coach=1,log=1"
+ROUTES = ["predict", "recommend", "routine", "coach", "log"]
+
+
+def _loadgen(args, env, out):
+    cmd = [sys.executable, "-m", "benchmarks.loadgen", "--students", str(args.students), "--days", str(args.days),
+           "--requests", str(args.requests), "--concurrency", str(args.concurrency), "--mix", MIX, "--out", out]
+    subprocess.run(cmd, cwd=REPO, env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(out) as f:
+        res = json.load(f)["results"]
+    return {
+        "req_per_s": res["req_per_s"],
+        "errors": res["errors"],
+        **{r: {k: res["routes"][r][k] for k in ("p50_ms", "p95_ms", "p99_ms")} for r in ROUTES if r in res["routes"]},
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=300)
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--requests", type=int, default=6000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    out = os.path.abspath(args.out) if args.out else None
+
+    results = {"students": args.students, "concurrency": args.concurrency, "db_mode": os.getenv("DB_MODE", "sync")}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, size in (("off", "0"), ("on", os.getenv("LATEST_CACHE_SIZE", "50000"))):
+            env = {"WRITE_BATCHER": "1", **os.environ, "LATEST_CACHE_SIZE": size}
+            results[name] = _loadgen(args, env, os.path.join(tmp, f"{name}.json"))
+    emit("latest_cache", results, out)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Per-worker memory and hot-reload latency of model serving with N worker
+processes, as under `uvicorn --workers N`.
+
+    python -m benchmarks.bench_model_serving --rows 100000 --workers 4
+
+Two versions are trained into a temporary models/ dir. For each inference
+engine, N workers load the current version and serve predictions; each then
+reports RSS, PSS (shared pages split between the processes mapping them) and
+USS (pages only it holds) from /proc/self/smaps_rollup. The parent activates
+the second version and every worker times its next prediction, which notices
+the new CURRENT and reloads.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .common import REPO, add_output_args, emit
+from .synthetic import generate_logs
+
+ENGINES = ["sklearn", "compiled"]
+
+
+def _memory():
+    """RSS/PSS/USS in MB for this process (Linux); only peak RSS elsewhere."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            kb = {k: int(v.split()[0]) for k, v in (line.split(":", 1) for line in f if ":" in line and "kB" in line)}
+    except OSError:
+        import resource
+        return {"peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    uss = kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)
+    return {"rss_mb": round(kb["Rss"] / 1024, 1), "pss_mb": round(kb["Pss"] / 1024, 1), "uss_mb": round(uss / 1024, 1)}
+
+
+def _child(args):
+    t = time.perf_counter()
+    from backend.ml.habit_model import habit_model
+    habit_model.load()
+    load_s = time.perf_counter() - t
+    rng = np.random.default_rng(os.getpid())
+    rows = [dict(zip(habit_model.features, r)) for r in rng.uniform(0, 10, (args.calls, len(habit_model.features)))]
+    for row in rows:
+        habit_model.predict_break(row)
+    print(json.dumps({"version": habit_model.version, "load_s": round(load_s, 3)}), flush=True)
+    for cmd in sys.stdin:
+        cmd = cmd.strip()
+        if cmd == "measure":
+            print(json.dumps(_memory()), flush=True)
+        elif cmd == "reload":
+            t = time.perf_counter()
+            habit_model.predict_break(rows[0])
+            first_ms = (time.perf_counter() - t) * 1000
+            print(json.dumps({"version": habit_model.version, "first_predict_ms": round(first_ms, 2),
+                              "reload_ms": habit_model.reloads["last_ms"]}), flush=True)
+
+
+def _ask(procs, cmd=None):
+    if cmd:
+        for p in procs:
+            p.stdin.write(cmd + "\n")
+            p.stdin.flush()
+    return [json.loads(p.stdout.readline()) for p in procs]
+
+
+def _size_mb(path):
+    if os.path.isdir(path):
+        return round(sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs) / 2**20, 1)
+    return round(os.path.getsize(path) / 2**20, 1)
+
+
+def _summary(values):
+    return {"mean": round(float(np.mean(values)), 2), "max": round(float(np.max(values)), 2)}
+
+
+def _train_versions(rows, seed):
+    from backend.ml.habit_model import FEATURE_COLUMNS, habit_model
+    cols = generate_logs(max(1, rows // 100), 100, seed)
+    df = pd.DataFrame({c: cols[c] for c in [*FEATURE_COLUMNS, "mood"]})
+    df["break_tomorrow"] = ((df["productivity"] < 4) ^ (np.random.default_rng(seed).random(len(df)) < 0.1)).astype(int)
+    first = habit_model.train_from_dataframe(df)["version"]
+    second = habit_model.train_from_dataframe(df.sample(frac=1, random_state=seed + 1))["version"]
+    return habit_model, first, second
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000, help="training rows per version")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--calls", type=int, default=200, help="predictions per worker before measuring")
+    ap.add_argument("--engines", default=",".join(ENGINES))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    if args.child:
+        return _child(args)
+    out = os.path.abspath(args.out) if args.out else None
+
+    results = {"rows": args.rows, "workers": args.workers}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # models/ is relative to the working directory
+        habit_model, first, second = _train_versions(args.rows, args.seed)
+        results["artifact_mb"] = {
+            name: _size_mb(os.path.join(tmp, "models", "versions", first, name))
+            for name in ("habit_predict.joblib", "mood_predict.joblib", "habit_forest", "mood_forest")
+        }
+        env = {**os.environ, "PYTHONPATH": REPO + os.pathsep + os.environ.get("PYTHONPATH", "")}
+        for engine in args.engines.split(","):
+            habit_model.activate(first)
+            procs = [
+                subprocess.Popen(
+                    [sys.executable, "-m", "benchmarks.bench_model_serving", "--child", "--calls", str(args.calls)],
+                    cwd=tmp, env={**env, "HABIT_INFERENCE_ENGINE": engine},
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                )
+                for _ in range(args.workers)
+            ]
+            try:
+                ready = _ask(procs)
+                memory = _ask(procs, "measure")  # once every worker is loaded, so PSS splits shared pages
+                habit_model.activate(second)
+                reloaded = _ask(procs, "reload")
+                after = _ask(procs, "measure")
+            finally:
+                for p in procs:
+                    p.stdin.close()
+                    p.wait()
+            res = {
+                "load_s": _summary([r["load_s"] for r in ready]),
+                "reloaded_all": all(r["version"] == second for r in reloaded),
+                "reload_ms": _summary([r["reload_ms"] or 0 for r in reloaded]),
+                "first_predict_after_publish_ms": _summary([r["first_predict_ms"] for r in reloaded]),
+            }
+            for label, mem in (("memory", memory), ("memory_after_reload", after)):
+                res[label] = {k: _summary([m[k] for m in mem]) for k in mem[0]}
+                if "pss_mb" in mem[0]:
+                    res[label]["pss_total_mb"] = round(sum(m["pss_mb"] for m in mem), 1)
+            results[engine] = res
+    emit("model_serving", results, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput vs tail latency of prediction micro-batching (PREDICT_BATCHER):
+the predict + dashboard mix from loadgen, once unbatched and once per
+(max rows, max wait) setting, each in a fresh interpreter since the settings
+are read at import.
+
+    python -m benchmarks.bench_predict_batching --concurrency 64 --settings 16:1,64:2,64:5
+    HABIT_INFERENCE_ENGINE=compiled DB_MODE=async python -m benchmarks.bench_predict_batching
+
+Reports req/s and p50/p95/p99 of /habits/predict per setting, plus the
+batcher's average batch size.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from .common import REPO, add_output_args, emit
+
+MIX = "predict=3,dashboard=1"
+
+
+def _loadgen(args, env, out):
+    cmd = [sys.executable, "-m", "benchmarks.loadgen", "--students", str(args.students), "--days", str(args.days),
+           "--requests", str(args.requests), "--concurrency", str(args.concurrency), "--mix", MIX, "--out", out]
+    subprocess.run(cmd, cwd=REPO, env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(out) as f:
+        res = json.load(f)["results"]
+    predict = res["routes"]["predict"]
+    return {
+        "req_per_s": res["req_per_s"],
+        "errors": res["errors"],
+        **{k: predict[k] for k in ("p50_ms", "p95_ms", "p99_ms")},
+        "avg_batch_rows": res.get("predict_batcher", {}).get("avg_batch_rows", 1),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=300)
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--requests", type=int, default=4000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--settings", default="16:1,64:2,64:5", help="max_rows:max_wait_ms,... to try with batching on")
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    out = os.path.abspath(args.out) if args.out else None
+
+    results = {"concurrency": args.concurrency, "engine": os.getenv("HABIT_INFERENCE_ENGINE", "sklearn"),
+               "db_mode": os.getenv("DB_MODE", "sync")}
+    configs = {"off": {"PREDICT_BATCHER": "0"}}
+    for setting in args.settings.split(","):
+        rows, _, wait = setting.partition(":")
+        configs[f"rows{rows}_wait{wait}ms"] = {
+            "PREDICT_BATCHER": "1", "PREDICT_BATCH_MAX_ROWS": rows, "PREDICT_BATCH_MAX_WAIT_MS": wait}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, extra in configs.items():
+            results[name] = _loadgen(args, {**os.environ, **extra}, os.path.join(tmp, f"{name}.json"))
+    emit("predict_batching", results, out)
+
+
+if __name__ == "__main__":
+    main()
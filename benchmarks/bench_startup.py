@@ -0,0 +1,118 @@
+"""
+Cold-start cost of the API: import time, lifespan startup and the first
+requests, per MODEL_PRELOAD mode. Also a regression guard: exits 1 when
+importing backend.app.main pulls in a heavy dependency or takes longer than
+--max-import-s.
+
+    python -m benchmarks.bench_startup --trials 5
+
+Every trial is a fresh interpreter (run in a temporary dir holding a small
+populated DB and a trained model version), so imports are never cached.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import REPO, add_output_args, emit
+
+# must stay out of `import backend.app.main`; they load on first use
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "sklearn", "joblib"]
+PRELOAD_MODES = ["lazy", "startup", "background"]
+
+
+async def _first_requests():
+    import httpx
+    from backend.app.main import app
+
+    out = {}
+    t = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        out["startup_s"] = time.perf_counter() - t
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for name, path in (("students", "/students/?limit=10"), ("predict", "/habits/predict/1")):
+                t = time.perf_counter()
+                r = await client.get(path)
+                r.raise_for_status()
+                out[f"first_{name}_s"] = time.perf_counter() - t
+    return out
+
+
+def _child():
+    t = time.perf_counter()
+    import backend.app.main  # noqa: F401
+    res = {"import_s": time.perf_counter() - t, "heavy": [m for m in HEAVY_MODULES if m in sys.modules]}
+    res.update(asyncio.run(_first_requests()))
+    print(json.dumps(res))
+
+
+def _prepare(tmp, students, days):
+    """Populated DB plus one trained model version under tmp (models/ is cwd-relative)."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.chdir(tmp)
+    from backend.app import feature_store
+    from backend.app.db import SessionLocal, engine
+    from backend.ml.habit_model import habit_model
+    from backend.ml.train_habit_model import load_logs_to_df
+    from .synthetic import populate
+
+    populate(engine, students, days)
+    with SessionLocal() as db:
+        feature_store.rebuild(db)
+        habit_model.train_from_dataframe(load_logs_to_df(db))
+    engine.dispose()
+
+
+def _median(values):
+    values = sorted(values)
+    return round(values[len(values) // 2], 3)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trials", type=int, default=3, help="fresh interpreters per mode")
+    ap.add_argument("--students", type=int, default=200)
+    ap.add_argument("--days", type=int, default=100)
+    ap.add_argument("--modes", default=",".join(PRELOAD_MODES))
+    ap.add_argument("--max-import-s", type=float, default=2.0, help="guard: fail when the median import is slower")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    if args.child:
+        return _child()
+    out = os.path.abspath(args.out) if args.out else None
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare(tmp, args.students, args.days)
+        env = {**os.environ, "PYTHONPATH": REPO + os.pathsep + os.environ.get("PYTHONPATH", "")}
+        for mode in args.modes.split(","):
+            runs = [
+                json.loads(subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+                    cwd=tmp, env={**env, "MODEL_PRELOAD": mode}, capture_output=True, text=True, check=True,
+                ).stdout)
+                for _ in range(args.trials)
+            ]
+            results[mode] = {k: _median([r[k] for r in runs]) for k in runs[0] if k != "heavy"}
+            results[mode]["heavy_at_import"] = sorted({m for r in runs for m in r["heavy"]})
+
+    failures = []
+    for mode, res in results.items():
+        if res["heavy_at_import"]:
+            failures.append(f"{mode}: importing backend.app.main loaded {', '.join(res['heavy_at_import'])}")
+        if res["import_s"] > args.max_import_s:
+            failures.append(f"{mode}: import took {res['import_s']}s (limit {args.max_import_s}s)")
+    results["ok"] = not failures
+    emit("startup", results, out)
+    for f in failures:
+        print(f"FAIL {f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Compare the vectorized load_logs_to_df with the legacy ORM + per-row loop.
+
+    python -m benchmarks.bench_training_set --students 2000 --days 500
+
+The legacy builder is roughly quadratic, so by default it only runs on a
+--legacy-rows prefix of the students and its time is scaled linearly (which
+understates the real gap).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.ml.habit_model import FEATURE_COLUMNS
+from backend.ml.train_habit_model import load_logs_to_df
+from .common import add_output_args, emit
+from .synthetic import populate
+
+
+def legacy_load_logs_to_df(db_session, student_limit=None):
+    from backend.models.habit import HabitLog
+    q = db_session.query(HabitLog)
+    if student_limit:
+        q = q.filter(HabitLog.student_id <= student_limit)
+    logs = q.order_by(HabitLog.student_id, HabitLog.date).all()
+    rows = [{
+        "student_id": l.student_id,
+        "date": l.date.isoformat(),
+        **{c: getattr(l, c) for c in FEATURE_COLUMNS},
+        "mood": l.mood,
+    } for l in logs]
+    df = pd.DataFrame(rows).sort_values(["student_id", "date"])
+    df["break_tomorrow"] = 0
+    for sid in df["student_id"].unique():
+        s = df[df["student_id"] == sid].reset_index(drop=True)
+        for i in range(len(s) - 1):
+            next_prod = s.loc[i + 1, "productivity"] or 0
+            next_study = s.loc[i + 1, "study_hours"] or 0
+            df.loc[s.index[i], "break_tomorrow"] = 1 if (next_prod < 3 or next_study == 0) else 0
+    return df
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=2000)
+    ap.add_argument("--days", type=int, default=500)
+    ap.add_argument("--legacy-rows", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=0)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        rows = populate(engine, args.students, args.days, args.seed)
+        Session = sessionmaker(bind=engine)
+
+        with Session() as db:
+            t = time.perf_counter()
+            df = load_logs_to_df(db)
+            vectorized = time.perf_counter() - t
+            mem_mb = df.memory_usage(deep=True).sum() / 2**20
+
+        legacy_students = max(1, min(args.students, args.legacy_rows // args.days))
+        with Session() as db:
+            t = time.perf_counter()
+            legacy_load_logs_to_df(db, student_limit=legacy_students)
+            legacy = time.perf_counter() - t
+        legacy_scaled = legacy * rows / (legacy_students * args.days)
+        engine.dispose()
+
+    emit("training_set", {
+        "rows": rows,
+        "vectorized_s": round(vectorized, 3),
+        "vectorized_rows_per_s": int(rows / vectorized),
+        "frame_mb": round(mem_mb, 1),
+        "legacy_rows": legacy_students * args.days,
+        "legacy_s": round(legacy, 3),
+        "legacy_scaled_s": round(legacy_scaled, 1),
+        "speedup": round(legacy_scaled / vectorized, 1),
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmarks: latency percentiles and the JSON result
+envelope. Every benchmark prints one JSON document (and writes it to --out)
+with a "meta" block naming the commit, so runs can be diffed with
+`python -m benchmarks.compare`.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentiles(seconds, unit="ms"):
+    """Latency summary of a list of durations in seconds."""
+    if not len(seconds):
+        return {}
+    scale = {"ms": 1e3, "us": 1e6}[unit]
+    ts = np.asarray(seconds) * scale
+    p50, p95, p99 = np.percentile(ts, [50, 95, 99])
+    return {
+        f"p50_{unit}": round(float(p50), 3),
+        f"p95_{unit}": round(float(p95), 3),
+        f"p99_{unit}": round(float(p99), 3),
+        f"mean_{unit}": round(float(ts.mean()), 3),
+    }
+
+
+def time_calls(fn, args_iter, unit="us"):
+    """Call fn(*args) for every args tuple, timing each call -> percentiles + calls/s."""
+    ts = []
+    for args in args_iter:
+        t = time.perf_counter()
+        fn(*args)
+        ts.append(time.perf_counter() - t)
+    return {"calls": len(ts), **percentiles(ts, unit), "calls_per_s": round(len(ts) / sum(ts), 1) if ts else 0}
+
+
+def time_once(fn, *args, repeat=1):
+    """Best wall time of fn(*args) over repeat runs -> (seconds, last result)."""
+    best, res = None, None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        res = fn(*args)
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return round(best, 4), res
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=REPO, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def add_output_args(ap):
+    ap.add_argument("--out", help="also write the JSON results to this file")
+
+
+def emit(name, results, out=None):
+    """Print the results (and write them to out) wrapped with benchmark name and environment."""
+    doc = {"benchmark": name, "meta": environment(), "results": results}
+    text = json.dumps(doc, indent=2, default=str)
+    print(text)
+    if out:
+        with open(out, "w") as f:
+            f.write(text + "\n")
+    sys.stdout.flush()
+    return doc
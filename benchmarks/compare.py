@@ -0,0 +1,73 @@
+"""
+Diff two benchmark result files (written with --out), e.g. from two commits:
+
+    python -m benchmarks.compare base.json head.json --threshold 0.1 --fail
+
+Numeric results are matched by path. Latency/time/memory keys (*_ms, *_us,
+*_s, *_mb) are better lower, rates (*per_s) and accuracies (*_acc) higher; a
+change worse than --threshold is marked REGRESSION.
+"""
+import argparse
+import json
+import sys
+
+
+def flatten(obj, prefix=""):
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            out.update(flatten(v, f"{prefix}.{k}" if prefix else str(k)))
+        return out
+    if isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        return {prefix: obj}
+    return {}
+
+
+def direction(key):
+    """+1 when higher is better, -1 when lower is better, 0 when it's just a count/setting."""
+    leaf = key.rsplit(".", 1)[-1]
+    if leaf.endswith("per_s") or leaf.endswith("_acc"):
+        return 1
+    if leaf.endswith(("_ms", "_us", "_s", "_mb")) or leaf in ("s", "mean", "max"):
+        return -1
+    return 0
+
+
+def compare(base, head, threshold):
+    a, b = flatten(base.get("results", base)), flatten(head.get("results", head))
+    rows = []
+    for key in a.keys() & b.keys():
+        old, new = a[key], b[key]
+        change = (new - old) / old if old else 0.0
+        worse = -change * direction(key)
+        status = "REGRESSION" if worse > threshold else "improved" if worse < -threshold else ""
+        rows.append((key, old, new, change, status))
+    return sorted(rows)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("base")
+    ap.add_argument("head")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative change that counts (default 10%%)")
+    ap.add_argument("--fail", action="store_true", help="exit 1 when anything regressed")
+    args = ap.parse_args(argv)
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    commits = [d.get("meta", {}).get("commit") or "?" for d in (base, head)]
+    print(f"{base.get('benchmark', '?')}: {commits[0]} -> {commits[1]}")
+    rows = compare(base, head, args.threshold)
+    width = max((len(r[0]) for r in rows), default=10)
+    for key, old, new, change, status in rows:
+        print(f"{key:<{width}}  {old:>12.4g}  {new:>12.4g}  {change:>+8.1%}  {status}")
+    regressions = [r for r in rows if r[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+    return 1 if regressions and args.fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
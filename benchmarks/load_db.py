@@ -0,0 +1,115 @@
+"""
+Concurrent read/write load against the API in sync and async DB modes, and
+with the group-commit write batcher.
+
+Each mode runs in its own subprocess (DB settings are read at import time)
+against a fresh temporary SQLite file. Readers hit /habits/dashboard and
+/habits/logs, writers POST /habits/log; requests go through httpx's ASGI
+transport, so this measures the app and the database, not the network.
+
+    python -m benchmarks.load_db --students 200 --days 60 --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .common import add_output_args, emit, percentiles
+
+# mode -> environment overrides for the child process
+MODES = {
+    "sync": {"DB_MODE": "sync"},
+    "async": {"DB_MODE": "async"},
+    "batched": {"DB_MODE": "sync", "WRITE_BATCHER": "1"},
+}
+
+
+async def _run(args):
+    import httpx
+    from backend.app.db import engine
+    from backend.app.main import app
+    from .synthetic import populate
+
+    populate(engine, args.students, args.days, args.seed)
+    rng = random.Random(args.seed)
+    next_day = {}
+    lat = {"read": [], "write": []}
+    errors = 0
+    todo = iter(range(args.requests))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in todo:
+            sid = rng.randint(1, args.students)
+            if rng.random() < args.write_ratio:
+                kind = "write"
+                day = next_day.get(sid, args.days)
+                next_day[sid] = day + 1
+                req = client.post("/habits/log", json={
+                    "student_id": sid, "date": str(np.datetime64("2024-01-01") + day),
+                    "sleep_hours": 7.0, "study_hours": 2.0, "activity_minutes": 30,
+                    "mood": "neutral", "screen_time_hours": 4.0, "productivity": 6.0,
+                })
+            else:
+                kind = "read"
+                path = f"/habits/dashboard/{sid}" if rng.random() < 0.5 else f"/habits/logs/{sid}?limit=50"
+                req = client.get(path)
+            t = time.perf_counter()
+            r = await req
+            lat[kind].append(time.perf_counter() - t)
+            errors += r.status_code >= 400
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        t = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t
+    return {
+        "requests": args.requests,
+        "errors": errors,
+        "req_per_s": round(args.requests / elapsed, 1),
+        "read": percentiles(lat["read"]),
+        "write": percentiles(lat["write"]),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=200)
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--write-ratio", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--modes", default=",".join(MODES), help=f"comma-separated subset of {', '.join(MODES)}")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    results = {}
+    passthrough = [f"--{k.replace('_', '-')}={v}" for k, v in vars(args).items() if k not in ("modes", "child", "out") and v is not None]
+    for mode in args.modes.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, **MODES[mode], "DATABASE_URL": f"sqlite:///{tmp}/bench.db"}
+            env.pop("ASYNC_DATABASE_URL", None)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.load_db", *passthrough, "--child"],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+    emit("load_db", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
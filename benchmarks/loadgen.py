@@ -0,0 +1,145 @@
+"""
+In-process load generator for the FastAPI app: a weighted mix of routes
+against a synthetic dataset, reporting per-route p50/p95/p99 latency and
+throughput. Requests go through httpx's ASGI transport (lifespan included),
+so this measures the app and the database, not the network.
+
+    python -m benchmarks.loadgen --students 500 --days 90 --requests 5000 --concurrency 16
+    python -m benchmarks.loadgen --mix dashboard=5,log=1 --out load.json
+
+DB_MODE, WRITE_BATCHER, PREDICT_BATCHER, HABIT_INFERENCE_ENGINE, ... are taken from the
+environment as the app reads them. A model is trained before the run unless
+--no-train.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from .common import add_output_args, emit, percentiles
+from .synthetic import MOODS, populate
+
+# route -> (weight, request builder(rng, students, next_day))
+ROUTES = {
+    "student": (2, lambda rng, n, day: ("GET", f"/students/{rng.randint(1, n)}", None)),
+    "logs": (2, lambda rng, n, day: ("GET", f"/habits/logs/{rng.randint(1, n)}?limit=50", None)),
+    "dashboard": (4, lambda rng, n, day: ("GET", f"/habits/dashboard/{rng.randint(1, n)}", None)),
+    "predict": (3, lambda rng, n, day: ("GET", f"/habits/predict/{rng.randint(1, n)}", None)),
+    "predict_batch": (1, lambda rng, n, day: (
+        "POST", "/habits/predict/batch", {"student_ids": rng.sample(range(1, n + 1), min(n, 50))})),
+    "analytics": (2, lambda rng, n, day: ("GET", f"/habits/analytics/{rng.randint(1, n)}", None)),
+    "recommend": (2, lambda rng, n, day: ("GET", f"/habits/recommend/{rng.randint(1, n)}", None)),
+    "routine": (1, lambda rng, n, day: ("GET", f"/habits/routine/{rng.randint(1, n)}", None)),
+    "coach": (1, lambda rng, n, day: ("GET", f"/habits/coach/{rng.randint(1, n)}", None)),
+    "log": (2, lambda rng, n, day: _log_request(rng, n, day)),
+}
+
+
+def _log_request(rng, students, next_day):
+    sid = rng.randint(1, students)
+    day = next_day[sid]
+    next_day[sid] += 1
+    return "POST", "/habits/log", {
+        "student_id": sid, "date": str(np.datetime64("2024-01-01") + day),
+        "sleep_hours": round(rng.uniform(4, 9), 1), "study_hours": round(rng.uniform(0, 5), 1),
+        "activity_minutes": rng.randint(0, 90), "mood": str(rng.choice(MOODS)),
+        "screen_time_hours": round(rng.uniform(1, 10), 1), "productivity": rng.randint(1, 10),
+    }
+
+
+def parse_mix(spec):
+    if not spec:
+        return {name: w for name, (w, _) in ROUTES.items()}
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise SystemExit(f"unknown route {name!r}; choose from {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_load(app, args):
+    import httpx
+
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    next_day = defaultdict(lambda: args.days)
+    lat = defaultdict(list)
+    errors = defaultdict(int)
+    todo = iter(range(args.requests))
+
+    async def worker(client):
+        for _ in todo:
+            name = rng.choices(names, weights)[0]
+            method, path, body = ROUTES[name][1](rng, args.students, next_day)
+            t = time.perf_counter()
+            r = await client.request(method, path, json=body)
+            lat[name].append(time.perf_counter() - t)
+            errors[name] += r.status_code >= 400
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            t = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - t
+    routes = {
+        name: {"requests": len(ts), "errors": errors[name], "req_per_s": round(len(ts) / elapsed, 1), **percentiles(ts)}
+        for name, ts in sorted(lat.items())
+    }
+    everything = [x for ts in lat.values() for x in ts]
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(args.requests / elapsed, 1),
+        "errors": sum(errors.values()),
+        "all": percentiles(everything),
+        "routes": routes,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=300)
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--requests", type=int, default=3000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--mix", help=f"route=weight,... over {', '.join(ROUTES)} (default: all, built-in weights)")
+    ap.add_argument("--no-train", action="store_true", help="serve the untrained fallback instead of a fitted model")
+    ap.add_argument("--seed", type=int, default=0)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    out = os.path.abspath(args.out) if args.out else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # settings are read at import time and models/ is cwd-relative
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.chdir(tmp)
+        from backend.app.db import SessionLocal, engine
+        from backend.app.main import app
+
+        rows = populate(engine, args.students, args.days, args.seed)
+        if not args.no_train:
+            from backend.ml.habit_model import habit_model
+            from backend.ml.train_habit_model import load_logs_to_df
+            with SessionLocal() as db:
+                habit_model.train_from_dataframe(load_logs_to_df(db))
+        results = {"students": args.students, "days": args.days, "rows": rows, "db_mode": os.getenv("DB_MODE", "sync")}
+        results.update(asyncio.run(run_load(app, args)))
+        from backend.ml.predict_batcher import predict_batcher
+        if predict_batcher.enabled:
+            results["predict_batcher"] = predict_batcher.stats()
+        engine.dispose()
+    emit("loadgen", results, out)
+
+
+if __name__ == "__main__":
+    main()
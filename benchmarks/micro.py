@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks of the hot functions behind the API, on a synthetic
+students x days dataset in a temporary SQLite file:
+
+    load_logs_to_df           training-set build (wall time)
+    train_from_dataframe      full fit + publish of both forests (wall time)
+    predict_break             one student's feature row -> probability
+    analytics                 student_stats read + build_analytics (as /habits/analytics/{id})
+    generate_recommendations  rule table over one latest log
+
+    python -m benchmarks.micro --students 2000 --days 180 --out micro.json
+
+Per-call numbers are percentiles over --calls random students.
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from .common import add_output_args, emit, time_calls, time_once
+from .synthetic import populate
+
+BENCHES = ["load_logs_to_df", "train_from_dataframe", "predict_break", "analytics", "generate_recommendations"]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=500)
+    ap.add_argument("--days", type=int, default=120)
+    ap.add_argument("--calls", type=int, default=2000, help="calls per per-call benchmark")
+    ap.add_argument("--repeat", type=int, default=3, help="runs of load_logs_to_df (best is reported)")
+    ap.add_argument("--only", default=",".join(BENCHES), help=f"comma-separated subset of {', '.join(BENCHES)}")
+    ap.add_argument("--seed", type=int, default=0)
+    add_output_args(ap)
+    args = ap.parse_args(argv)
+    only = set(args.only.split(","))
+    out = os.path.abspath(args.out) if args.out else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # settings are read at import time and models/ is cwd-relative
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.chdir(tmp)
+        from backend.app import feature_store, stats
+        from backend.app.db import SessionLocal, engine
+        from backend.ml.habit_model import habit_model
+        from backend.ml.recommender import generate_recommendations
+        from backend.ml.train_habit_model import load_logs_to_df
+        from backend.routers.habits import build_analytics
+
+        results = {"students": args.students, "days": args.days,
+                   "rows": populate(engine, args.students, args.days, args.seed)}
+        rng = random.Random(args.seed)
+        sample = [rng.randint(1, args.students) for _ in range(args.calls)]
+        with SessionLocal() as db:
+            # materialized tables the API maintains on write
+            results["stats_rebuild_s"], _ = time_once(stats.rebuild, db)
+            results["feature_store_rebuild_s"], _ = time_once(feature_store.rebuild, db)
+
+            df = None
+            if only & {"load_logs_to_df", "train_from_dataframe"}:
+                seconds, df = time_once(load_logs_to_df, db, repeat=args.repeat)
+                results["load_logs_to_df"] = {"s": seconds, "rows": len(df), "rows_per_s": int(len(df) / seconds)}
+            if "train_from_dataframe" in only:
+                seconds, res = time_once(habit_model.train_from_dataframe, df)
+                results["train_from_dataframe"] = {"s": seconds, **{k: v for k, v in res.items() if k != "version"}}
+            if "predict_break" in only:
+                habit_model.load()
+                feats = {sid: feature_store.latest(db, sid) for sid in set(sample)}
+                results["predict_break"] = time_calls(habit_model.predict_break, [(feats[sid],) for sid in sample])
+            if "analytics" in only:
+                results["analytics"] = time_calls(
+                    lambda sid: build_analytics(stats.get_stats(db, sid)), [(sid,) for sid in sample])
+            if "generate_recommendations" in only:
+                latest = {sid: stats.entry_dict(stats.get_stats(db, sid).window[0]) for sid in set(sample)}
+                results["generate_recommendations"] = time_calls(
+                    generate_recommendations, [(latest[sid],) for sid in sample])
+        engine.dispose()
+    emit("micro", results, out)
+
+
+if __name__ == "__main__":
+    main()
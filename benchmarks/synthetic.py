@@ -0,0 +1,76 @@
+"""
+Seeded synthetic Student/HabitLog generator used by the benchmarks.
+"""
+import datetime as dt
+import numpy as np
+
+MOODS = np.array(["happy", "neutral", "stressed", "tired"])
+PERSONALITIES = np.array(["procrastinator", "disciplined", "anxious", "balanced"])
+
+
+def generate_logs(students, days, seed=0, start=dt.date(2024, 1, 1)):
+    """
+    Return a dict of column arrays for students x days logs. Each student has a
+    baseline and daily noise so the break labels are not trivially constant.
+    """
+    rng = np.random.default_rng(seed)
+    n = students * days
+    sid = np.repeat(np.arange(1, students + 1), days)
+    day = np.tile(np.arange(days), students)
+    base = lambda lo, hi: np.repeat(rng.uniform(lo, hi, students), days)
+
+    sleep = np.clip(base(5, 8.5) + rng.normal(0, 1, n), 0, 12).round(1)
+    study = np.clip(base(0.5, 4) + rng.normal(0, 1.2, n), 0, 12).round(1)
+    activity = np.clip(base(5, 60) + rng.normal(0, 15, n), 0, 240).astype(int)
+    screen = np.clip(base(2, 8) + rng.normal(0, 1.5, n), 0, 16).round(1)
+    prod = np.clip(base(3, 8) + rng.normal(0, 2, n) + (study - 2) * 0.5, 1, 10).round(0)
+    mood_idx = np.clip((10 - prod) / 3 + rng.normal(0, 0.8, n), 0, 3).astype(int)
+
+    dates = np.datetime64(start) + day.astype("timedelta64[D]")
+    return {
+        "student_id": sid,
+        "date": dates,
+        "sleep_hours": sleep,
+        "study_hours": study,
+        "activity_minutes": activity,
+        "mood": MOODS[mood_idx],
+        "screen_time_hours": screen,
+        "productivity": prod,
+    }
+
+
+def iter_log_rows(students, days, seed=0, chunk_rows=50_000):
+    """Yield lists of HabitLog row dicts in chunks, ready for executemany."""
+    cols = generate_logs(students, days, seed)
+    n = len(cols["student_id"])
+    for lo in range(0, n, chunk_rows):
+        hi = min(lo + chunk_rows, n)
+        part = {k: v[lo:hi].tolist() for k, v in cols.items()}
+        part["date"] = [d for d in cols["date"][lo:hi].astype(dt.date)]
+        yield [dict(zip(part, vals)) for vals in zip(*part.values())]
+
+
+def student_rows(students, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        "id": i,
+        "name": f"Student {i}",
+        "roll_no": f"R{i:06d}",
+        "age": int(rng.integers(14, 25)),
+        "goals": "Improve grades",
+        "personality": str(rng.choice(PERSONALITIES)),
+    } for i in range(1, students + 1)]
+
+
+def populate(engine, students, days, seed=0):
+    """Create tables on engine and fill them with synthetic data. Returns the log row count."""
+    from backend.app.db import Base
+    from backend.models import Student, HabitLog
+    Base.metadata.create_all(bind=engine)
+    total = 0
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), student_rows(students, seed))
+        for rows in iter_log_rows(students, days, seed):
+            conn.execute(HabitLog.__table__.insert(), rows)
+            total += len(rows)
+    return total
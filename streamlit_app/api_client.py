@@ -0,0 +1,152 @@
+"""
+HTTP client layer for the Streamlit UI.
+
+One keep-alive requests.Session (a connection pool shared by every rerun and
+thread), a small thread pool to fan calls out concurrently, and caches keyed
+on the student's data version:
+
+- the dashboard is revalidated with If-None-Match on every rerun; when nothing
+  changed the API answers 304 (usually without touching its database) and the
+  body kept in session_state is reused. Its analytics and routine serve those
+  tabs too, so they need no calls of their own.
+- logs are fetched incrementally: after the first full load only rows dated
+  from the last cached day on (so a re-logged day is picked up) and only when
+  the version moved. A day logged further back shows up on the next full
+  reload, every UI_CACHE_TTL seconds.
+- st.cache_data holds the log deltas and the Plotly figures per (student,
+  version), shared by all sessions.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+FASTAPI_BASE = os.getenv("FASTAPI_BASE", "http://localhost:8000")
+HTTP_POOL_SIZE = int(os.getenv("UI_HTTP_POOL_SIZE", "8"))
+HTTP_TIMEOUT = float(os.getenv("UI_HTTP_TIMEOUT", "30"))
+CACHE_TTL = int(os.getenv("UI_CACHE_TTL", "600"))
+
+
+# ---------------- Transport ----------------
+@st.cache_resource
+def session():
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+@st.cache_resource
+def _pool():
+    return ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE, thread_name_prefix="ui-fetch")
+
+
+def get(path, **kwargs):
+    return session().get(FASTAPI_BASE + path, timeout=HTTP_TIMEOUT, **kwargs)
+
+
+def post(path, **kwargs):
+    return session().post(FASTAPI_BASE + path, timeout=HTTP_TIMEOUT, **kwargs)
+
+
+def fan_out(*calls):
+    """Run (fn, *args) calls concurrently -> their results in order. fn must not call st.*."""
+    futures = [_pool().submit(fn, *args) for fn, *args in calls]
+    return [f.result() for f in futures]
+
+
+# ---------------- Fetchers (no st.* calls: they run in the pool) ----------------
+def _dashboard(student_id, etag=None):
+    """(etag, body); body is None on 304. (None, None) when the student has no logs."""
+    r = get(f"/habits/dashboard/{student_id}", headers={"If-None-Match": etag} if etag else {})
+    if r.status_code == 304:
+        return etag, None
+    if not r.ok:
+        return None, None
+    return r.headers.get("ETag"), r.json()
+
+
+def _logs(student_id, since=None):
+    r = get(f"/habits/logs/{student_id}", params={"from": since} if since else None)
+    r.raise_for_status()
+    return r.json()
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+# ---------------- Version-keyed caches ----------------
+@st.cache_data(ttl=CACHE_TTL, max_entries=1000, show_spinner=False)
+def logs_since(student_id, version, since):
+    """Logs dated since (ISO date) on, as of the student's stats version."""
+    return _logs(student_id, since)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=1000, show_spinner=False)
+def figures(student_id, version, _logs_df):
+    import plotly.express as px
+    return (
+        px.line(_logs_df, x="date", y="study_hours", title="Study Hours"),
+        px.line(_logs_df, x="date", y="sleep_hours", title="Sleep Hours"),
+    )
+
+
+def _merge(df, rows, since):
+    new = _frame(rows)
+    if df.empty:
+        return new
+    if new.empty:
+        return df
+    return pd.concat([df[df["date"] < pd.Timestamp(since)], new], ignore_index=True)
+
+
+def load(student_id):
+    """
+    {"etag", "version", "dashboard", "logs", "loaded_at"} for a student;
+    dashboard is None without logs. Nothing new costs one conditional request;
+    a first view (or a full reload) fetches dashboard and logs concurrently.
+    """
+    students = st.session_state.setdefault("students", {})
+    cached = students.get(student_id)
+    if cached is None or time.time() - cached["loaded_at"] > CACHE_TTL:
+        (etag, body), rows = fan_out((_dashboard, student_id), (_logs, student_id))
+        state = {"etag": etag, "version": body and body["version"], "dashboard": body,
+                 "logs": _frame(rows), "loaded_at": time.time()}
+    else:
+        etag, body = _dashboard(student_id, cached["etag"])
+        if cached["etag"] and etag == cached["etag"]:
+            return cached
+        version = body and body["version"]
+        state = {**cached, "etag": etag, "version": version, "dashboard": body}
+        if body is None:
+            state["logs"] = _frame([])
+        elif version != cached["version"]:
+            # a model swap changes the ETag alone; only a new stats version means new logs
+            logs = cached["logs"]
+            since = logs["date"].max().date().isoformat() if not logs.empty else None
+            state["logs"] = _merge(logs, logs_since(student_id, version, since), since)
+    students[student_id] = state
+    return state
+
+
+def forget(student_id):
+    """Drop a student's cached state so the next load is a full one."""
+    st.session_state.setdefault("students", {}).pop(student_id, None)
+
+
+def log_habit(payload):
+    """POST /habits/log. A day before the newest cached one is outside the incremental window: reload fully."""
+    r = post("/habits/log", json=payload)
+    cached = st.session_state.get("students", {}).get(payload["student_id"])
+    if r.ok and cached is not None and not cached["logs"].empty and pd.Timestamp(payload["date"]) < cached["logs"]["date"].max():
+        forget(payload["student_id"])
+    return r
@@ -1,10 +1,9 @@
 import streamlit as st
 import requests
-import pandas as pd
-import plotly.express as px
 import time
+import json
 
-FASTAPI_BASE = "http://localhost:8000"
+from api_client import figures, get, load, log_habit, post
 
 st.set_page_config(page_title="AI Habit Suite", layout="wide")
 st.title("🌟 AI Habit Tracker & Wellness Coach — Dashboard")
@@ -17,45 +16,39 @@ with st.sidebar.expander("Create quick student"):
     roll = st.text_input("Roll No", value=f"R{student_id:03d}")
     if st.button("Create student"):
         payload = {"name": name, "roll_no": roll}
-        r = requests.post(f"{FASTAPI_BASE}/students/", json=payload)
+        r = post("/students/", json=payload)
         if r.status_code == 200:
             st.success("Student created")
         else:
             st.error(r.text)
 
+# one conditional request per rerun while nothing changed; every tab reads from it
+try:
+    data = load(int(student_id))
+except requests.RequestException:
+    data = None
+dash = data["dashboard"] if data else None
+
 tabs = st.tabs(["Dashboard","Log Habit","Analytics","AI Coach","Routine","Train Model"])
 
 # ---------- Dashboard ----------
 with tabs[0]:
     st.header("Overview")
     col1, col2, col3 = st.columns(3)
-    try:
-        r = requests.get(f"{FASTAPI_BASE}/habits/predict/{student_id}")
-        if r.ok:
-            d = r.json()
-            col1.metric("Break Prob", f"{d['break_probability']*100:.1f}%")
-            col1.write("Risk:", d["label"])
-    except:
+    if dash:
+        d = dash["prediction"]
+        col1.metric("Break Prob", f"{d['break_probability']*100:.1f}%")
+        col1.write(f"Risk: {d['label']}")
+        col2.write("Top Recommendations")
+        for rtxt in dash["recommendations"]:
+            col2.write(f"- {rtxt}")
+        stats = dash["analytics"]
+        col3.metric("Avg Study (7d)", stats.get("avg_study","-"))
+        col3.metric("Avg Sleep (7d)", stats.get("avg_sleep","-"))
+        st.write("Mood counts:", stats.get("mood_counts",{}))
+    else:
         col1.write("No prediction available")
-
-    try:
-        r = requests.get(f"{FASTAPI_BASE}/habits/recommend/{student_id}")
-        if r.ok:
-            recs = r.json().get("recommendations",[])
-            col2.write("Top Recommendations")
-            for rtxt in recs:
-                col2.write("-", rtxt)
-    except:
         col2.write("No recommendations")
-
-    try:
-        r = requests.get(f"{FASTAPI_BASE}/habits/analytics/{student_id}")
-        if r.ok:
-            stats = r.json()
-            col3.metric("Avg Study (7d)", stats.get("avg_study","-"))
-            col3.metric("Avg Sleep (7d)", stats.get("avg_sleep","-"))
-            st.write("Mood counts:", stats.get("mood_counts",{}))
-    except:
         col3.write("No analytics available")
 
 # ---------- Log Habit ----------
@@ -84,7 +77,7 @@ with tabs[1]:
                 "screen_time_hours": float(screen_time_hours),
                 "productivity": float(productivity)
             }
-            r = requests.post(f"{FASTAPI_BASE}/habits/log", json=payload)
+            r = log_habit(payload)
             if r.ok:
                 st.success("Saved")
             else:
@@ -94,31 +87,31 @@ with tabs[1]:
 with tabs[2]:
     st.subheader("History & Charts")
     if st.button("Load last 30 logs"):
-        r = requests.get(f"{FASTAPI_BASE}/habits/analytics/{student_id}")
-        if r.ok:
-            stats = r.json()
-            st.json(stats)
+        if dash:
+            st.json(dash["analytics"])
         else:
-            st.error(r.text)
-    # also show full logs table
-    r2 = requests.get(f"{FASTAPI_BASE}/habits/logs/{student_id}")
-    if r2.ok:
-        df = pd.DataFrame(r2.json())
-        if not df.empty:
-            df["date"] = pd.to_datetime(df["date"])
-            st.dataframe(df)
-            fig = px.line(df, x="date", y="study_hours", title="Study Hours")
-            st.plotly_chart(fig)
-            fig2 = px.line(df, x="date", y="sleep_hours", title="Sleep Hours")
-            st.plotly_chart(fig2)
+            st.error("No habit logs found")
+    # also show full logs table (fetched incrementally, figures cached per version)
+    df = data["logs"] if data else None
+    if df is not None and not df.empty:
+        st.dataframe(df)
+        fig, fig2 = figures(int(student_id), data["version"], df)
+        st.plotly_chart(fig)
+        st.plotly_chart(fig2)
 
 # ---------- AI Coach ----------
 with tabs[3]:
     st.subheader("Get AI Coach Advice")
     if st.button("Get Advice"):
-        r = requests.get(f"{FASTAPI_BASE}/habits/coach/{student_id}")
+        r = get(f"/habits/coach/{student_id}/stream", stream=True)
         if r.ok:
-            st.success(r.json().get("message"))
+            def tokens():
+                for line in r.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data: "):
+                        token = json.loads(line[6:]).get("token")
+                        if token:
+                            yield token
+            st.write_stream(tokens())
         else:
             st.error(r.text)
 
@@ -126,11 +119,10 @@ with tabs[3]:
 with tabs[4]:
     st.subheader("Personalized Routine")
     if st.button("Generate Routine"):
-        r = requests.get(f"{FASTAPI_BASE}/habits/routine/{student_id}")
-        if r.ok:
-            st.json(r.json().get("routine"))
+        if dash:
+            st.json(dash["routine"])
         else:
-            st.error(r.text)
+            st.error("No habit logs found")
 
 # ---------- Train Model ----------
 with tabs[5]:
@@ -138,9 +130,19 @@ with tabs[5]:
     st.write("This will pull logs and train models. Need at least ~20 rows for reasonable result.")
     if st.button("Train Models Now"):
         with st.spinner("Training..."):
-            r = requests.post(f"{FASTAPI_BASE}/habits/train")
-            if r.ok:
+            r = post("/habits/train")
+            job = r.json() if r.ok else None
+            while job and job["status"] in ("queued", "running"):
+                time.sleep(1)
+                job = get(f"/habits/train/{job['job_id']}").json()
+            if job and job["status"] == "succeeded":
                 st.success("Training completed")
-                st.json(r.json())
+                st.json(job["result"])
             else:
-                st.error(r.text)
+                st.error(job.get("error") if job else r.text)
+    if st.button("Roll back to previous model"):
+        r = post("/habits/model/rollback")
+        if r.ok:
+            st.success(f"Serving model {r.json()['version']}")
+        else:
+            st.error(r.text)
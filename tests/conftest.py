@@ -0,0 +1,42 @@
+"""
+API tests against a throwaway SQLite database. The settings are read at
+import, so the environment is set up here before anything from backend loads.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+_tmp = tempfile.mkdtemp(prefix="habit-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/habit.db"
+os.environ.setdefault("MODEL_PRELOAD", "lazy")
+os.environ["ARCHIVE_DIR"] = os.path.join(_tmp, "archive")
+os.chdir(_tmp)  # models/ is relative: start untrained
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from backend.app import stats
+    from backend.app.db import Base, engine
+    from backend.app.main import app
+    Base.metadata.drop_all(bind=engine)
+    shutil.rmtree(os.environ["ARCHIVE_DIR"], ignore_errors=True)
+    Base.metadata.create_all(bind=engine)
+    stats.known_versions.clear()
+    stats.latest_cache.clear()
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def populate():
+    """populate(students, days): raw logs only, as in a database that predates the derived tables."""
+    from backend.app.db import engine
+    from benchmarks.synthetic import populate
+    return lambda students, days: populate(engine, students, days)
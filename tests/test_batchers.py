@@ -0,0 +1,75 @@
+from backend.app.micro_batch import MicroBatcher
+from backend.ml.predict_batcher import PredictBatcher
+
+
+class _Collect(MicroBatcher):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.batches = []
+
+    def _flush(self, batch):
+        self.batches.append(batch)
+
+
+def test_stop_flushes_everything_queued_in_bounded_batches():
+    b = _Collect(max_rows=3, max_wait_ms=1000)
+    for i in range(7):
+        b._queue.put(i)
+    b.start()
+    b.stop()
+    assert [len(x) for x in b.batches] == [3, 3, 1]
+    assert [i for x in b.batches for i in x] == list(range(7))
+
+
+class _Model:
+    features = ["a"]
+
+    def refresh(self):
+        pass
+
+    def predict_break_batch(self, X, columns):
+        return [row[0] / 10 for row in X]
+
+    def predict_mood_batch(self, X, columns):
+        return ["happy" for _ in X]
+
+
+def test_predict_batcher_resolves_each_future():
+    b = PredictBatcher(model=_Model(), enabled=True, max_rows=64, max_wait_ms=5)
+    futures = [b.submit("break", {"a": i}) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == [i / 10 for i in range(5)]
+    b.stop()
+    assert b.stats()["rows"] == 5
+
+
+def test_waiting_on_a_full_write_queue_does_not_block_the_loop(monkeypatch):
+    import asyncio
+    import importlib
+    import pytest
+    from fastapi import HTTPException
+    from backend.app.write_batcher import WriteBatcher
+    habits = importlib.import_module("backend.routers.habits")  # the package re-exports the router as habits
+    from backend.schemas.habit import HabitCreate
+    b = WriteBatcher(queue_max=1, queue_wait_ms=300)
+    monkeypatch.setattr(b, "start", lambda: None)  # nothing drains the queue
+    b._queue.put_nowait(None)
+    monkeypatch.setattr(habits, "write_batcher", b)
+    log = HabitCreate(student_id=1, date="2024-01-01", sleep_hours=7, study_hours=3, activity_minutes=30,
+                      mood="happy", screen_time_hours=2, productivity=8)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        ticker = asyncio.create_task(tick())
+        with pytest.raises(HTTPException) as e:
+            await habits.enqueue_log(log)
+        ticker.cancel()
+        return e.value.status_code, ticks
+    status, ticks = asyncio.run(run())
+    assert status == 503
+    assert ticks >= 10
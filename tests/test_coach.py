@@ -0,0 +1,63 @@
+import threading
+import time
+
+from backend.ml.coach_llm import Coach
+
+KEY = ("happy", 8.0, 3.0, "", "")
+
+
+class _Slow:
+    name = "slow"
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate(self, key):
+        return "".join(self.stream(key))
+
+    def stream(self, key):
+        self.calls += 1
+        self.release.wait(5)
+        yield "keep"
+        yield " going"
+
+
+def _wait_for(cond):
+    deadline = time.monotonic() + 5
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_concurrent_identical_streams_share_one_backend_call():
+    backend = _Slow()
+    coach = Coach(backend)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append("".join(coach.stream(KEY)))) for _ in range(5)]
+    threads.append(threading.Thread(target=lambda: out.append(coach.message(KEY))))
+    for t in threads:
+        t.start()
+    _wait_for(lambda: coach.coalesced == 5)
+    backend.release.set()
+    for t in threads:
+        t.join(5)
+    assert backend.calls == 1
+    assert out == ["keep going"] * 6
+    assert coach.cache.get(KEY) == "keep going"
+
+
+def test_followers_retry_when_the_leading_stream_is_dropped():
+    backend = _Slow()
+    coach = Coach(backend)
+    leader = coach.stream(KEY)
+    backend.release.set()
+    assert next(leader) == "keep"
+    out = []
+    follower = threading.Thread(target=lambda: out.append(coach.message(KEY)))
+    follower.start()
+    _wait_for(lambda: coach.coalesced == 1)
+    leader.close()  # client went away mid-answer
+    follower.join(5)
+    assert out == ["keep going"]
+    assert backend.calls == 2
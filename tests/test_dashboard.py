@@ -0,0 +1,48 @@
+from backend.ml.habit_model import habit_model
+
+
+def test_revalidation_does_not_load_the_model(client, populate, monkeypatch):
+    populate(2, 20)
+    r = client.get("/habits/dashboard/1")
+    assert r.status_code == 200, r.text
+    etag = r.headers["ETag"]
+
+    def load():
+        raise AssertionError("304 path loaded the model")
+    monkeypatch.setattr(habit_model, "loaded", False)
+    monkeypatch.setattr(habit_model, "load", load)
+    r = client.get("/habits/dashboard/1", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+
+
+def test_async_routes_run_orm_helpers_off_the_event_loop(client, populate, monkeypatch):
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.app import insights, stats
+    from backend.routers import async_habits
+    populate(2, 20)
+
+    def off_loop(fn):
+        def wrapped(*args):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return fn(*args)
+            raise AssertionError(f"{fn.__name__} ran on the event loop")
+        return wrapped
+    for mod, name in [(stats, "get_stats"), (insights, "latest"), (insights, "latest_features")]:
+        monkeypatch.setattr(mod, name, off_loop(getattr(mod, name)))
+
+    app = FastAPI()
+    app.include_router(async_habits.router)
+    with TestClient(app) as c:
+        for path in ["dashboard/1", "analytics/1", "predict/1", "routine/1", "recommend/1"]:
+            assert c.get(f"/habits/{path}").status_code == 200, path
+        assert c.get("/habits/routine/99").status_code == 404
+        log = {"student_id": 1, "date": "2030-01-01", "sleep_hours": 7.0, "study_hours": 3.0, "activity_minutes": 30,
+               "mood": "happy", "screen_time_hours": 2.0, "productivity": 8.0}
+        assert c.post("/habits/log", json=log).status_code == 200
+        assert c.get("/habits/analytics/1").json() == client.get("/habits/analytics/1").json()
+        assert c.get("/habits/dashboard/1").json()["last_date"] == "2030-01-01"
@@ -0,0 +1,26 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+
+def test_day_in_both_tiers_is_exported_once(client, populate):
+    from backend.app import archive
+    from backend.app.db import SessionLocal
+    populate(2, 60)
+    with SessionLocal() as db:
+        assert archive.archive_logs(db, horizon_days=30, today=date(2024, 3, 1))["logs"]
+    # re-log an archived day: it now exists hot and cold
+    r = client.post("/habits/log", json={
+        "student_id": 1, "date": "2024-01-05", "sleep_hours": 7, "study_hours": 9,
+        "activity_minutes": 30, "mood": "happy", "screen_time_hours": 3, "productivity": 6,
+    })
+    assert r.status_code == 200, r.text
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/habits/export", params={"format": "csv"}).text)))
+    keys = [(r["student_id"], r["date"]) for r in rows]
+    assert len(rows) == 120 and len(set(keys)) == len(keys)
+    assert next(r for r in rows if (r["student_id"], r["date"]) == ("1", "2024-01-05"))["study_hours"] == "9.0"
@@ -0,0 +1,39 @@
+def _students(resp):
+    assert resp.status_code == 200, resp.text
+    return sorted(p["student_id"] for p in resp.json())
+
+
+def test_batch_predict_everyone_builds_missing_rows(client, populate):
+    populate(3, 20)
+    assert _students(client.post("/habits/predict/batch", json={})) == [1, 2, 3]
+
+
+def test_batch_predict_everyone_after_some_ids(client, populate):
+    populate(3, 20)
+    assert _students(client.post("/habits/predict/batch", json={"student_ids": [1, 2]})) == [1, 2]
+    assert _students(client.post("/habits/predict/batch", json={})) == [1, 2, 3]
+
+
+def test_reads_for_students_without_logs_do_not_write(client, populate):
+    from sqlalchemy import event
+    from backend.app import feature_store
+    from backend.app.db import SessionLocal, engine
+    populate(2, 20)
+    with SessionLocal() as db:
+        assert len(feature_store.latest_many(db)) == 2  # builds 1 and 2 up front
+
+    writes = []
+
+    def record(conn, cursor, statement, *args):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            event.listen(db, "after_commit", lambda s: writes.append("COMMIT"))
+            assert feature_store.latest(db, 99) is None
+            assert [r[0] for r in feature_store.latest_many(db, [1, 98, 99])] == [1]
+            assert len(feature_store.latest_many(db)) == 2
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert writes == []
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from backend.ml.forest_engine import CompiledForest
+from backend.ml.habit_model import FEATURE_COLUMNS
+from benchmarks.synthetic import generate_logs
+
+
+@pytest.fixture(scope="module")
+def data():
+    cols = generate_logs(40, 50, seed=3)
+    X = np.column_stack([cols[c] for c in FEATURE_COLUMNS]).astype(float)
+    y = ((cols["productivity"] < 4) ^ (np.random.default_rng(3).random(len(X)) < 0.1)).astype(int)
+    return X, y, cols["mood"].astype(object)
+
+
+def _assert_same(clf, compiled, X):
+    np.testing.assert_allclose(compiled.predict_proba(X), clf.predict_proba(X), rtol=0, atol=1e-12)
+    assert (compiled.predict(X) == clf.predict(X)).all()
+    # single rows: the serving shape
+    for x in X[:20]:
+        np.testing.assert_allclose(compiled.predict_proba(x[None, :]), clf.predict_proba(x[None, :]), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("labels", ["break", "mood"])
+def test_compiled_matches_sklearn(data, labels):
+    X, y_break, y_mood = data
+    y = y_break if labels == "break" else y_mood
+    clf = RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y)
+    _assert_same(clf, CompiledForest.from_sklearn(clf), X)
+
+
+def test_compiled_matches_warm_started_forest(data):
+    X, y, _ = data
+    clf = RandomForestClassifier(n_estimators=20, random_state=0).fit(X[:1000], y[:1000])
+    clf.set_params(warm_start=True, n_estimators=30).fit(X[1000:], y[1000:])
+    assert len(clf.estimators_) == 30
+    _assert_same(clf, CompiledForest.from_sklearn(clf), X)
+
+
+def test_compiled_matches_after_save_and_mmap_load(data, tmp_path):
+    X, _, y = data
+    clf = RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y)
+    CompiledForest.from_sklearn(clf).save(str(tmp_path / "forest"))
+    loaded = CompiledForest.load(str(tmp_path / "forest"))
+    assert isinstance(loaded.feature, np.memmap)
+    _assert_same(clf, loaded, X)
@@ -0,0 +1,22 @@
+import json
+
+
+def _log(day, sleep=7.0):
+    return {"student_id": 1, "date": f"2024-01-0{day}", "sleep_hours": sleep, "study_hours": 3.0, "activity_minutes": 30,
+            "mood": "happy", "screen_time_hours": 2.0, "productivity": 7.0}
+
+
+def _bulk(client, logs):
+    r = client.post("/habits/logs/bulk", content="\n".join(json.dumps(l) for l in logs),
+                    headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_bulk_counts_new_and_overwritten_days_separately(client):
+    out = _bulk(client, [_log(1), _log(2), _log(2, sleep=5.0)])  # day 2 twice in one chunk
+    assert (out["inserted"], out["updated"], out["failed"]) == (2, 0, 0)
+    out = _bulk(client, [_log(2, sleep=8.0), _log(3), {"student_id": 1}])
+    assert (out["inserted"], out["updated"], out["failed"]) == (1, 1, 1)
+    logs = client.get("/habits/logs/1").json()
+    assert [(l["date"], l["sleep_hours"]) for l in logs] == [("2024-01-01", 7.0), ("2024-01-02", 8.0), ("2024-01-03", 7.0)]
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select, text
+
+
+def _old_database(engine, populate):
+    """A habit.db from before the unique index, with same-day duplicates and stats built."""
+    from backend.app import stats
+    from backend.app.db import SessionLocal
+    from backend.app.migrations import UNIQUE_LOG_INDEX
+    from backend.models.habit import HabitLog
+    populate(3, 20)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {UNIQUE_LOG_INDEX}"))
+        dups = conn.execute(select(HabitLog.__table__).where(HabitLog.student_id == 2).limit(5)).mappings().all()
+        conn.execute(HabitLog.__table__.insert(), [{k: v for k, v in r.items() if k != "id"} for r in dups])
+    with SessionLocal() as db:
+        stats.rebuild(db)
+
+
+def test_concurrent_workers_migrate_once(client, populate):
+    from backend.app import migrations
+    from backend.app.db import SessionLocal, engine
+    from backend.models.habit import HabitLog
+    from backend.models.stats import StudentStats
+    _old_database(engine, populate)
+
+    def run(_):
+        with SessionLocal() as db:
+            return migrations.run(db)["unique_log_dates"]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(run, range(4)))
+
+    assert sum(r["duplicates"] for r in results) == 5
+    assert migrations.has_unique_log_index()
+    with SessionLocal() as db:
+        assert db.execute(select(func.count()).select_from(HabitLog)).scalar() == 60
+        assert db.get(StudentStats, 2).log_count == 20
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+
+from backend.ml.recommender import (
+    RECOMMENDATION_RULES,
+    ROUTINE_RULES,
+    generate_recommendations,
+    generate_routine,
+    recommendations_from_masks,
+    routine_cohort,
+    rule_masks,
+)
+
+FEATURES = sorted({r.feature for r in RECOMMENDATION_RULES} | {r.feature for r in ROUTINE_RULES})
+
+
+def _cohort(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = {c: rng.uniform(0, 12, n).round(1) for c in FEATURES}
+    # every threshold exactly, and missing values (NaN in the matrix, absent from the log)
+    for r in RECOMMENDATION_RULES + ROUTINE_RULES:
+        X[r.feature][:5] = r.threshold
+    for c in FEATURES:
+        X[c][rng.random(n) < 0.1] = np.nan
+    return X
+
+
+def test_batched_recommendations_match_per_student():
+    X = _cohort()
+    batched = recommendations_from_masks(rule_masks(X))
+    for i, recs in enumerate(batched):
+        log = {c: X[c][i] for c in FEATURES if not math.isnan(X[c][i])}
+        assert recs == generate_recommendations(log), log
+
+
+def test_batched_routines_match_per_student():
+    X = {c: np.nan_to_num(v, nan=0.0) for c, v in _cohort(seed=1).items()}
+    for i, routine in enumerate(routine_cohort(X)):
+        assert routine == generate_routine({c: X[c][i] for c in FEATURES})
+
+
+def test_cohort_endpoint_matches_per_student_routes(client, populate):
+    populate(30, 12)
+    cohort = client.get("/habits/recommend/cohort", params={"routine": True}).json()
+    assert len(cohort) == 30
+    for o in cohort:
+        sid = o["student_id"]
+        assert o["recommendations"] == client.get(f"/habits/recommend/{sid}").json()["recommendations"]
+        assert o["routine"] == client.get(f"/habits/routine/{sid}").json()["routine"]
@@ -0,0 +1,17 @@
+from benchmarks.synthetic import MOODS
+
+
+def test_first_write_folds_in_existing_history(client, populate):
+    populate(3, 40)
+    before = client.get("/habits/logs/1").json()
+    r = client.post("/habits/log", json={
+        "student_id": 1, "date": "2024-03-01", "sleep_hours": 7, "study_hours": 2,
+        "activity_minutes": 30, "mood": "happy", "screen_time_hours": 3, "productivity": 6,
+    })
+    assert r.status_code == 200, r.text
+
+    logs = client.get("/habits/logs/1").json()
+    analytics = client.get("/habits/analytics/1").json()
+    assert len(logs) == len(before) + 1 == 41
+    assert sum(analytics["mood_counts"].values()) == 30  # the whole window, not just the new log
+    assert set(analytics["mood_counts"]) <= set(MOODS)
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO
+
+
+def _in_other_process(code):
+    env = {**os.environ, "PYTHONPATH": REPO}
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_job_status_is_visible_to_other_workers(client, monkeypatch):
+    from backend.ml import training_jobs
+    monkeypatch.setattr(training_jobs._executor, "submit", lambda *a: None)  # stays queued
+    job_id = client.post("/habits/train").json()["job_id"]
+    out = _in_other_process(f"from backend.ml import training_jobs; import json; print(json.dumps(training_jobs.get_job({job_id!r})))")
+    assert json.loads(out)["status"] == "queued"
+    assert client.get("/habits/train/nope").status_code == 404
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock")
+def test_train_lock_excludes_other_processes():
+    from backend.ml.habit_model import TRAIN_LOCK_PATH, habit_model
+    probe = (f"import fcntl, os; fd = os.open({os.path.abspath(TRAIN_LOCK_PATH)!r}, os.O_RDWR)\n"
+             "try: fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB); print('free')\n"
+             "except BlockingIOError: print('held')")
+    with habit_model.train_lock:
+        with habit_model.train_lock:  # reentrant
+            assert _in_other_process(probe) == "held"
+        assert _in_other_process(probe) == "held"
+    assert _in_other_process(probe) == "free"
+
+
+def test_prune_keeps_newest_and_referenced_versions(tmp_path, monkeypatch):
+    from backend.ml import habit_model as hm
+    monkeypatch.setattr(hm, "VERSIONS_DIR", str(tmp_path))
+    for i in range(1, 7):
+        v = f"v{i}"
+        os.makedirs(tmp_path / v)
+        # v6 still serves v1's mood model
+        mood = "versions/v1/mood_predict.joblib" if i in (1, 6) else None
+        (tmp_path / v / "manifest.json").write_text(json.dumps({"habit": f"versions/{v}/habit_predict.joblib", "mood": mood}))
+    removed = hm.prune_versions(keep=2, protected={"v3"})
+    assert sorted(removed) == ["v2", "v4"]
+    assert hm.list_versions() == ["v1", "v3", "v5", "v6"]